@@ -0,0 +1,39 @@
+"""add indexes in table chat_message
+
+Revision ID: 1d8f3b6a9e27
+Revises: 7b2e4d91c0a5
+Create Date: 2026-10-18 16:02:41.207315
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "1d8f3b6a9e27"
+down_revision: Union[str, None] = "7b2e4d91c0a5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_chat_message_chat_session_id_created_at_id",
+        "chat_message",
+        ["chat_session_id", "created_at", "id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_chat_message_parent_message_id", "chat_message", ["parent_message_id"], unique=False
+    )
+    op.create_index(
+        "ix_chat_message_child_message_id", "chat_message", ["child_message_id"], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_chat_message_child_message_id", table_name="chat_message")
+    op.drop_index("ix_chat_message_parent_message_id", table_name="chat_message")
+    op.drop_index("ix_chat_message_chat_session_id_created_at_id", table_name="chat_message")
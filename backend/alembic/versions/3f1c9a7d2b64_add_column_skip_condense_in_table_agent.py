@@ -0,0 +1,31 @@
+"""add column skip_condense in table agent
+
+Revision ID: 3f1c9a7d2b64
+Revises: 8c6277a018a4
+Create Date: 2026-10-18 09:12:31.402117
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3f1c9a7d2b64"
+down_revision: Union[str, None] = "8c6277a018a4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "agent",
+        sa.Column("skip_condense", sa.Boolean(), nullable=False, server_default=sa.false()),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("agent", "skip_condense", mssql_drop_default=True)
@@ -0,0 +1,31 @@
+"""add keyset index in table chat_session
+
+Revision ID: 5c9e2f7a4b18
+Revises: 1d8f3b6a9e27
+Create Date: 2026-10-18 18:24:09.531846
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5c9e2f7a4b18"
+down_revision: Union[str, None] = "1d8f3b6a9e27"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_chat_session_user_id_updated_at_id",
+        "chat_session",
+        ["user_id", "updated_at", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_chat_session_user_id_updated_at_id", table_name="chat_session")
@@ -0,0 +1,33 @@
+"""add columns summary in table chat_session
+
+Revision ID: 7b2e4d91c0a5
+Revises: 3f1c9a7d2b64
+Create Date: 2026-10-18 14:27:05.816342
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import mssql
+
+# revision identifiers, used by Alembic.
+revision: str = "7b2e4d91c0a5"
+down_revision: Union[str, None] = "3f1c9a7d2b64"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("chat_session", sa.Column("summary", sa.NVARCHAR(), nullable=True))
+    op.add_column(
+        "chat_session",
+        sa.Column("summarized_until_message_id", mssql.UNIQUEIDENTIFIER(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("chat_session", "summarized_until_message_id")
+    op.drop_column("chat_session", "summary")
@@ -0,0 +1,29 @@
+"""add column maximum_chat_retention_days in table user_setting
+
+Revision ID: 8e4a1c6d3f90
+Revises: 5c9e2f7a4b18
+Create Date: 2026-10-18 19:11:37.804215
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8e4a1c6d3f90"
+down_revision: Union[str, None] = "5c9e2f7a4b18"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "user_setting", sa.Column("maximum_chat_retention_days", sa.Integer(), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("user_setting", "maximum_chat_retention_days")
@@ -0,0 +1,40 @@
+"""add columns index_status in table document
+
+Revision ID: a6d3e8f1c2b7
+Revises: f2a8d5c1e9b3
+Create Date: 2026-10-18 23:05:41.318262
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a6d3e8f1c2b7"
+down_revision: Union[str, None] = "f2a8d5c1e9b3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEX_STATUS = sa.Enum(
+    "NOT_STARTED", "IN_PROGRESS", "SUCCESS", "FAILED", name="indexstatus", native_enum=False
+)
+
+
+def upgrade() -> None:
+    op.add_column("document", sa.Column("index_status", INDEX_STATUS, nullable=True))
+    op.add_column("document", sa.Column("index_task_id", sa.String(length=255), nullable=True))
+
+    # The synced documents are indexed, the other ones are indexed again on their next upload
+    op.execute(
+        "UPDATE document SET index_status = "
+        "CASE WHEN last_synced_at IS NOT NULL THEN 'SUCCESS' ELSE 'FAILED' END"
+    )
+    op.alter_column("document", "index_status", existing_type=INDEX_STATUS, nullable=False)
+
+
+def downgrade() -> None:
+    op.drop_column("document", "index_task_id")
+    op.drop_column("document", "index_status")
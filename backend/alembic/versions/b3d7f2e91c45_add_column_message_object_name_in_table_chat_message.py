@@ -0,0 +1,29 @@
+"""add column message_object_name in table chat_message
+
+Revision ID: b3d7f2e91c45
+Revises: 8e4a1c6d3f90
+Create Date: 2026-10-18 20:02:55.126408
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b3d7f2e91c45"
+down_revision: Union[str, None] = "8e4a1c6d3f90"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "chat_message", sa.Column("message_object_name", sa.String(length=255), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("chat_message", "message_object_name")
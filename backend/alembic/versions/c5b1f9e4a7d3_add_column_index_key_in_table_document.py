@@ -0,0 +1,31 @@
+"""add column index_key in table document
+
+Revision ID: c5b1f9e4a7d3
+Revises: a6d3e8f1c2b7
+Create Date: 2026-10-19 00:12:27.540118
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c5b1f9e4a7d3"
+down_revision: Union[str, None] = "a6d3e8f1c2b7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("document", sa.Column("index_key", sa.String(length=36), nullable=True))
+
+    # The existing documents were indexed under their own id, lower-cased as in Python
+    op.execute("UPDATE document SET index_key = LOWER(CONVERT(VARCHAR(36), id))")
+    op.alter_column("document", "index_key", existing_type=sa.String(length=36), nullable=False)
+
+
+def downgrade() -> None:
+    op.drop_column("document", "index_key")
@@ -0,0 +1,76 @@
+"""add full-text search in table chat_message
+
+Revision ID: e7c4a9d2b6f1
+Revises: b3d7f2e91c45
+Create Date: 2026-10-18 21:14:37.402915
+
+"""
+
+import unicodedata
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e7c4a9d2b6f1"
+down_revision: Union[str, None] = "b3d7f2e91c45"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH_SIZE = 1000
+
+# Frozen copy of the application normalization at the time of this revision, so later changes do not alter the backfill
+VIETNAMESE_ACCENTS = str.maketrans(
+    "ÀÁÂÃÈÉÊÌÍÒÓÔÕÙÚÝàáâãèéêìíòóôõùúýĂăĐđĨĩŨũƠơƯưẠạẢảẤấẦầẨẩẪẫẬậẮắẰằẲẳẴẵẶặẸẹẺẻẼẽẾếỀềỂểỄễỆệỈỉỊịỌọỎỏỐốỒồỔổỖỗỘộỚớỜờỞởỠỡỢợỤụỦủỨứỪừỬửỮữỰựỲỳỴỵỶỷỸỹ",
+    "AAAAEEEIIOOOOUUYaaaaeeeiioooouuyAaDdIiUuOoUuAaAaAaAaAaAaAaAaAaAaAaAaEeEeEeEeEeEeEeEeIiIiOoOoOoOoOoOoOoOoOoOoOoOoUuUuUuUuUuUuUuYyYyYyYy",
+)
+
+
+def normalize_search_text(input_str: str) -> str:
+    return unicodedata.normalize("NFC", input_str).translate(VIETNAMESE_ACCENTS).lower()
+
+
+def upgrade() -> None:
+    op.add_column("chat_message", sa.Column("search_text", sa.NVARCHAR(), nullable=True))
+    op.create_index("ux_chat_message_id", "chat_message", ["id"], unique=True)
+
+    # Backfill the search text of the existing chat messages. The offloaded messages are indexed by their inline
+    # preview only, their full content stays in the object storage.
+    connection = op.get_bind()
+    while True:
+        rows = connection.execute(
+            sa.text(
+                "SELECT TOP (:batch_size) id, message FROM chat_message WHERE search_text IS NULL"
+            ),
+            {"batch_size": BACKFILL_BATCH_SIZE},
+        ).fetchall()
+        if not rows:
+            break
+
+        connection.execute(
+            sa.text("UPDATE chat_message SET search_text = :search_text WHERE id = :id"),
+            [
+                {"id": id, "search_text": normalize_search_text(input_str=message)}
+                for id, message in rows
+            ],
+        )
+
+    # Full-text statements cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        op.execute("CREATE FULLTEXT CATALOG ft_chat_message WITH ACCENT_SENSITIVITY = OFF")
+        op.execute(
+            "CREATE FULLTEXT INDEX ON chat_message (search_text LANGUAGE 0) "
+            "KEY INDEX ux_chat_message_id ON ft_chat_message "
+            "WITH (CHANGE_TRACKING = AUTO, STOPLIST = OFF)"
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP FULLTEXT INDEX ON chat_message")
+        op.execute("DROP FULLTEXT CATALOG ft_chat_message")
+
+    op.drop_index("ux_chat_message_id", table_name="chat_message")
+    op.drop_column("chat_message", "search_text")
@@ -0,0 +1,35 @@
+"""add column content_hash in table document
+
+Revision ID: f2a8d5c1e9b3
+Revises: e7c4a9d2b6f1
+Create Date: 2026-10-18 21:52:08.617240
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "f2a8d5c1e9b3"
+down_revision: Union[str, None] = "e7c4a9d2b6f1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("document", sa.Column("content_hash", sa.String(length=64), nullable=True))
+    op.create_index(
+        "ux_document_content_hash",
+        "document",
+        ["content_hash"],
+        unique=True,
+        mssql_where=sa.text("content_hash IS NOT NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ux_document_content_hash", table_name="document")
+    op.drop_column("document", "content_hash")
@@ -82,4 +82,6 @@ def on_setup_logging(loglevel: Any, logfile: Any, format: Any, colorize: Any, **
 
 
 # Auto-discover tasks
-background_app.autodiscover_tasks(["app.background.tasks.indexing"])
+background_app.autodiscover_tasks(
+    ["app.background.tasks.indexing", "app.background.tasks.retention"]
+)
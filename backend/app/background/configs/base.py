@@ -1,3 +1,5 @@
+from celery.schedules import crontab
+
 from app.settings import Constants
 from app.settings import Secrets
 from app.settings.constants import CeleryPriority
@@ -71,3 +73,13 @@ worker_pool = Constants.CELERY_WORKER_POOL
 
 # Defines how many tasks a worker prefetches at a time.
 worker_prefetch_multiplier = Constants.CELERY_WORKER_PREFETCH_MULTIPLIER
+
+## Celery beat configurations
+
+# Periodic tasks run by the beat scheduler, in UTC.
+beat_schedule = {
+    Constants.PURGE_EXPIRED_CHATS: {
+        "task": Constants.PURGE_EXPIRED_CHATS,
+        "schedule": crontab(hour=Constants.PURGE_EXPIRED_CHATS_HOUR, minute=0),
+    },
+}
@@ -1,52 +1,121 @@
+import tempfile
 from typing import Any
 from typing import Dict
+from typing import Optional
+
+from celery import Task
 
 from app.background.celery_worker import background_app
 from app.databases.minio import MinioConnector
+from app.databases.mssql import SessionLocal
 from app.databases.qdrant import QdrantConnector
 from app.databases.redis import RedisConnector
+from app.integrations.llama_index.engines import invalidate_semantic_answer_cache
 from app.integrations.llama_index.ingestion_pipelines import IndexingPipeline
+from app.models.document import IndexStatus
+from app.repositories.document import DocumentRepository
 from app.settings import Constants
 from app.utils.api.helpers import get_logger
 
 logger = get_logger(__name__)
 
 
-@background_app.task(name=Constants.RUN_INDEXING)
+def _update_index_status(document_id: str, task_id: str, index_status: IndexStatus) -> None:
+    """
+    Record the indexing state of the document in its own session.
+
+    Args:
+        document_id (str): Id of the document row.
+        task_id (str): Id of the indexing background task.
+        index_status (IndexStatus): Indexing state of the document.
+    """
+    with SessionLocal() as db_session:
+        if err := DocumentRepository(db_session=db_session).update_document_index_status(
+            document_id=document_id, task_id=task_id, index_status=index_status
+        ):
+            logger.error(
+                f"Failed to mark document {document_id} as {index_status.value}: {err.kind}"
+            )
+        else:
+            db_session.commit()
+
+
+@background_app.task(name=Constants.RUN_INDEXING, bind=True)
 def run_indexing(
+    self: Task,
     file_path: str,
     metadata: Dict[str, Any] = {},
+    document_id: Optional[str] = None,
+    document_key: Optional[str] = None,
 ) -> None:
     """
     Run indexing task to embed documents into vector database.
+    A document indexed again, e.g. after a failure, is re-indexed incrementally, chunk by chunk.
+    The index status of the document is updated as the task runs, and it is marked as synced only once it is
+    indexed completely.
 
     Args:
         file_path (str): Path to the document file to be indexed.
         metadata (Dict[str, Any]): Metadata for the embedding vector.
+        document_id (Optional[str]): Id of the document row, whose index status is updated. Defaults to None.
+        document_key (Optional[str]): Key of the incremental indexing, shared by the versions of the document.
+            Defaults to the document id, None without document (full indexing).
     """
     minio_connector = MinioConnector()
     qdrant_connector = QdrantConnector()
     redis_connector = RedisConnector()
 
     logger.info(f"Indexing task for document {file_path} started")
+    if document_id:
+        _update_index_status(
+            document_id=document_id, task_id=self.request.id, index_status=IndexStatus.IN_PROGRESS
+        )
+
+    report = None
+    try:
+        # Spool the document from the object storage to a temporary file, it is never fully loaded in memory
+        with tempfile.NamedTemporaryFile(suffix=".pdf") as document_file:
+            logger.info(f"Retrieving document {file_path} from Minio.")
+            if not minio_connector.download_file(
+                object_name=file_path,
+                bucket_name=Constants.MINIO_DOCUMENT_BUCKET,
+                file=document_file,
+            ):
+                logger.error(f"Failed to retrieve document {file_path} from Minio")
+                return
+
+            # Run the indexing pipeline to embed the document into the vector database, by batches of pages.
+            # The file is passed by path, so that the parsing processes open it themselves.
+            logger.info(f"Running indexing pipeline for document {file_path}")
+            indexing_pipeline = IndexingPipeline(
+                qdrant_connector=qdrant_connector,
+                redis_connector=redis_connector,
+            )
+            report = indexing_pipeline.run_streaming(
+                file=document_file.name,
+                metadata=metadata,
+                document_key=document_key or document_id,
+            )
+            if report is None:
+                logger.error(f"Indexing task for document {file_path} failed")
+            else:
+                logger.info(
+                    f"Indexed document {file_path}: {report['reused']} chunks reused, "
+                    f"{report['added']} added, {report['removed']} removed"
+                )
+    finally:
+        # Record the indexing outcome, so that the re-uploads of the same content are not indexed again.
+        # A failed document is indexed again on its next upload.
+        if document_id:
+            _update_index_status(
+                document_id=document_id,
+                task_id=self.request.id,
+                index_status=IndexStatus.SUCCESS if report is not None else IndexStatus.FAILED,
+            )
 
-    # Get the document from the object storage
-    logger.info(f"Retrieving document {file_path} from Minio.")
-    document = minio_connector.get_file(
-        object_name=file_path,
-        bucket_name=Constants.MINIO_DOCUMENT_BUCKET,
-    )
-    if document is None:
-        logger.error(f"Failed to retrieve document {file_path} from Minio", exc_info=True)
-        return
-
-    # Run the indexing pipeline to embed the document into the vector database
-    logger.info(f"Running indexing pipeline for document {file_path}")
-    indexing_pipeline = IndexingPipeline(
-        qdrant_connector=qdrant_connector,
-        redis_connector=redis_connector,
-    )
-    indexing_pipeline.run(document=document, metadata=metadata)
+    # The cached answers may be outdated once the collection has changed
+    if report is not None and (report["added"] or report["removed"]):
+        invalidate_semantic_answer_cache(redis_client=redis_connector.get_client())
 
     # Create storage context and vector store index
     # vector_params = VectorParams(size=Constants.DIMENSIONS, distance=Constants.DISTANCE_METRIC_TYPE)
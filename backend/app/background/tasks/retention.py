@@ -0,0 +1,37 @@
+import time
+from typing import Any
+from typing import Dict
+
+from app.background.celery_worker import background_app
+from app.databases.mssql import SessionLocal
+from app.services.chat import ChatService
+from app.settings import Constants
+from app.utils.api.helpers import get_logger
+
+logger = get_logger(__name__)
+
+
+@background_app.task(name=Constants.PURGE_EXPIRED_CHATS)
+def purge_expired_chats() -> Dict[str, Any]:
+    """
+    Periodic task to delete the chat messages and chat sessions older than the chat retention of their users.
+
+    Returns:
+        Dict[str, Any]: Number of purged chat messages and chat sessions, and the time taken in seconds.
+    """
+    logger.info("Purging expired chats started")
+    start = time.monotonic()
+
+    with SessionLocal() as db_session:
+        purged, err = ChatService(db_session=db_session).purge_expired_chats()
+
+    report = {**purged, "elapsed_seconds": round(time.monotonic() - start, 3)}
+    if err:
+        logger.error(f"Purging expired chats stopped on error: {err.kind}", extra=report)
+    else:
+        logger.info(
+            f"Purging expired chats completed: {purged['chat_messages']} chat messages and "
+            f"{purged['chat_sessions']} chat sessions in {report['elapsed_seconds']} seconds"
+        )
+
+    return report
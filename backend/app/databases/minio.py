@@ -7,6 +7,7 @@ from minio import Minio
 from minio.error import S3Error
 
 from app.databases.base import BaseConnector
+from app.settings import Constants
 from app.settings import Secrets
 from app.utils.api.helpers import get_logger
 
@@ -99,6 +100,42 @@ class MinioConnector(BaseConnector[Minio]):
             logger.error(f"Unexpected error getting file '{object_name}': {e}", exc_info=True)
             return None
 
+    def download_file(self, object_name: str, bucket_name: str, file: BinaryIO) -> bool:
+        """
+        Download a file from object storage into a file object, by chunks, so that it is never fully loaded in memory.
+
+        Args:
+            object_name (str): Object name.
+            bucket_name (str): Bucket name.
+            file (BinaryIO): File object to write to, e.g. a temporary file.
+
+        Returns:
+            bool: True if the file is downloaded successfully, False otherwise.
+
+        Raises:
+            ValueError: If required attributes are missing.
+        """
+        if not object_name or not bucket_name:
+            raise ValueError("Missing required attributes: object_name, bucket_name")
+
+        response = None
+        try:
+            response = self.client.get_object(bucket_name=bucket_name, object_name=object_name)
+            for chunk in response.stream(Constants.MINIO_DOWNLOAD_CHUNK_SIZE):
+                file.write(chunk)
+            file.flush()
+            return True
+        except S3Error as e:
+            logger.error(f"S3 error downloading file '{object_name}': {e}", exc_info=True)
+            return False
+        except Exception as e:
+            logger.error(f"Unexpected error downloading file '{object_name}': {e}", exc_info=True)
+            return False
+        finally:
+            if response is not None:
+                response.close()
+                response.release_conn()
+
     def upload_file(
         self, object_name: str, data: BinaryIO, bucket_name: str, length: int = None
     ) -> bool:
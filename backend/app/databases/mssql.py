@@ -1,7 +1,13 @@
+from collections.abc import AsyncGenerator
 from collections.abc import Generator
+from typing import Optional
 
 from sqlalchemy.engine import create_engine
 from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import create_async_engine
 from sqlalchemy.orm import Session
 from sqlalchemy.orm import sessionmaker
 
@@ -23,6 +29,8 @@ class MSSQLConnector(BaseConnector[Engine]):
 
     _o = Secrets
     _required_keys = ["MSSQL_USER", "MSSQL_SA_PASSWORD", "MSSQL_HOST", "MSSQL_DB"]
+    _async_engine: Optional[AsyncEngine] = None
+    _read_engine: Optional[Engine] = None
 
     @classmethod
     def _create_client(cls) -> Engine:
@@ -65,6 +73,92 @@ class MSSQLConnector(BaseConnector[Engine]):
 
         return cls._client
 
+    @classmethod
+    def _create_read_engine(cls) -> Optional[Engine]:
+        """
+        Create the read-only database connection to the read replica, if a read replica is configured
+
+        Returns:
+            Optional[Engine]: Read-only database connection instance, None if there is no read replica
+        """
+        if not Secrets.MSSQL_READ_HOST:
+            return None
+
+        try:
+            url = Constants.MSSQL_READ_CONNECTOR_URI.format(
+                user=Secrets.MSSQL_USER,
+                password=Secrets.MSSQL_SA_PASSWORD,
+                host=Secrets.MSSQL_READ_HOST,
+                port=Secrets.MSSQL_READ_PORT,
+                db_name=Secrets.MSSQL_DB,
+                driver=Constants.MSSQL_DRIVER,
+            )
+            return create_engine(
+                url=url,
+                pool_size=Constants.MSSQL_POOL_SIZE,
+                max_overflow=Constants.MSSQL_MAX_OVERFLOW,
+                pool_timeout=Constants.MSSQL_POOL_TIMEOUT,
+                pool_recycle=Constants.MSSQL_POOL_RECYCLE,
+            )
+        except Exception as e:
+            logger.error(f"Error initializing read-only database: {e}", exc_info=True)
+
+    @classmethod
+    def get_read_engine(cls) -> Engine:
+        """
+        Get the read-only database connection instance.
+        Falls back to the primary database connection if there is no read replica.
+
+        Returns:
+            Engine: Read-only database connection instance
+        """
+        if not cls._read_engine:
+            with cls._lock:
+                cls._read_engine = cls._create_read_engine()
+
+        return cls._read_engine or cls.get_engine()
+
+    @classmethod
+    def _create_async_engine(cls) -> AsyncEngine:
+        """
+        Create the async database connection (aioodbc) if there is no any existing connection
+
+        Returns:
+            AsyncEngine: Async database connection instance
+        """
+        try:
+            url = Constants.MSSQL_ASYNC_CONNECTOR_URI.format(
+                user=Secrets.MSSQL_USER,
+                password=Secrets.MSSQL_SA_PASSWORD,
+                host=Secrets.MSSQL_HOST,
+                port=Secrets.MSSQL_PORT,
+                db_name=Secrets.MSSQL_DB,
+                driver=Constants.MSSQL_DRIVER,
+            )
+            return create_async_engine(
+                url=url,
+                pool_size=Constants.MSSQL_POOL_SIZE,
+                max_overflow=Constants.MSSQL_MAX_OVERFLOW,
+                pool_timeout=Constants.MSSQL_POOL_TIMEOUT,
+                pool_recycle=Constants.MSSQL_POOL_RECYCLE,
+            )
+        except Exception as e:
+            logger.error(f"Error initializing async database: {e}", exc_info=True)
+
+    @classmethod
+    def get_async_engine(cls) -> AsyncEngine:
+        """
+        Get the async database connection instance
+
+        Returns:
+            AsyncEngine: Async database connection instance
+        """
+        if not cls._async_engine:
+            with cls._lock:
+                cls._async_engine = cls._create_async_engine()
+
+        return cls._async_engine
+
 
 # Create a session maker
 SessionLocal = sessionmaker(
@@ -75,6 +169,24 @@ SessionLocal = sessionmaker(
     autocommit=False,
 )
 
+# Create a session maker for the read-only operations, which may lag behind the primary database.
+# It must not be used where the request reads its own writes, e.g. the chat flow.
+ReadSessionLocal = sessionmaker(
+    bind=MSSQLConnector.get_read_engine(),
+    expire_on_commit=False,
+    class_=Session,
+    autoflush=False,
+    autocommit=False,
+)
+
+# Create an async session maker
+AsyncSessionLocal = async_sessionmaker(
+    bind=MSSQLConnector.get_async_engine(),
+    expire_on_commit=False,
+    class_=AsyncSession,
+    autoflush=False,
+)
+
 
 def get_db_session() -> Generator[Session]:
     """
@@ -94,3 +206,43 @@ def get_db_session() -> Generator[Session]:
             raise e
         finally:
             session.close()
+
+
+def get_read_db_session() -> Generator[Session]:
+    """
+    Provides a scope around a series of read-only operations, served by the read replica if any.
+
+    Yields:
+        Session: Read-only database session
+
+    Raises:
+        Exception: Any exception that occurs during the database session
+    """
+    with ReadSessionLocal() as session:
+        try:
+            yield session
+        except Exception as e:
+            logger.error(f"An unexpected error during read-only database session: {str(e)}")
+            raise e
+        finally:
+            session.close()
+
+
+async def get_async_db_session() -> AsyncGenerator[AsyncSession]:
+    """
+    Provides an async transactional scope around a series of operations.
+
+    Yields:
+        AsyncSession: Async database session
+
+    Raises:
+        Exception: Any exception that occurs during the database session
+    """
+    async with AsyncSessionLocal() as session:
+        try:
+            yield session
+        except Exception as e:
+            logger.error(f"An unexpected error during async database session: {str(e)}")
+            raise e
+        finally:
+            await session.close()
@@ -1,7 +1,14 @@
+import asyncio
+from collections.abc import AsyncGenerator
+from typing import Dict
+from typing import Tuple
+
 from fastapi import Request
 from llama_index.storage.kvstore.redis import RedisKVStore as RedisCache
 from redis import ConnectionPool
 from redis import Redis
+from redis.asyncio import BlockingConnectionPool as AsyncBlockingConnectionPool
+from redis.asyncio import Redis as AsyncRedis
 
 from app.databases.base import BaseConnector
 from app.settings import Constants
@@ -21,6 +28,10 @@ class RedisConnector(BaseConnector[Redis]):
 
     _o = Secrets
     _required_keys = ["REDIS_HOST", "REDIS_PORT"]
+    # Async clients keyed by their event loop and their name, along with the async generator closing them when their event loop shuts down
+    _async_clients: Dict[
+        Tuple[asyncio.AbstractEventLoop, str], Tuple[AsyncRedis, AsyncGenerator[None, None]]
+    ] = {}
 
     @staticmethod
     def _create_connection_pool() -> ConnectionPool | None:
@@ -54,6 +65,132 @@ class RedisConnector(BaseConnector[Redis]):
         except Exception as e:
             logger.error(f"Error initializing Redis connection: {e}", exc_info=True)
 
+    @property
+    def async_client(self) -> AsyncRedis:
+        """
+        Get the async client instance of the running event loop.
+
+        Returns:
+            AsyncRedis: Async Redis client instance
+        """
+        return self._get_async_client(
+            name="default", max_connections=Constants.REDIS_MAX_CONNECTIONS
+        )
+
+    @property
+    def stream_async_client(self) -> AsyncRedis:
+        """
+        Get the async client instance dedicated to the blocking reads of the chat streams, of the running event loop.
+        Each tailing client holds a connection of this pool while it waits for new frames,
+        so the chat streams never starve the connections of the other commands.
+
+        Returns:
+            AsyncRedis: Async Redis client instance
+        """
+        return self._get_async_client(
+            name="stream", max_connections=Constants.REDIS_STREAM_MAX_CONNECTIONS
+        )
+
+    @classmethod
+    def _get_async_client(cls, name: str, max_connections: int) -> AsyncRedis:
+        """
+        Get the async client of the running event loop, creating it on the first call.
+        The async connections are bound to the event loop that opened them, so the workers running
+        coroutines with `asyncio.run` (e.g. the LlamaIndex extractors) get one client per event loop.
+        The client is closed when its event loop shuts down its async generators, as `asyncio.run` does,
+        and the clients of the closed event loops are dropped.
+
+        Args:
+            name (str): Name of the client, each client has a pool of its own
+            max_connections (int): Maximum number of connections of the pool
+
+        Returns:
+            AsyncRedis: Async Redis client instance
+
+        Raises:
+            RuntimeError: There is no running event loop.
+        """
+        loop = asyncio.get_running_loop()
+        for key in [key for key in cls._async_clients if key[0].is_closed()]:
+            del cls._async_clients[key]
+
+        key = (loop, name)
+        if key not in cls._async_clients:
+            async_client = cls._create_async_client(max_connections=max_connections)
+            closer = cls._close_on_shutdown(async_client=async_client)
+            # Start the closer, so that it is registered to the event loop and finalized on its shutdown
+            loop.create_task(anext(closer))
+            cls._async_clients[key] = (async_client, closer)
+
+        return cls._async_clients[key][0]
+
+    @staticmethod
+    async def _close_on_shutdown(async_client: AsyncRedis) -> AsyncGenerator[None, None]:
+        """
+        Suspend until the event loop shuts down its async generators, then close the async client and its pool.
+
+        Args:
+            async_client (AsyncRedis): Async Redis client instance
+
+        Yields:
+            None: Once, the generator is never resumed.
+        """
+        try:
+            yield
+        finally:
+            try:
+                await async_client.aclose(close_connection_pool=True)
+            except Exception as e:
+                logger.warning(f"Error closing the async Redis client: {e}")
+
+    @staticmethod
+    def _create_async_client(max_connections: int) -> AsyncRedis:
+        """
+        Create an async client whose commands wait for a free connection once the pool is exhausted,
+        instead of failing with "Too many connections".
+
+        Args:
+            max_connections (int): Maximum number of connections of the pool
+
+        Returns:
+            AsyncRedis: Async Redis client instance
+        """
+        connection_pool = AsyncBlockingConnectionPool(
+            host=Secrets.REDIS_HOST,
+            port=Secrets.REDIS_PORT,
+            db=Constants.REDIS_DB_NUM,
+            max_connections=max_connections,
+            timeout=Constants.REDIS_POOL_TIMEOUT,
+        )
+        return AsyncRedis(connection_pool=connection_pool)
+
+    def get_client(self) -> Redis:
+        """
+        Get the client instance
+
+        Returns:
+            Redis: Redis client instance
+        """
+        return self.client
+
+    def get_aclient(self) -> AsyncRedis:
+        """
+        Get the async client instance
+
+        Returns:
+            AsyncRedis: Async Redis client instance
+        """
+        return self.async_client
+
+    def get_stream_aclient(self) -> AsyncRedis:
+        """
+        Get the async client instance of the chat streams
+
+        Returns:
+            AsyncRedis: Async Redis client instance
+        """
+        return self.stream_async_client
+
     def get_cache_store(self) -> RedisCache:
         """
         Get the cache store instance
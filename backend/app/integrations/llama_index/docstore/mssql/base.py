@@ -1,4 +1,5 @@
 from typing import Optional
+from typing import Set
 
 from llama_index.core.storage.docstore.keyval_docstore import KVDocumentStore
 from llama_index.core.storage.docstore.types import DEFAULT_BATCH_SIZE
@@ -122,3 +123,12 @@ class MSSQLDocumentStore(KVDocumentStore):
             session=session, perform_setup=perform_setup, debug=debug
         )
         return cls(mssql_kvstore, namespace)
+
+    def get_all_document_ids(self) -> Set[str]:
+        """
+        Get the ids of all the documents with a stored hash, in a single query.
+
+        Returns:
+            Set[str]: Ids of the documents.
+        """
+        return set(self._kvstore.get_all(collection=self._metadata_collection))
@@ -1 +1,19 @@
-__all__ = []
+from app.integrations.llama_index.engines.chat import ChatEngineFactory
+from app.integrations.llama_index.engines.condense import CachedCondensePlusContextChatEngine
+from app.integrations.llama_index.engines.condense import CondenseOutcome
+from app.integrations.llama_index.engines.condense import get_condense_stats
+from app.integrations.llama_index.engines.condense import QuestionCondenser
+from app.integrations.llama_index.engines.semantic_cache import invalidate_semantic_answer_cache
+from app.integrations.llama_index.engines.semantic_cache import reset_semantic_answer_cache
+from app.integrations.llama_index.engines.semantic_cache import SemanticAnswerCache
+
+__all__ = [
+    "CachedCondensePlusContextChatEngine",
+    "ChatEngineFactory",
+    "CondenseOutcome",
+    "QuestionCondenser",
+    "SemanticAnswerCache",
+    "get_condense_stats",
+    "invalidate_semantic_answer_cache",
+    "reset_semantic_answer_cache",
+]
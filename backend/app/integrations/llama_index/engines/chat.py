@@ -0,0 +1,197 @@
+import threading
+from collections import OrderedDict
+from typing import Any
+from typing import Dict
+from typing import Hashable
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from llama_index.core import Settings
+from llama_index.core.memory import ChatMemoryBuffer
+from llama_index.core.prompts import PromptTemplate
+from llama_index.core.types import ChatMessage as LlamaIndexChatMessage
+
+from app.databases.qdrant import QdrantConnector
+from app.databases.redis import RedisConnector
+from app.integrations.llama_index.engines.condense import CachedCondensePlusContextChatEngine
+from app.integrations.llama_index.engines.condense import QuestionCondenser
+from app.integrations.llama_index.indices import get_retriever
+from app.integrations.llama_index.llms import RateLimitedLLM
+from app.models import Agent
+from app.settings import Constants
+from app.utils.api.helpers import get_logger
+
+logger = get_logger(__name__)
+
+
+class ChatEngineFactory:
+    """
+    Chat engine factory class
+
+    Pattern: Singleton (class-level cache)
+    Purpose: Build the request-independent parts of the chat engine (prompt templates, retriever,
+    LLM handle and question condenser) once per agent and provider configuration, so that creating a chat engine on the
+    request hot path only binds the chat history.
+    """
+
+    _components: "OrderedDict[Tuple[Hashable, ...], Dict[str, Any]]" = OrderedDict()
+    _lock = threading.Lock()
+
+    @staticmethod
+    def _get_cache_key(agent: Optional[Agent] = None) -> Tuple[Hashable, ...]:
+        """
+        Get the cache key of the chat engine components.
+        The key changes whenever the agent configuration or the configured LLM / embedding model changes.
+
+        Args:
+            agent (Optional[Agent]): Agent of the chat session. Defaults to None.
+
+        Returns:
+            Tuple[Hashable, ...]: Cache key.
+        """
+        llm = Settings.llm
+        return (
+            str(agent.id) if agent else None,
+            (agent.prompt or None) if agent else None,
+            bool(agent.skip_condense) if agent else False,
+            type(llm).__name__,
+            llm.metadata.model_name,
+            id(llm),
+            id(Settings.embed_model),
+        )
+
+    @staticmethod
+    def _build_system_prompt(agent_prompt: Optional[str] = None) -> str:
+        """
+        Fold the agent prompt into the system prompt of the chat engine.
+
+        Args:
+            agent_prompt (Optional[str]): Agent prompt. Defaults to None.
+
+        Returns:
+            str: System prompt.
+        """
+        if not agent_prompt or not agent_prompt.strip():
+            return Constants.CHAT_ENGINE_SYSTEM_PROMPT
+
+        return f"{Constants.CHAT_ENGINE_SYSTEM_PROMPT}\n\n    Agent instructions:\n    {agent_prompt.strip()}"
+
+    @classmethod
+    def _build_components(
+        cls,
+        agent: Optional[Agent] = None,
+        qdrant_connector: Optional[QdrantConnector] = None,
+        redis_connector: Optional[RedisConnector] = None,
+    ) -> Dict[str, Any]:
+        """
+        Build the request-independent components of the chat engine.
+
+        Args:
+            agent (Optional[Agent]): Agent of the chat session. Defaults to None.
+            qdrant_connector (Optional[QdrantConnector]): Vector database connection. Defaults to None.
+            redis_connector (Optional[RedisConnector]): Cache store connection. Defaults to None.
+
+        Returns:
+            Dict[str, Any]: Keyword arguments of the chat engine, except the memory.
+        """
+        llm = RateLimitedLLM.from_llm(Settings.llm)
+        condense_prompt = PromptTemplate(Constants.CHAT_ENGINE_CONDENSE_PROMPT)
+        redis_connector = redis_connector or RedisConnector()
+
+        return {
+            "retriever": get_retriever(
+                similarity_top_k=Constants.SIMILARITY_TOP_K, qdrant_connector=qdrant_connector
+            ),
+            "llm": llm,
+            "callback_manager": Settings.callback_manager,
+            "system_prompt": cls._build_system_prompt(agent_prompt=agent.prompt if agent else None),
+            "context_prompt": PromptTemplate(Constants.CHAT_ENGINE_CONTEXT_PROMPT),
+            "context_refine_prompt": PromptTemplate(Constants.CHAT_ENGINE_CONTEXT_REFINE_PROMPT),
+            "condense_prompt": condense_prompt,
+            "skip_condense": bool(agent.skip_condense) if agent else False,
+            "condenser": QuestionCondenser(
+                llm=llm,
+                condense_prompt=condense_prompt,
+                redis_connector=redis_connector,
+            ),
+        }
+
+    @classmethod
+    def _get_components(
+        cls,
+        agent: Optional[Agent] = None,
+        qdrant_connector: Optional[QdrantConnector] = None,
+        redis_connector: Optional[RedisConnector] = None,
+    ) -> Dict[str, Any]:
+        """
+        Get the cached components of the chat engine, building them on a cache miss.
+
+        Args:
+            agent (Optional[Agent]): Agent of the chat session. Defaults to None.
+            qdrant_connector (Optional[QdrantConnector]): Vector database connection. Defaults to None.
+            redis_connector (Optional[RedisConnector]): Cache store connection. Defaults to None.
+
+        Returns:
+            Dict[str, Any]: Keyword arguments of the chat engine, except the memory.
+        """
+        key = cls._get_cache_key(agent=agent)
+
+        with cls._lock:
+            components = cls._components.get(key)
+            if components is not None:
+                cls._components.move_to_end(key)
+                return components
+
+        logger.info(f"Building chat engine components for agent {agent.id if agent else None}")
+        components = cls._build_components(
+            agent=agent, qdrant_connector=qdrant_connector, redis_connector=redis_connector
+        )
+
+        with cls._lock:
+            cls._components[key] = components
+            while len(cls._components) > Constants.CHAT_ENGINE_CACHE_SIZE:
+                cls._components.popitem(last=False)
+
+        return components
+
+    @classmethod
+    def get_chat_engine(
+        cls,
+        chat_history: List[LlamaIndexChatMessage],
+        agent: Optional[Agent] = None,
+        qdrant_connector: Optional[QdrantConnector] = None,
+        redis_connector: Optional[RedisConnector] = None,
+    ) -> CachedCondensePlusContextChatEngine:
+        """
+        Get a chat engine bound to the chat history of the current request.
+
+        Args:
+            chat_history (List[LlamaIndexChatMessage]): The LlamaIndex chat history of the chat session.
+            agent (Optional[Agent]): Agent of the chat session. Defaults to None.
+            qdrant_connector (Optional[QdrantConnector]): Vector database connection. Defaults to None.
+            redis_connector (Optional[RedisConnector]): Cache store connection. Defaults to None.
+
+        Returns:
+            CachedCondensePlusContextChatEngine: Chat engine.
+        """
+        components = cls._get_components(
+            agent=agent, qdrant_connector=qdrant_connector, redis_connector=redis_connector
+        )
+
+        # Bind the per-request chat history
+        llm = components["llm"]
+        memory = ChatMemoryBuffer.from_defaults(
+            chat_history=chat_history,
+            token_limit=llm.metadata.context_window - 256,
+        )
+
+        return CachedCondensePlusContextChatEngine(memory=memory, **components)
+
+    @classmethod
+    def clear(cls) -> None:
+        """
+        Clear the cached components of every chat engine.
+        """
+        with cls._lock:
+            cls._components.clear()
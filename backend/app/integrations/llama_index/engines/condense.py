@@ -0,0 +1,269 @@
+import hashlib
+import json
+from enum import Enum
+from typing import Dict
+from typing import List
+from typing import Optional
+
+from llama_index.core.base.llms.generic_utils import messages_to_history_str
+from llama_index.core.chat_engine import CondensePlusContextChatEngine
+from llama_index.core.llms.llm import LLM
+from llama_index.core.prompts import PromptTemplate
+from llama_index.core.schema import NodeWithScore
+from llama_index.core.schema import QueryBundle
+from llama_index.core.types import ChatMessage as LlamaIndexChatMessage
+from redis import Redis
+
+from app.databases.redis import RedisConnector
+from app.settings import Constants
+from app.utils.api.helpers import get_logger
+
+logger = get_logger(__name__)
+
+
+class CondenseOutcome(str, Enum):
+    """
+    Enumeration of the outcomes of the condense stage.
+
+    Every outcome except MISS means that the condense LLM call was saved.
+        - SKIPPED_EMPTY_HISTORY: First turn of the chat session, the message is already standalone.
+        - SKIPPED_BY_AGENT: The agent is configured not to condense questions.
+        - HIT: The condensed question was found in the cache.
+        - MISS: The condensed question was generated by the LLM.
+    """
+
+    SKIPPED_EMPTY_HISTORY = "skipped_empty_history"
+    SKIPPED_BY_AGENT = "skipped_by_agent"
+    HIT = "hit"
+    MISS = "miss"
+
+
+class QuestionCondenser:
+    def __init__(
+        self,
+        llm: LLM,
+        condense_prompt: PromptTemplate,
+        redis_connector: Optional[RedisConnector] = None,
+        history_tail: int = Constants.CHAT_ENGINE_CONDENSE_HISTORY_TAIL,
+        ttl: int = Constants.CHAT_ENGINE_CONDENSE_CACHE_TTL,
+    ):
+        """
+        Condense the chat history and the latest message into a standalone question.
+        The condensed questions are cached in Redis, keyed by a hash of the chat history tail and the message.
+
+        Args:
+            llm (LLM): LLM used to condense the question.
+            condense_prompt (PromptTemplate): Condense prompt template.
+            redis_connector (Optional[RedisConnector]): Redis connector. Defaults to None (no caching).
+                The async client is got on every call, as it is bound to the running event loop.
+            history_tail (int): Number of latest chat messages used to condense the question. Defaults to 6.
+            ttl (int): Time to live of the cached condensed question in seconds. Defaults to 1 day.
+        """
+        self._llm = llm
+        self._condense_prompt = condense_prompt
+        self._redis_connector = redis_connector
+        self._history_tail = history_tail
+        self._ttl = ttl
+
+    def _get_cache_key(self, chat_history: List[LlamaIndexChatMessage], latest_message: str) -> str:
+        """
+        Get the cache key of the condensed question.
+
+        Args:
+            chat_history (List[LlamaIndexChatMessage]): Chat history tail.
+            latest_message (str): Latest user message.
+
+        Returns:
+            str: Cache key.
+        """
+        payload = json.dumps(
+            {
+                "model": self._llm.metadata.model_name,
+                "history": [(str(message.role), message.content) for message in chat_history],
+                "message": latest_message,
+            },
+            ensure_ascii=False,
+        )
+        digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+        return f"{Constants.CHAT_ENGINE_CONDENSE_CACHE_PREFIX}:{digest}"
+
+    async def _record(self, outcome: CondenseOutcome) -> None:
+        """
+        Increase the counter of the condense outcome.
+
+        Args:
+            outcome (CondenseOutcome): Outcome of the condense stage.
+        """
+        if self._redis_connector is None:
+            return
+
+        try:
+            await self._redis_connector.get_aclient().hincrby(
+                Constants.CHAT_ENGINE_CONDENSE_STATS_KEY, outcome.value, 1
+            )
+        except Exception as e:
+            logger.warning(f"Failed to record condense outcome {outcome.value}: {e}")
+
+    async def acondense(
+        self,
+        chat_history: List[LlamaIndexChatMessage],
+        latest_message: str,
+        skip_condense: bool = False,
+    ) -> str:
+        """
+        Condense the chat history and the latest message into a standalone question.
+
+        Args:
+            chat_history (List[LlamaIndexChatMessage]): Chat history of the chat session.
+            latest_message (str): Latest user message.
+            skip_condense (bool): Whether to use the latest message as is. Defaults to False.
+
+        Returns:
+            str: Standalone question.
+        """
+        if skip_condense:
+            await self._record(CondenseOutcome.SKIPPED_BY_AGENT)
+            return latest_message
+
+        if not chat_history:
+            await self._record(CondenseOutcome.SKIPPED_EMPTY_HISTORY)
+            return latest_message
+
+        chat_history = chat_history[-self._history_tail :]
+        cache_key = self._get_cache_key(chat_history=chat_history, latest_message=latest_message)
+
+        # Reuse the condensed question if the same turn was already condensed
+        if self._redis_connector is not None:
+            try:
+                condensed_question = await self._redis_connector.get_aclient().get(cache_key)
+                if condensed_question:
+                    await self._record(CondenseOutcome.HIT)
+                    return condensed_question.decode("utf-8")
+            except Exception as e:
+                logger.warning(f"Failed to get condensed question from cache: {e}")
+
+        llm_input = self._condense_prompt.format(
+            chat_history=messages_to_history_str(chat_history), question=latest_message
+        )
+        condensed_question = str(await self._llm.acomplete(llm_input)).strip() or latest_message
+        await self._record(CondenseOutcome.MISS)
+
+        if self._redis_connector is not None:
+            try:
+                await self._redis_connector.get_aclient().set(
+                    cache_key, condensed_question, ex=self._ttl
+                )
+            except Exception as e:
+                logger.warning(f"Failed to cache condensed question: {e}")
+
+        return condensed_question
+
+
+def get_condense_stats(redis_client: Redis) -> Dict[str, int]:
+    """
+    Get the counters of the condense stage, including the number of saved LLM calls.
+
+    Args:
+        redis_client (Redis): Redis client.
+
+    Returns:
+        Dict[str, int]: Counter of each condense outcome and the number of saved LLM calls.
+    """
+    raw_stats = redis_client.hgetall(Constants.CHAT_ENGINE_CONDENSE_STATS_KEY)
+    stats = {outcome.value: 0 for outcome in CondenseOutcome}
+    stats.update({key.decode("utf-8"): int(value) for key, value in raw_stats.items()})
+    stats["saved_llm_calls"] = sum(
+        count for outcome, count in stats.items() if outcome != CondenseOutcome.MISS.value
+    )
+    return stats
+
+
+class CachedCondensePlusContextChatEngine(CondensePlusContextChatEngine):
+    """
+    Condense plus context chat engine whose condense stage is delegated to a `QuestionCondenser`,
+    so that the condense LLM call is skipped or served from the cache whenever possible.
+    The condensed question and its embedding are memoized, so that they can be computed ahead of
+    the chat (e.g. for the semantic answer cache) without being computed twice.
+    """
+
+    def __init__(self, *args, condenser: Optional[QuestionCondenser] = None, **kwargs):
+        """
+        Initialize the chat engine.
+
+        Args:
+            *args: Positional arguments of `CondensePlusContextChatEngine`.
+            condenser (Optional[QuestionCondenser]): Question condenser. Defaults to an uncached one.
+            **kwargs: Keyword arguments of `CondensePlusContextChatEngine`.
+        """
+        super().__init__(*args, **kwargs)
+        self._condenser = condenser or QuestionCondenser(
+            llm=self._llm, condense_prompt=self._condense_prompt_template
+        )
+        self._condensed_questions: Dict[str, str] = {}
+        self._query_embeddings: Dict[str, List[float]] = {}
+
+    async def acondense_question(self, message: str) -> str:
+        """
+        Condense the chat history of the engine and the message into a standalone question.
+
+        Args:
+            message (str): Latest user message.
+
+        Returns:
+            str: Standalone question.
+        """
+        chat_history = self._memory.get(input=message)
+        return await self._acondense_question(chat_history=chat_history, latest_message=message)
+
+    def set_query_embedding(self, query: str, embedding: List[float]) -> None:
+        """
+        Set the already computed embedding of a query, so that the retriever does not embed it again.
+
+        Args:
+            query (str): Query, i.e. the condensed question.
+            embedding (List[float]): Embedding of the query.
+        """
+        self._query_embeddings[query] = embedding
+
+    async def _acondense_question(
+        self, chat_history: List[LlamaIndexChatMessage], latest_message: str
+    ) -> str:
+        """
+        Condense the chat history and the latest message into a standalone question.
+
+        Args:
+            chat_history (List[LlamaIndexChatMessage]): Chat history of the chat session.
+            latest_message (str): Latest user message.
+
+        Returns:
+            str: Standalone question.
+        """
+        if latest_message not in self._condensed_questions:
+            self._condensed_questions[latest_message] = await self._condenser.acondense(
+                chat_history=chat_history,
+                latest_message=latest_message,
+                skip_condense=self._skip_condense,
+            )
+
+        return self._condensed_questions[latest_message]
+
+    async def _aget_nodes(self, message: str) -> List[NodeWithScore]:
+        """
+        Retrieve the context nodes of the message, reusing its embedding if already computed.
+
+        Args:
+            message (str): Condensed question.
+
+        Returns:
+            List[NodeWithScore]: Context nodes.
+        """
+        embedding = self._query_embeddings.get(message)
+        if embedding is None:
+            return await super()._aget_nodes(message)
+
+        query_bundle = QueryBundle(query_str=message, embedding=embedding)
+        nodes = await self._retriever.aretrieve(query_bundle)
+        for postprocessor in self._node_postprocessors:
+            nodes = postprocessor.postprocess_nodes(nodes, query_bundle=query_bundle)
+
+        return nodes
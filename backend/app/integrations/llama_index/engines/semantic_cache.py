@@ -0,0 +1,278 @@
+import hashlib
+import threading
+import time
+from typing import List
+from typing import Optional
+from typing import Set
+from typing import Tuple
+from uuid import NAMESPACE_URL
+from uuid import uuid5
+
+from llama_index.core.base.embeddings.base import BaseEmbedding
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.models import Distance
+from qdrant_client.models import FieldCondition
+from qdrant_client.models import Filter
+from qdrant_client.models import FilterSelector
+from qdrant_client.models import MatchValue
+from qdrant_client.models import PayloadSchemaType
+from qdrant_client.models import PointIdsList
+from qdrant_client.models import PointStruct
+from qdrant_client.models import Range
+from qdrant_client.models import VectorParams
+from redis import Redis
+from redis.asyncio import Redis as AsyncRedis
+
+from app.models import Agent
+from app.settings import Constants
+from app.utils.api.helpers import get_logger
+
+logger = get_logger(__name__)
+
+# Collections known to exist with their vector size, so that they are not checked on every request
+_ready_collections: Set[Tuple[str, int]] = set()
+_lock = threading.Lock()
+
+
+class SemanticAnswerCache:
+    def __init__(
+        self,
+        redis_client: AsyncRedis,
+        qdrant_client: AsyncQdrantClient,
+        embed_model: BaseEmbedding,
+        similarity_threshold: float = Constants.SEMANTIC_CACHE_SIMILARITY_THRESHOLD,
+        ttl: int = Constants.SEMANTIC_CACHE_TTL,
+        max_entries: int = Constants.SEMANTIC_CACHE_MAX_ENTRIES,
+    ):
+        """
+        Cache the answers of the chat engine, keyed by the agent and the embedding of the condensed question.
+        A cached answer is reused when a new question of the same agent is similar enough to a cached one.
+
+        The answers are points of a dedicated Qdrant collection, so that a lookup is a single filtered nearest
+        neighbour search. Every answer expires on its own after the TTL, and the least recently used answers
+        of an agent are evicted one by one beyond the maximum number of entries, tracked in a Redis sorted set.
+
+        Args:
+            redis_client (AsyncRedis): Async Redis client.
+            qdrant_client (AsyncQdrantClient): Async Qdrant client.
+            embed_model (BaseEmbedding): Embedding model used to embed the condensed questions.
+            similarity_threshold (float): Minimum cosine similarity of a hit. Defaults to 0.95.
+            ttl (int): Time to live of a cached answer in seconds. Defaults to 1 day.
+            max_entries (int): Maximum number of cached answers per agent. Defaults to 500.
+        """
+        self._redis_client = redis_client
+        self._qdrant_client = qdrant_client
+        self._embed_model = embed_model
+        self._similarity_threshold = similarity_threshold
+        self._ttl = ttl
+        self._max_entries = max_entries
+
+    async def _get_cache_key(self, agent: Optional[Agent] = None) -> str:
+        """
+        Get the cache key of the agent answers.
+        The key contains the generation of the cache, which is increased whenever the vector store changes.
+
+        Args:
+            agent (Optional[Agent]): Agent of the chat session. Defaults to None.
+
+        Returns:
+            str: Cache key.
+        """
+        generation = await self._redis_client.get(Constants.SEMANTIC_CACHE_GENERATION_KEY)
+        generation = int(generation) if generation else 0
+
+        # The agent prompt is part of the key, so that editing the agent does not serve stale answers
+        agent_id = str(agent.id) if agent else "default"
+        agent_prompt = agent.prompt if agent and agent.prompt else ""
+        prompt_digest = hashlib.sha256(agent_prompt.encode("utf-8")).hexdigest()[:16]
+
+        return (
+            f"{Constants.SEMANTIC_CACHE_PREFIX}:{generation}:{self._embed_model.model_name}"
+            f":{agent_id}:{prompt_digest}"
+        )
+
+    async def _ensure_collection(self, vector_size: int) -> None:
+        """
+        Create the cache collection and its payload indexes if they do not exist yet.
+        The collection is recreated if its vector size does not match the current embedding model.
+
+        Args:
+            vector_size (int): Size of the question embeddings.
+        """
+        collection_name = Constants.SEMANTIC_CACHE_COLLECTION
+        if (collection_name, vector_size) in _ready_collections:
+            return
+
+        is_collection_existed = await self._qdrant_client.collection_exists(
+            collection_name=collection_name
+        )
+        if is_collection_existed:
+            collection = await self._qdrant_client.get_collection(collection_name=collection_name)
+            if collection.config.params.vectors.size != vector_size:
+                # The cached answers are disposable, drop the ones of the previous embedding model
+                logger.info(f"Recreating {collection_name} with vector size {vector_size}")
+                await self._qdrant_client.delete_collection(collection_name=collection_name)
+                is_collection_existed = False
+
+        if not is_collection_existed:
+            await self._qdrant_client.create_collection(
+                collection_name=collection_name,
+                vectors_config=VectorParams(size=vector_size, distance=Distance.COSINE),
+            )
+            await self._qdrant_client.create_payload_index(
+                collection_name=collection_name,
+                field_name="cache_key",
+                field_schema=PayloadSchemaType.KEYWORD,
+            )
+            await self._qdrant_client.create_payload_index(
+                collection_name=collection_name,
+                field_name="expires_at",
+                field_schema=PayloadSchemaType.FLOAT,
+            )
+
+        with _lock:
+            _ready_collections.add((collection_name, vector_size))
+
+    async def alookup(
+        self, question: str, agent: Optional[Agent] = None
+    ) -> Tuple[Optional[str], List[float]]:
+        """
+        Look up the cached answer of the most similar question of the agent.
+
+        Args:
+            question (str): Condensed question.
+            agent (Optional[Agent]): Agent of the chat session. Defaults to None.
+
+        Returns:
+            Tuple[Optional[str], List[float]]: Cached answer if any and the embedding of the question,
+            which can be reused for retrieval and for `astore`.
+        """
+        embedding = await self._embed_model.aget_query_embedding(question)
+
+        try:
+            await self._ensure_collection(vector_size=len(embedding))
+            cache_key = await self._get_cache_key(agent=agent)
+            response = await self._qdrant_client.query_points(
+                collection_name=Constants.SEMANTIC_CACHE_COLLECTION,
+                query=embedding,
+                query_filter=Filter(
+                    must=[
+                        FieldCondition(key="cache_key", match=MatchValue(value=cache_key)),
+                        FieldCondition(key="expires_at", range=Range(gt=time.time())),
+                    ]
+                ),
+                limit=1,
+                score_threshold=self._similarity_threshold,
+                with_payload=["answer"],
+            )
+            if not response.points:
+                return None, embedding
+
+            # Mark the answer as recently used, so that it is the last one to be evicted
+            point = response.points[0]
+            await self._redis_client.zadd(f"{cache_key}:lru", {str(point.id): time.time()})
+        except Exception as e:
+            logger.warning(f"Failed to get cached answers: {e}")
+            return None, embedding
+
+        logger.info(f"Semantic cache hit with similarity {point.score:.4f}")
+        return point.payload["answer"], embedding
+
+    async def astore(
+        self,
+        question: str,
+        embedding: List[float],
+        answer: str,
+        agent: Optional[Agent] = None,
+    ) -> None:
+        """
+        Cache the answer of the condensed question.
+        The expired answers are deleted, and the least recently used answers of the agent are evicted
+        if the agent has more than the maximum number of cached answers.
+
+        Args:
+            question (str): Condensed question.
+            embedding (List[float]): Embedding of the condensed question.
+            answer (str): Complete answer of the chat engine.
+            agent (Optional[Agent]): Agent of the chat session. Defaults to None.
+        """
+        try:
+            await self._ensure_collection(vector_size=len(embedding))
+            cache_key = await self._get_cache_key(agent=agent)
+            point_id = str(uuid5(NAMESPACE_URL, f"{cache_key}:{question}"))
+            now = time.time()
+
+            await self._qdrant_client.upsert(
+                collection_name=Constants.SEMANTIC_CACHE_COLLECTION,
+                points=[
+                    PointStruct(
+                        id=point_id,
+                        vector=embedding,
+                        payload={
+                            "cache_key": cache_key,
+                            "question": question,
+                            "answer": answer,
+                            "expires_at": now + self._ttl,
+                        },
+                    )
+                ],
+                wait=False,
+            )
+
+            # Track the usage of the answer, then evict the least recently used ones beyond the limit
+            lru_key = f"{cache_key}:lru"
+            async with self._redis_client.pipeline(transaction=True) as pipeline:
+                pipeline.zadd(lru_key, {point_id: now})
+                pipeline.zremrangebyscore(lru_key, "-inf", now - self._ttl)
+                pipeline.zcard(lru_key)
+                pipeline.expire(lru_key, self._ttl)
+                _, _, entry_count, _ = await pipeline.execute()
+
+            evicted_ids = []
+            if entry_count > self._max_entries:
+                evicted = await self._redis_client.zpopmin(
+                    lru_key, count=entry_count - self._max_entries
+                )
+                evicted_ids = [member.decode("utf-8") for member, _ in evicted]
+
+            # Delete the evicted answers of the agent and the expired answers of every agent
+            if evicted_ids:
+                await self._qdrant_client.delete(
+                    collection_name=Constants.SEMANTIC_CACHE_COLLECTION,
+                    points_selector=PointIdsList(points=evicted_ids),
+                    wait=False,
+                )
+            await self._qdrant_client.delete(
+                collection_name=Constants.SEMANTIC_CACHE_COLLECTION,
+                points_selector=FilterSelector(
+                    filter=Filter(must=[FieldCondition(key="expires_at", range=Range(lt=now))])
+                ),
+                wait=False,
+            )
+        except Exception as e:
+            logger.warning(f"Failed to cache the answer: {e}")
+
+
+def reset_semantic_answer_cache() -> None:
+    """
+    Forget the collections known to be ready, e.g. after the embedding model has been changed.
+    The cache collection is checked again against the new vector size on the next lookup or store.
+    """
+    with _lock:
+        _ready_collections.clear()
+
+
+def invalidate_semantic_answer_cache(redis_client: Redis) -> int:
+    """
+    Invalidate every cached answer by moving the cache to a new generation.
+    The answers of the previous generations are no longer read and expire with their TTL.
+
+    Args:
+        redis_client (Redis): Redis client.
+
+    Returns:
+        int: New generation of the cache.
+    """
+    generation = redis_client.incr(Constants.SEMANTIC_CACHE_GENERATION_KEY)
+    logger.info(f"Semantic answer cache invalidated, generation {generation}")
+    return generation
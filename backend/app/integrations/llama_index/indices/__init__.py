@@ -1 +1,9 @@
-__all__ = []
+from app.integrations.llama_index.indices.vector_store import get_retriever
+from app.integrations.llama_index.indices.vector_store import get_vector_store_index
+from app.integrations.llama_index.indices.vector_store import reset_vector_store_index
+
+__all__ = [
+    "get_retriever",
+    "get_vector_store_index",
+    "reset_vector_store_index",
+]
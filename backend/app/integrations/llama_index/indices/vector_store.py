@@ -0,0 +1,84 @@
+import threading
+from typing import Dict
+from typing import Optional
+
+from llama_index.core import VectorStoreIndex
+from llama_index.core.retrievers import BaseRetriever
+from llama_index.vector_stores.qdrant import QdrantVectorStore
+
+from app.databases.qdrant import QdrantConnector
+from app.settings import Constants
+from app.utils.api.helpers import get_logger
+
+logger = get_logger(__name__)
+
+_index: Optional[VectorStoreIndex] = None
+_retrievers: Dict[int, BaseRetriever] = {}
+_lock = threading.Lock()
+
+
+def get_vector_store_index(qdrant_connector: Optional[QdrantConnector] = None) -> VectorStoreIndex:
+    """
+    Get the process-wide vector store index backed by the Qdrant collection.
+    The index is built lazily on first use and only wraps the remote collection,
+    so no documents are loaded or embedded in memory.
+
+    Args:
+        qdrant_connector (Optional[QdrantConnector]): Vector database connection. Defaults to the singleton connector.
+
+    Returns:
+        VectorStoreIndex: Vector store index over `Constants.QDRANT_COLLECTION`.
+    """
+    global _index
+
+    if _index is None:
+        with _lock:
+            if _index is None:
+                qdrant_connector = qdrant_connector or QdrantConnector()
+
+                logger.info(f"Initializing vector store index on {Constants.QDRANT_COLLECTION}")
+                vector_store = QdrantVectorStore(
+                    collection_name=Constants.QDRANT_COLLECTION,
+                    client=qdrant_connector.get_client(),
+                    aclient=qdrant_connector.get_aclient(),
+                )
+                _index = VectorStoreIndex.from_vector_store(vector_store=vector_store)
+
+    return _index
+
+
+def get_retriever(
+    similarity_top_k: int = Constants.SIMILARITY_TOP_K,
+    qdrant_connector: Optional[QdrantConnector] = None,
+) -> BaseRetriever:
+    """
+    Get the process-wide retriever over the vector store index.
+
+    Args:
+        similarity_top_k (int): Number of nodes to retrieve. Defaults to `Constants.SIMILARITY_TOP_K`.
+        qdrant_connector (Optional[QdrantConnector]): Vector database connection. Defaults to the singleton connector.
+
+    Returns:
+        BaseRetriever: Retriever shared by every request of the process.
+    """
+    retriever = _retrievers.get(similarity_top_k)
+    if retriever is None:
+        index = get_vector_store_index(qdrant_connector=qdrant_connector)
+        with _lock:
+            retriever = _retrievers.setdefault(
+                similarity_top_k, index.as_retriever(similarity_top_k=similarity_top_k)
+            )
+
+    return retriever
+
+
+def reset_vector_store_index() -> None:
+    """
+    Drop the cached index and retrievers, e.g. after the embedding model has been changed.
+    They will be rebuilt on the next call of `get_vector_store_index` or `get_retriever`.
+    """
+    global _index
+
+    with _lock:
+        _index = None
+        _retrievers.clear()
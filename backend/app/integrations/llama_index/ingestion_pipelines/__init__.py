@@ -1,7 +1,9 @@
+from app.integrations.llama_index.ingestion_pipelines.caches import InstrumentedIngestionCache
 from app.integrations.llama_index.ingestion_pipelines.loaders import IndexingPipeline
 from app.integrations.llama_index.ingestion_pipelines.readers import MarkitdownReader
 
 __all__ = [
+    "InstrumentedIngestionCache",
     "MarkitdownReader",
     "IndexingPipeline",
 ]
@@ -0,0 +1,82 @@
+import hashlib
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Sequence
+
+from llama_index.core.bridge.pydantic import PrivateAttr
+from llama_index.core.ingestion import IngestionCache
+from llama_index.core.ingestion.pipeline import remove_unstable_values
+from llama_index.core.schema import BaseNode
+from llama_index.core.schema import TransformComponent
+
+from app.settings import Constants
+from app.utils.api.helpers import get_logger
+
+logger = get_logger(__name__)
+
+
+def get_ingestion_cache_collection(transformations: List[TransformComponent]) -> str:
+    """
+    Get the cache collection of the transformations, versioned by their configuration.
+    A change of any transformation, or of the cache version, switches to a new collection,
+    so that the stale entries are never read again and expire one by one.
+
+    Args:
+        transformations (List[TransformComponent]): Transformations of the ingestion pipeline.
+
+    Returns:
+        str: Cache collection name.
+    """
+    configuration = "".join(
+        remove_unstable_values(str(transformation.to_dict())) for transformation in transformations
+    )
+    configuration_hash = hashlib.sha256(configuration.encode("utf-8")).hexdigest()[:16]
+
+    return (
+        f"{Constants.LLM_REDIS_CACHE_COLLECTION}:ingestion"
+        f":v{Constants.INGESTION_CACHE_VERSION}:{configuration_hash}"
+    )
+
+
+class InstrumentedIngestionCache(IngestionCache):
+    """
+    Ingestion cache counting the hits and misses of every stage of the ingestion pipeline.
+    The pipeline looks up the cache once per transformation, in their order, which gives the stage of each lookup.
+    The entries are meant to be stored with a time to live each, e.g. by `ExpiringRedisKVStore`.
+    """
+
+    _stages: List[str] = PrivateAttr(default_factory=list)
+    _lookups: int = PrivateAttr(default=0)
+    _stats: Dict[str, Dict[str, int]] = PrivateAttr(default_factory=dict)
+
+    def __init__(self, transformations: List[TransformComponent], **kwargs: Any):
+        """
+        Initialize the ingestion cache of the transformations.
+
+        Args:
+            transformations (List[TransformComponent]): Transformations of the ingestion pipeline.
+            **kwargs: Keyword arguments of `IngestionCache`.
+        """
+        super().__init__(collection=get_ingestion_cache_collection(transformations), **kwargs)
+        self._stages = [type(transformation).__name__ for transformation in transformations]
+        self._stats = {stage: {"hits": 0, "misses": 0} for stage in self._stages}
+
+    def get(self, key: str, collection: Optional[str] = None) -> Optional[Sequence[BaseNode]]:
+        nodes = super().get(key, collection=collection)
+
+        stage = self._stages[self._lookups % len(self._stages)]
+        self._stats[stage]["hits" if nodes is not None else "misses"] += 1
+        self._lookups += 1
+
+        return nodes
+
+    def get_stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Get the cache hits and misses of every stage since the cache was created.
+
+        Returns:
+            Dict[str, Dict[str, int]]: Hits and misses, keyed by the stage name.
+        """
+        return {stage: dict(stats) for stage, stats in self._stats.items()}
@@ -1,23 +1,42 @@
 import asyncio
+import hashlib
+from itertools import islice
 from typing import Any
+from typing import BinaryIO
 from typing import Dict
 from typing import List
 from typing import Optional
+from typing import Set
+from typing import Tuple
+from typing import Union
+from uuid import NAMESPACE_URL
+from uuid import uuid5
 
 from llama_index.core import Settings
 from llama_index.core.extractors import KeywordExtractor
 from llama_index.core.extractors import SummaryExtractor
-from llama_index.core.ingestion import IngestionCache
 from llama_index.core.ingestion import IngestionPipeline
 from llama_index.core.node_parser import SemanticSplitterNodeParser
+from llama_index.core.schema import BaseNode
+from llama_index.core.schema import Document
 from llama_index.core.schema import Node
+from llama_index.core.schema import NodeRelationship
+from llama_index.core.schema import RelatedNodeInfo
 from llama_index.vector_stores.qdrant import QdrantVectorStore
+from qdrant_client.models import PointIdsList
 
 from app.databases.qdrant import QdrantConnector
 from app.databases.redis import RedisConnector
+from app.integrations.llama_index.docstore.mssql import MSSQLDocumentStore
+from app.integrations.llama_index.ingestion_pipelines.caches import InstrumentedIngestionCache
 from app.integrations.llama_index.ingestion_pipelines.translators import Translator
+from app.integrations.llama_index.kvstore.mssql import MSSQLKVStore
+from app.integrations.llama_index.kvstore.redis import ExpiringRedisKVStore
+from app.integrations.llama_index.llms import RateLimitedLLM
 from app.settings import Constants
+from app.utils.api.helpers import get_database_url
 from app.utils.api.helpers import get_logger
+from app.utils.api.helpers import iter_pdf_pages
 from app.utils.api.helpers import parse_pdf
 
 logger = get_logger(__name__)
@@ -52,18 +71,27 @@ class IndexingPipeline:
             embed_model=Settings.embed_model, breakpoint_percentile_threshold=85, buffer_size=3
         )
 
-        # Define node postprocessor methods
+        # Define node postprocessor methods, their LLM calls go through the shared rate limiter
+        llm = RateLimitedLLM.from_llm(Settings.llm)
         extractors = [
-            KeywordExtractor(keywords=3),
-            SummaryExtractor(summaries=["prev", "self", "next"]),
+            KeywordExtractor(llm=llm, keywords=3),
+            SummaryExtractor(llm=llm, summaries=["prev", "self", "next"]),
         ]
 
         transformations = [semantic_splitter, *extractors, Settings.embed_model]
         return transformations
 
-    def _get_ingestion_pipeline(self) -> IngestionPipeline:
+    def _get_ingestion_pipeline(
+        self, transformations: Optional[List[Any]] = None
+    ) -> IngestionPipeline:
         """
         Get the ingestion pipeline for the indexing process.
+        Only the embedded nodes are added to the vector store, so a pipeline of a part of the transformations
+        without the embedding does not write to it.
+
+        Args:
+            transformations (Optional[List[Any]]): Transformation components of the pipeline.
+                Defaults to all of them (chunking + metadata extraction + embedding).
 
         Returns:
             IngestionPipeline: LlamaIndex ingestion pipeline
@@ -75,26 +103,44 @@ class IndexingPipeline:
             collection_name=Constants.QDRANT_COLLECTION,
         )
 
-        # Initialize the cache store for the ingestion pipeline
-        redis_cache = self._redis_connector.get_cache_store()
-        ingest_cache = IngestionCache(
+        # Define transformation components (chunking + metadata extraction + embedding)
+        transformations = transformations or self._get_transformations()
+
+        # Initialize the cache store for the ingestion pipeline, versioned by the transformation configurations.
+        # Every entry expires on its own unless read again, so that the cache stays bounded.
+        redis_cache = ExpiringRedisKVStore(
+            redis_client=self._redis_connector.get_client(),
+            ttl=Constants.INGESTION_CACHE_TTL,
+        )
+        ingest_cache = InstrumentedIngestionCache(
+            transformations=transformations,
             cache=redis_cache,
-            collection=Constants.LLM_REDIS_CACHE_COLLECTION,
         )
 
-        # Define transformation components (chunking + metadata extraction + embedding)
-        transformations = self._get_transformations()
         pipeline = IngestionPipeline(
             name="EzHR Chatbot Indexing Pipeline",
             transformations=transformations,
             vector_store=vector_store,
             cache=ingest_cache,
-            # TODO: Remove this parameter after finishing the development
-            disable_cache=True,
         )
 
         return pipeline
 
+    def _log_cache_stats(self, cache: InstrumentedIngestionCache) -> None:
+        """
+        Log the cache hits and misses of every stage of the run.
+
+        Args:
+            cache (InstrumentedIngestionCache): Cache of the ingestion pipeline.
+        """
+        for stage, stats in cache.get_stats().items():
+            lookups = stats["hits"] + stats["misses"]
+            hit_rate = stats["hits"] / lookups if lookups else 0
+            logger.info(
+                f"Ingestion cache of {stage}: {stats['hits']} hits, {stats['misses']} misses "
+                f"({hit_rate:.0%} hit rate)"
+            )
+
     def run(self, document: bytes, metadata: Dict[str, Any] = {}) -> List[Node]:
         """
         Run the indexing pipeline.
@@ -122,10 +168,203 @@ class IndexingPipeline:
                 show_progress=True,
                 batch_size=Constants.INGESTION_BATCH_SIZE,
             )
+            self._log_cache_stats(cache=pipeline.cache)
             return nodes
         except Exception:
             logger.error("Failed to run indexing pipeline for document", exc_info=True)
 
+    @staticmethod
+    def _get_docstore(document_key: str) -> MSSQLDocumentStore:
+        """
+        Get the document store of the chunk hashes of a document, in its own namespace.
+
+        Args:
+            document_key (str): Stable key of the document across its indexings.
+
+        Returns:
+            MSSQLDocumentStore: Document store of the document.
+        """
+        mssql_kvstore = MSSQLKVStore.from_uri(
+            uri=get_database_url(), table_name=Constants.INGESTION_DOCSTORE_TABLE_NAME
+        )
+        return MSSQLDocumentStore(
+            mssql_kvstore=mssql_kvstore,
+            namespace=f"document_{document_key}",
+            batch_size=Constants.INGESTION_DOCSTORE_BATCH_SIZE,
+        )
+
+    @staticmethod
+    def _split_page(pipeline: IngestionPipeline, page: Document) -> List[BaseNode]:
+        """
+        Split a page into chunks carrying the page metadata.
+        The page is split without its metadata, so that the splitting is cached by the page text only,
+        e.g. a page moved by the insertion of another one is not split again.
+
+        Args:
+            pipeline (IngestionPipeline): Ingestion pipeline of the chunking.
+            page (Document): Page to split.
+
+        Returns:
+            List[BaseNode]: Chunks of the page, in their order.
+        """
+        chunks = pipeline.run(documents=[Document(text=page.text)], show_progress=False)
+        for chunk in chunks:
+            chunk.metadata = dict(page.metadata)
+
+        return chunks
+
+    @staticmethod
+    def _set_chunk_id(
+        chunk: BaseNode, document_key: str, occurrences: Dict[str, int]
+    ) -> Tuple[str, str]:
+        """
+        Identify a chunk by the document and its content, so that an unchanged chunk keeps its id
+        whatever its position in the document.
+        The chunk is attached to the document, so that the payload of its point names the document.
+
+        Args:
+            chunk (BaseNode): Chunk to identify.
+            document_key (str): Stable key of the document across its indexings.
+            occurrences (Dict[str, int]): Number of chunks seen so far by content hash, to tell apart
+                the identical chunks of the document.
+
+        Returns:
+            Tuple[str, str]: Id and hash of the chunk.
+        """
+        content_hash = hashlib.sha256(chunk.get_content().encode("utf-8")).hexdigest()
+        occurrence = occurrences.get(content_hash, 0)
+        occurrences[content_hash] = occurrence + 1
+        chunk_hash = f"{content_hash}:{occurrence}"
+
+        # The id is a UUID, as the point ids of the vector database must be
+        chunk.id_ = str(uuid5(NAMESPACE_URL, f"{document_key}:{chunk_hash}"))
+        chunk.relationships = {NodeRelationship.SOURCE: RelatedNodeInfo(node_id=document_key)}
+
+        # The document key also keeps the cached extractions of the documents apart
+        chunk.metadata["document_key"] = document_key
+        chunk.excluded_embed_metadata_keys.append("document_key")
+        chunk.excluded_llm_metadata_keys.append("document_key")
+
+        return chunk.id_, chunk_hash
+
+    def _delete_chunks(self, docstore: MSSQLDocumentStore, chunk_ids: Set[str]) -> None:
+        """
+        Delete the chunks of a document from the vector database and from the document store.
+
+        Args:
+            docstore (MSSQLDocumentStore): Document store of the document.
+            chunk_ids (Set[str]): Ids of the chunks.
+        """
+        chunk_ids = list(chunk_ids)
+        for i in range(0, len(chunk_ids), Constants.INGESTION_DOCSTORE_BATCH_SIZE):
+            self._qdrant_connector.client.delete(
+                collection_name=Constants.QDRANT_COLLECTION,
+                points_selector=PointIdsList(
+                    points=chunk_ids[i : i + Constants.INGESTION_DOCSTORE_BATCH_SIZE]
+                ),
+            )
+
+        # The points are deleted first, a chunk left in the store is deleted again by the next indexing
+        for chunk_id in chunk_ids:
+            docstore.delete_document(chunk_id, raise_error=False)
+
+    def run_streaming(
+        self,
+        file: Union[str, BinaryIO],
+        metadata: Dict[str, Any] = {},
+        document_key: Optional[str] = None,
+    ) -> Optional[Dict[str, int]]:
+        """
+        Run the indexing pipeline on a PDF file streamed by fixed-size batches of pages.
+        The pages are parsed lazily and each batch is split, extracted, embedded and upserted while only
+        the next one is parsed, so the memory stays flat whatever the size of the document.
+        A large file given by path is parsed in a process pool, whose processes open the file themselves.
+        The summaries of the previous and next nodes are taken among the chunks extracted in the same batch.
+
+        With a document key, the document is re-indexed incrementally by chunk: the chunks are identified by
+        their content and recorded in the document store once upserted, so only the new chunks are extracted,
+        embedded and upserted, and the chunks that are not in the document anymore are deleted from the vector
+        database. A partially indexed document is completed the same way.
+
+        Args:
+            file (Union[str, BinaryIO]): Path or file object of the PDF file, e.g. a spooled temporary file.
+                A file object is parsed serially.
+            metadata (Dict[str, Any]): Additional metadata for the document. Defaults to {}.
+            document_key (Optional[str]): Stable key of the document across its indexings, e.g. the id of its
+                document row. Defaults to None (full indexing).
+
+        Returns:
+            Optional[Dict[str, int]]: Number of reused, added and removed chunks, None if the indexing failed.
+        """
+        report = {"reused": 0, "added": 0, "removed": 0}
+        try:
+            logger.info("Running the indexing pipeline by batches of pages")
+            transformations = self._get_transformations()
+            splitting_pipeline = self._get_ingestion_pipeline(transformations=transformations[:1])
+            pipeline = self._get_ingestion_pipeline(transformations=transformations[1:])
+            pages = iter_pdf_pages(file=file, metadata=metadata)
+
+            docstore = self._get_docstore(document_key=document_key) if document_key else None
+            indexed_chunk_ids = docstore.get_all_document_ids() if docstore is not None else set()
+            chunk_ids = set()
+            occurrences = {}
+            while documents := list(islice(pages, Constants.INGESTION_STREAMING_BATCH_PAGES)):
+                chunks = [
+                    chunk
+                    for document in documents
+                    for chunk in self._split_page(pipeline=splitting_pipeline, page=document)
+                ]
+
+                # Only the chunks that are not indexed yet are extracted, embedded and upserted
+                chunk_hashes = {}
+                if docstore is not None:
+                    new_chunks = []
+                    for chunk in chunks:
+                        chunk_id, chunk_hash = self._set_chunk_id(
+                            chunk=chunk, document_key=document_key, occurrences=occurrences
+                        )
+                        chunk_ids.add(chunk_id)
+                        if chunk_id in indexed_chunk_ids:
+                            report["reused"] += 1
+                        else:
+                            new_chunks.append(chunk)
+                            chunk_hashes[chunk_id] = chunk_hash
+                    chunks = new_chunks
+
+                nodes = (
+                    pipeline.run(
+                        nodes=chunks,
+                        show_progress=False,
+                        batch_size=Constants.INGESTION_BATCH_SIZE,
+                    )
+                    if chunks
+                    else []
+                )
+                report["added"] += len(nodes)
+                logger.info(
+                    f"Indexed {len(nodes)} chunks of pages {documents[0].metadata['page_number']}"
+                    f"-{documents[-1].metadata['page_number']}"
+                )
+
+                # Record the upserted chunks, to reuse them on the next indexing
+                if chunk_hashes:
+                    docstore.set_document_hashes(chunk_hashes)
+
+            # Delete the chunks that are not in the document anymore
+            if docstore is not None and (removed_chunk_ids := indexed_chunk_ids - chunk_ids):
+                report["removed"] = len(removed_chunk_ids)
+                self._delete_chunks(docstore=docstore, chunk_ids=removed_chunk_ids)
+
+            self._log_cache_stats(cache=splitting_pipeline.cache)
+            self._log_cache_stats(cache=pipeline.cache)
+            return report
+        except Exception:
+            logger.error(
+                f"Failed to run indexing pipeline for document, after {report['added']} nodes added",
+                exc_info=True,
+            )
+            return None
+
     def arun(self, document: bytes, metadata: Dict[str, Any] = {}):
         """
         Run the indexing pipeline.
@@ -152,6 +391,7 @@ class IndexingPipeline:
                     batch_size=Constants.INGESTION_BATCH_SIZE,
                 )
             )
+            self._log_cache_stats(cache=pipeline.cache)
             return nodes
         except Exception:
             logger.error("Failed to run indexing pipeline for document", exc_info=True)
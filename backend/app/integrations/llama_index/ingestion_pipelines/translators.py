@@ -11,10 +11,10 @@ from llama_index.core.callbacks import EventPayload
 from llama_index.core.schema import Document
 from llama_index.core.utils import get_tqdm_iterable
 from pydantic import BaseModel
-from pydantic import computed_field
 from pydantic import ConfigDict
 from pydantic import Field
 
+from app.integrations.llama_index.llms import RateLimitedLLM
 from app.integrations.llama_index.prompts.translator import TRANSLATOR_PROMPT_TMPL
 from app.utils.api.helpers import get_logger
 
@@ -35,12 +35,13 @@ class Translator(BaseModel, ABC):
         translate_text: Translate a text from source language to target language.
     """
 
-    # WARN: Used only on pydantic v2, computed field to get the Settings.llm
+    # WARN: Property, not a field, to get the Settings.llm
     # Because Settings.llm is a singleton object, with python's RLock
     # So it cannot be picked during the class creation (pydantic serialization)
-    @computed_field(description="The LLM model used for translation.")
+    # It is also left out of the exported model, which would otherwise contain the api key
+    @property
     def llm(self) -> BaseLLM:
-        return Settings.llm  # FIX: when exporting the model, this will contain a api key => risky
+        return RateLimitedLLM.from_llm(Settings.llm)
 
     source_language: str = Field(
         default="vietnamese",
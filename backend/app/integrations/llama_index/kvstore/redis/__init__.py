@@ -0,0 +1,3 @@
+from app.integrations.llama_index.kvstore.redis.base import ExpiringRedisKVStore
+
+__all__ = ["ExpiringRedisKVStore"]
@@ -0,0 +1,188 @@
+import asyncio
+import json
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from llama_index.core.storage.kvstore.types import BaseKVStore
+from llama_index.core.storage.kvstore.types import DEFAULT_BATCH_SIZE
+from llama_index.core.storage.kvstore.types import DEFAULT_COLLECTION
+from redis import Redis
+
+
+class ExpiringRedisKVStore(BaseKVStore):
+    """
+    Redis Implementation of the Key-Value Store, with a time to live per entry.
+    Every entry is a key of its own, named after its collection, instead of a field of a collection hash.
+    Its time to live restarts on every read, so that the entries in use are kept and the others expire one by one.
+    """
+
+    def __init__(self, redis_client: Redis, ttl: int):
+        """
+        Initialize the Redis Key-Value Store.
+
+        Args:
+            redis_client (Redis): Redis client.
+            ttl (int): Time to live of every entry, in seconds.
+        """
+        self._redis_client = redis_client
+        self._ttl = ttl
+
+    @staticmethod
+    def _get_entry_key(key: str, collection: str) -> str:
+        """
+        Get the Redis key of an entry.
+
+        Args:
+            key (str): Key of the entry.
+            collection (str): Collection of the entry.
+
+        Returns:
+            str: Redis key of the entry.
+        """
+        return f"{collection}:{key}"
+
+    def put(self, key: str, val: dict, collection: str = DEFAULT_COLLECTION) -> None:
+        """
+        Put a key-value pair into the store.
+
+        Args:
+            key (str): Key.
+            val (dict): Value.
+            collection (str): Collection name. Defaults to DEFAULT_COLLECTION.
+        """
+        self._redis_client.set(
+            self._get_entry_key(key=key, collection=collection), json.dumps(val), ex=self._ttl
+        )
+
+    async def aput(self, key: str, val: dict, collection: str = DEFAULT_COLLECTION) -> None:
+        """
+        Put a key-value pair into the store asynchronously.
+
+        Args:
+            key (str): Key.
+            val (dict): Value.
+            collection (str): Collection name. Defaults to DEFAULT_COLLECTION.
+        """
+        await asyncio.to_thread(self.put, key, val, collection)
+
+    def put_all(
+        self,
+        kv_pairs: List[Tuple[str, dict]],
+        collection: str = DEFAULT_COLLECTION,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ) -> None:
+        """
+        Put the key-value pairs into the store, by batches.
+
+        Args:
+            kv_pairs (List[Tuple[str, dict]]): Key-value pairs.
+            collection (str): Collection name. Defaults to DEFAULT_COLLECTION.
+            batch_size (int): Number of pairs written per round trip. Defaults to DEFAULT_BATCH_SIZE.
+        """
+        for i in range(0, len(kv_pairs), batch_size):
+            with self._redis_client.pipeline(transaction=False) as pipe:
+                for key, val in kv_pairs[i : i + batch_size]:
+                    pipe.set(
+                        self._get_entry_key(key=key, collection=collection),
+                        json.dumps(val),
+                        ex=self._ttl,
+                    )
+                pipe.execute()
+
+    def get(self, key: str, collection: str = DEFAULT_COLLECTION) -> Optional[dict]:
+        """
+        Get a value from the store, and restart its time to live.
+
+        Args:
+            key (str): Key.
+            collection (str): Collection name. Defaults to DEFAULT_COLLECTION.
+
+        Returns:
+            Optional[dict]: Value, None if the key is not found or has expired.
+        """
+        val_str = self._redis_client.getex(
+            self._get_entry_key(key=key, collection=collection), ex=self._ttl
+        )
+        if val_str is None:
+            return None
+
+        return json.loads(val_str)
+
+    async def aget(self, key: str, collection: str = DEFAULT_COLLECTION) -> Optional[dict]:
+        """
+        Get a value from the store asynchronously, and restart its time to live.
+
+        Args:
+            key (str): Key.
+            collection (str): Collection name. Defaults to DEFAULT_COLLECTION.
+
+        Returns:
+            Optional[dict]: Value, None if the key is not found or has expired.
+        """
+        return await asyncio.to_thread(self.get, key, collection)
+
+    def get_all(self, collection: str = DEFAULT_COLLECTION) -> Dict[str, dict]:
+        """
+        Get all the values of a collection. The collection is scanned, it is meant for maintenance only.
+
+        Args:
+            collection (str): Collection name. Defaults to DEFAULT_COLLECTION.
+
+        Returns:
+            Dict[str, dict]: Values, keyed by their key.
+        """
+        prefix = self._get_entry_key(key="", collection=collection)
+        entry_keys = list(self._redis_client.scan_iter(match=f"{prefix}*"))
+        if not entry_keys:
+            return {}
+
+        values = {}
+        for entry_key, val_str in zip(entry_keys, self._redis_client.mget(entry_keys)):
+            # The entry may have expired since the scan
+            if val_str is None:
+                continue
+            if isinstance(entry_key, bytes):
+                entry_key = entry_key.decode("utf-8")
+            values[entry_key[len(prefix) :]] = json.loads(val_str)
+
+        return values
+
+    async def aget_all(self, collection: str = DEFAULT_COLLECTION) -> Dict[str, dict]:
+        """
+        Get all the values of a collection asynchronously.
+
+        Args:
+            collection (str): Collection name. Defaults to DEFAULT_COLLECTION.
+
+        Returns:
+            Dict[str, dict]: Values, keyed by their key.
+        """
+        return await asyncio.to_thread(self.get_all, collection)
+
+    def delete(self, key: str, collection: str = DEFAULT_COLLECTION) -> bool:
+        """
+        Delete a value from the store.
+
+        Args:
+            key (str): Key.
+            collection (str): Collection name. Defaults to DEFAULT_COLLECTION.
+
+        Returns:
+            bool: True if the value was deleted, False otherwise.
+        """
+        return self._redis_client.delete(self._get_entry_key(key=key, collection=collection)) > 0
+
+    async def adelete(self, key: str, collection: str = DEFAULT_COLLECTION) -> bool:
+        """
+        Delete a value from the store asynchronously.
+
+        Args:
+            key (str): Key.
+            collection (str): Collection name. Defaults to DEFAULT_COLLECTION.
+
+        Returns:
+            bool: True if the value was deleted, False otherwise.
+        """
+        return await asyncio.to_thread(self.delete, key, collection)
@@ -0,0 +1,9 @@
+from app.integrations.llama_index.llms.rate_limited import RateLimitedLLM
+from app.integrations.llama_index.llms.rate_limiter import get_llm_rate_limiter_stats
+from app.integrations.llama_index.llms.rate_limiter import LLMRateLimiter
+
+__all__ = [
+    "LLMRateLimiter",
+    "RateLimitedLLM",
+    "get_llm_rate_limiter_stats",
+]
@@ -0,0 +1,134 @@
+from typing import Any
+from typing import Sequence
+
+from llama_index.core.base.llms.types import ChatMessage
+from llama_index.core.base.llms.types import ChatResponse
+from llama_index.core.base.llms.types import ChatResponseAsyncGen
+from llama_index.core.base.llms.types import ChatResponseGen
+from llama_index.core.base.llms.types import CompletionResponse
+from llama_index.core.base.llms.types import CompletionResponseAsyncGen
+from llama_index.core.base.llms.types import CompletionResponseGen
+from llama_index.core.base.llms.types import LLMMetadata
+from llama_index.core.bridge.pydantic import Field
+from llama_index.core.bridge.pydantic import PrivateAttr
+from llama_index.core.bridge.pydantic import SerializeAsAny
+from llama_index.core.llms.llm import LLM
+
+from app.integrations.llama_index.llms.rate_limiter import LLMRateLimiter
+from app.settings import Constants
+
+
+class RateLimitedLLM(LLM):
+    """
+    LLM whose requests go through the shared rate limiter of its provider and model.
+    The streaming requests hold their lease until the stream is exhausted or closed.
+    """
+
+    # The wrapped LLM holds the api key, never export it
+    llm: SerializeAsAny[LLM] = Field(exclude=True)
+    _limiter: LLMRateLimiter = PrivateAttr()
+
+    def __init__(self, llm: LLM, **kwargs: Any):
+        """
+        Initialize the rate limited LLM.
+
+        Args:
+            llm (LLM): Wrapped LLM.
+            **kwargs: Keyword arguments of `LLMRateLimiter`.
+        """
+        super().__init__(
+            llm=llm, callback_manager=llm.callback_manager, system_prompt=llm.system_prompt
+        )
+        self._limiter = LLMRateLimiter(
+            provider=type(llm).__name__.lower(), model=llm.metadata.model_name, **kwargs
+        )
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "rate_limited_llm"
+
+    @classmethod
+    def from_llm(cls, llm: LLM) -> LLM:
+        """
+        Wrap the LLM with the rate limiter, unless the rate limiting is disabled or already applied.
+
+        Args:
+            llm (LLM): LLM to wrap.
+
+        Returns:
+            LLM: Rate limited LLM.
+        """
+        if not Constants.LLM_RATE_LIMIT_ENABLED or isinstance(llm, cls):
+            return llm
+
+        return cls(llm=llm)
+
+    @property
+    def metadata(self) -> LLMMetadata:
+        return self.llm.metadata
+
+    def chat(self, messages: Sequence[ChatMessage], **kwargs: Any) -> ChatResponse:
+        with self._limiter.limit():
+            return self.llm.chat(messages, **kwargs)
+
+    def complete(self, prompt: str, formatted: bool = False, **kwargs: Any) -> CompletionResponse:
+        with self._limiter.limit():
+            return self.llm.complete(prompt, formatted=formatted, **kwargs)
+
+    def stream_chat(self, messages: Sequence[ChatMessage], **kwargs: Any) -> ChatResponseGen:
+        with self._limiter.limit():
+            yield from self.llm.stream_chat(messages, **kwargs)
+
+    def stream_complete(
+        self, prompt: str, formatted: bool = False, **kwargs: Any
+    ) -> CompletionResponseGen:
+        with self._limiter.limit():
+            yield from self.llm.stream_complete(prompt, formatted=formatted, **kwargs)
+
+    async def achat(self, messages: Sequence[ChatMessage], **kwargs: Any) -> ChatResponse:
+        async with self._limiter.alimit():
+            return await self.llm.achat(messages, **kwargs)
+
+    async def acomplete(
+        self, prompt: str, formatted: bool = False, **kwargs: Any
+    ) -> CompletionResponse:
+        async with self._limiter.alimit():
+            return await self.llm.acomplete(prompt, formatted=formatted, **kwargs)
+
+    async def astream_chat(
+        self, messages: Sequence[ChatMessage], **kwargs: Any
+    ) -> ChatResponseAsyncGen:
+        lease_id = await self._limiter.aacquire()
+        try:
+            response_gen = await self.llm.astream_chat(messages, **kwargs)
+        except BaseException:
+            await self._limiter.arelease(lease_id)
+            raise
+
+        async def gen() -> ChatResponseAsyncGen:
+            try:
+                async for response in response_gen:
+                    yield response
+            finally:
+                await self._limiter.arelease(lease_id)
+
+        return gen()
+
+    async def astream_complete(
+        self, prompt: str, formatted: bool = False, **kwargs: Any
+    ) -> CompletionResponseAsyncGen:
+        lease_id = await self._limiter.aacquire()
+        try:
+            response_gen = await self.llm.astream_complete(prompt, formatted=formatted, **kwargs)
+        except BaseException:
+            await self._limiter.arelease(lease_id)
+            raise
+
+        async def gen() -> CompletionResponseAsyncGen:
+            try:
+                async for response in response_gen:
+                    yield response
+            finally:
+                await self._limiter.arelease(lease_id)
+
+        return gen()
@@ -0,0 +1,343 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from contextlib import contextmanager
+from typing import Any
+from typing import AsyncGenerator
+from typing import Dict
+from typing import Generator
+from typing import List
+from typing import Optional
+from uuid import uuid4
+
+from redis import Redis
+
+from app.databases.redis import RedisConnector
+from app.settings import Constants
+from app.utils.api.helpers import get_logger
+
+logger = get_logger(__name__)
+
+# Atomically expire the stale leases, then grant a lease if both the in-flight limit and the token bucket allow it.
+# It returns 0 when the lease is granted, -1 when the in-flight limit is reached,
+# otherwise the number of milliseconds until the bucket holds a token again.
+_ACQUIRE_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local max_in_flight = tonumber(ARGV[3])
+local lease_ttl = tonumber(ARGV[5])
+
+redis.call('ZREMRANGEBYSCORE', KEYS[2], '-inf', now)
+if redis.call('ZCARD', KEYS[2]) >= max_in_flight then
+    return -1
+end
+
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'timestamp')
+local tokens = tonumber(bucket[1]) or capacity
+local timestamp = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(now - timestamp, 0) * rate)
+if tokens < 1 then
+    redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'timestamp', now)
+    return math.ceil((1 - tokens) / rate)
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens - 1), 'timestamp', now)
+redis.call('PEXPIRE', KEYS[1], lease_ttl)
+redis.call('ZADD', KEYS[2], now + lease_ttl, ARGV[4])
+redis.call('PEXPIRE', KEYS[2], lease_ttl)
+return 0
+"""
+
+
+class LLMRateLimiter:
+    def __init__(
+        self,
+        provider: str,
+        model: str,
+        redis_connector: Optional[RedisConnector] = None,
+        requests_per_minute: Optional[int] = None,
+        burst: Optional[int] = None,
+        max_in_flight: Optional[int] = None,
+        timeout: float = Constants.LLM_RATE_LIMIT_TIMEOUT,
+    ):
+        """
+        Limit the requests sent to an LLM provider and model, across every API and background worker process.
+        A request needs a token of the bucket, refilled at the allowed request rate, and a lease among the
+        maximum number of in-flight requests. Both are kept in Redis, and the leases expire on their own
+        if the process holding them dies. So do the waiting requests, which refresh their entry at every retry.
+
+        Args:
+            provider (str): LLM provider, e.g. "openai".
+            model (str): LLM model name.
+            redis_connector (Optional[RedisConnector]): Redis connector. Defaults to the singleton connector.
+            requests_per_minute (Optional[int]): Allowed request rate. Defaults to the configured rate.
+            burst (Optional[int]): Capacity of the token bucket. Defaults to the configured burst.
+            max_in_flight (Optional[int]): Maximum number of in-flight requests. Defaults to the configured one.
+            timeout (float): Maximum time in seconds a request waits in the queue. Defaults to 60 seconds.
+        """
+        overrides = Constants.LLM_RATE_LIMITS.get(f"{provider}:{model}", {})
+        self._requests_per_minute = requests_per_minute or overrides.get(
+            "requests_per_minute", Constants.LLM_RATE_LIMIT_REQUESTS_PER_MINUTE
+        )
+        self._burst = burst or overrides.get("burst", Constants.LLM_RATE_LIMIT_BURST)
+        self._max_in_flight = max_in_flight or overrides.get(
+            "max_in_flight", Constants.LLM_RATE_LIMIT_MAX_IN_FLIGHT
+        )
+        self._timeout = timeout
+        self._redis_connector = redis_connector or RedisConnector()
+
+        key = f"{Constants.LLM_RATE_LIMIT_PREFIX}:{provider}:{model}"
+        self._keys = [f"{key}:bucket", f"{key}:in_flight"]
+        self._waiting_key = f"{key}:waiting"
+        self._stats_key = f"{key}:stats"
+
+    def _get_script_args(self, lease_id: str) -> List[Any]:
+        """
+        Get the arguments of the acquire script.
+
+        Args:
+            lease_id (str): Id of the requested lease.
+
+        Returns:
+            List[Any]: Arguments of the acquire script.
+        """
+        return [
+            self._requests_per_minute / 60_000,
+            self._burst,
+            self._max_in_flight,
+            lease_id,
+            Constants.LLM_RATE_LIMIT_LEASE_TTL * 1000,
+        ]
+
+    def _get_delay(self, result: int) -> float:
+        """
+        Get the time in seconds to wait before trying to acquire a lease again.
+
+        Args:
+            result (int): Result of the acquire script.
+
+        Returns:
+            float: Delay in seconds.
+        """
+        if result < 0:
+            return Constants.LLM_RATE_LIMIT_RETRY_INTERVAL
+
+        return max(result / 1000, Constants.LLM_RATE_LIMIT_RETRY_INTERVAL)
+
+    def _get_waiter_expiry(self, delay: float) -> float:
+        """
+        Get the time in milliseconds until which a waiting request is counted in the queue depth.
+        The waiting request refreshes it before each delay, so it expires soon after the process dies.
+
+        Args:
+            delay (float): Delay in seconds before the next try.
+
+        Returns:
+            float: Expiry of the waiting request as a Unix timestamp in milliseconds.
+        """
+        return (time.time() + delay + Constants.LLM_RATE_LIMIT_WAITER_TTL) * 1000
+
+    async def aacquire(self) -> Optional[str]:
+        """
+        Wait in the queue until a lease is granted.
+        The limiter fails open, i.e. the request is not limited if Redis is not available.
+
+        Returns:
+            Optional[str]: Id of the granted lease, None if the request is not limited.
+
+        Raises:
+            TimeoutError: The request waited longer than the timeout.
+        """
+        redis_client = self._redis_connector.get_aclient()
+        lease_id = uuid4().hex
+        start = time.monotonic()
+        is_waiting = False
+
+        try:
+            while True:
+                result = await redis_client.eval(
+                    _ACQUIRE_SCRIPT, 2, *self._keys, *self._get_script_args(lease_id)
+                )
+                if result == 0:
+                    break
+
+                if time.monotonic() - start > self._timeout:
+                    await redis_client.hincrby(self._stats_key, "timeouts", 1)
+                    raise TimeoutError(
+                        f"Timed out waiting for the LLM rate limiter {self._keys[0]}"
+                    )
+
+                delay = self._get_delay(result)
+                is_waiting = True
+                async with redis_client.pipeline(transaction=False) as pipeline:
+                    pipeline.zremrangebyscore(self._waiting_key, "-inf", time.time() * 1000)
+                    pipeline.zadd(self._waiting_key, {lease_id: self._get_waiter_expiry(delay)})
+                    pipeline.expire(
+                        self._waiting_key, int(self._timeout) + Constants.LLM_RATE_LIMIT_WAITER_TTL
+                    )
+                    await pipeline.execute()
+
+                await asyncio.sleep(delay)
+
+            async with redis_client.pipeline(transaction=False) as pipeline:
+                pipeline.hincrby(self._stats_key, "acquired", 1)
+                pipeline.hincrbyfloat(self._stats_key, "wait_seconds", time.monotonic() - start)
+                await pipeline.execute()
+
+            return lease_id
+        except TimeoutError:
+            raise
+        except Exception as e:
+            logger.warning(f"LLM rate limiter is not available, the request is not limited: {e}")
+            return None
+        finally:
+            if is_waiting:
+                try:
+                    await redis_client.zrem(self._waiting_key, lease_id)
+                except Exception as e:
+                    logger.warning(f"Failed to update the LLM rate limiter queue depth: {e}")
+
+    async def arelease(self, lease_id: Optional[str]) -> None:
+        """
+        Release a granted lease.
+
+        Args:
+            lease_id (Optional[str]): Id of the granted lease.
+        """
+        if lease_id is None:
+            return
+
+        try:
+            await self._redis_connector.get_aclient().zrem(self._keys[1], lease_id)
+        except Exception as e:
+            logger.warning(f"Failed to release the LLM rate limiter lease, it will expire: {e}")
+
+    def acquire(self) -> Optional[str]:
+        """
+        Wait in the queue until a lease is granted, blocking the current thread.
+        The limiter fails open, i.e. the request is not limited if Redis is not available.
+
+        Returns:
+            Optional[str]: Id of the granted lease, None if the request is not limited.
+
+        Raises:
+            TimeoutError: The request waited longer than the timeout.
+        """
+        redis_client = self._redis_connector.get_client()
+        lease_id = uuid4().hex
+        start = time.monotonic()
+        is_waiting = False
+
+        try:
+            while True:
+                result = redis_client.eval(
+                    _ACQUIRE_SCRIPT, 2, *self._keys, *self._get_script_args(lease_id)
+                )
+                if result == 0:
+                    break
+
+                if time.monotonic() - start > self._timeout:
+                    redis_client.hincrby(self._stats_key, "timeouts", 1)
+                    raise TimeoutError(
+                        f"Timed out waiting for the LLM rate limiter {self._keys[0]}"
+                    )
+
+                delay = self._get_delay(result)
+                is_waiting = True
+                pipeline = redis_client.pipeline(transaction=False)
+                pipeline.zremrangebyscore(self._waiting_key, "-inf", time.time() * 1000)
+                pipeline.zadd(self._waiting_key, {lease_id: self._get_waiter_expiry(delay)})
+                pipeline.expire(
+                    self._waiting_key, int(self._timeout) + Constants.LLM_RATE_LIMIT_WAITER_TTL
+                )
+                pipeline.execute()
+
+                time.sleep(delay)
+
+            pipeline = redis_client.pipeline(transaction=False)
+            pipeline.hincrby(self._stats_key, "acquired", 1)
+            pipeline.hincrbyfloat(self._stats_key, "wait_seconds", time.monotonic() - start)
+            pipeline.execute()
+
+            return lease_id
+        except TimeoutError:
+            raise
+        except Exception as e:
+            logger.warning(f"LLM rate limiter is not available, the request is not limited: {e}")
+            return None
+        finally:
+            if is_waiting:
+                try:
+                    redis_client.zrem(self._waiting_key, lease_id)
+                except Exception as e:
+                    logger.warning(f"Failed to update the LLM rate limiter queue depth: {e}")
+
+    def release(self, lease_id: Optional[str]) -> None:
+        """
+        Release a granted lease, blocking the current thread.
+
+        Args:
+            lease_id (Optional[str]): Id of the granted lease.
+        """
+        if lease_id is None:
+            return
+
+        try:
+            self._redis_connector.get_client().zrem(self._keys[1], lease_id)
+        except Exception as e:
+            logger.warning(f"Failed to release the LLM rate limiter lease, it will expire: {e}")
+
+    @asynccontextmanager
+    async def alimit(self) -> AsyncGenerator[None, None]:
+        """
+        Hold a lease for the duration of the context.
+        """
+        lease_id = await self.aacquire()
+        try:
+            yield
+        finally:
+            await self.arelease(lease_id)
+
+    @contextmanager
+    def limit(self) -> Generator[None, None, None]:
+        """
+        Hold a lease for the duration of the context, blocking the current thread.
+        """
+        lease_id = self.acquire()
+        try:
+            yield
+        finally:
+            self.release(lease_id)
+
+
+def get_llm_rate_limiter_stats(redis_client: Redis) -> Dict[str, Dict[str, float]]:
+    """
+    Get the metrics of every LLM rate limiter.
+
+    Args:
+        redis_client (Redis): Redis client.
+
+    Returns:
+        Dict[str, Dict[str, float]]: Queue depth, in-flight requests, granted requests, timeouts
+        and average wait time, keyed by "<provider>:<model>".
+    """
+    now = time.time()
+    stats = {}
+    for stats_key in redis_client.scan_iter(match=f"{Constants.LLM_RATE_LIMIT_PREFIX}:*:stats"):
+        key = stats_key.decode("utf-8").removesuffix(":stats")
+        raw_stats = {
+            field.decode("utf-8"): float(value)
+            for field, value in redis_client.hgetall(stats_key).items()
+        }
+        acquired = raw_stats.get("acquired", 0)
+        stats[key.removeprefix(f"{Constants.LLM_RATE_LIMIT_PREFIX}:")] = {
+            "queue_depth": redis_client.zcount(f"{key}:waiting", now * 1000, "+inf"),
+            "in_flight": redis_client.zcount(f"{key}:in_flight", now * 1000, "+inf"),
+            "acquired": acquired,
+            "timeouts": raw_stats.get("timeouts", 0),
+            "average_wait_seconds": raw_stats.get("wait_seconds", 0) / acquired if acquired else 0,
+        }
+
+    return stats
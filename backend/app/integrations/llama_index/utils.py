@@ -1,5 +1,7 @@
 from typing import List
+from typing import Optional
 
+from llama_index.core import Settings
 from llama_index.core.base.llms.types import MessageRole
 from llama_index.core.types import ChatMessage as LlamaIndexChatMessage
 
@@ -7,28 +9,57 @@ from app.models import ChatMessage
 from app.models.chat import ChatMessageType
 
 
+def count_tokens(text: str) -> int:
+    """
+    Count the tokens of a text with the configured tokenizer.
+
+    Args:
+        text: Text to count the tokens of.
+
+    Returns:
+        The number of tokens of the text.
+    """
+    if not text:
+        return 0
+
+    return len(Settings.tokenizer(text))
+
+
 def llamaify_messages(
     chat_messages: List[ChatMessage],
+    summary: Optional[str] = None,
 ) -> List[LlamaIndexChatMessage]:
     """
     Convert application ChatMessage objects to LlamaIndex ChatMessage objects.
 
     Args:
         chat_messages: List of application ChatMessage objects to convert.
+        summary: Summary of the older messages, which are not part of the list. Defaults to None.
 
     Returns:
         A list of converted LlamaIndex ChatMessage objects with mapped roles
-        and original message content.
+        and original message content, preceded by the summary (if any) as a system message.
     """
     message_type_mapping = {
         ChatMessageType.USER: MessageRole.USER,
         ChatMessageType.ASSISTANT: MessageRole.ASSISTANT,
     }
 
-    return [
+    llama_index_messages = [
         LlamaIndexChatMessage(
             role=message_type_mapping[chat_message.message_type],
             content=chat_message.message,
         )
         for chat_message in chat_messages
     ]
+
+    if summary:
+        llama_index_messages.insert(
+            0,
+            LlamaIndexChatMessage(
+                role=MessageRole.SYSTEM,
+                content=f"Summary of the earlier conversation: {summary}",
+            ),
+        )
+
+    return llama_index_messages
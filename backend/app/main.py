@@ -2,10 +2,9 @@ from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from llama_index.core import SimpleDirectoryReader
-from llama_index.core import VectorStoreIndex
 
 from app.databases.minio import MinioConnector
+from app.databases.mssql import MSSQLConnector
 from app.databases.qdrant import QdrantConnector
 from app.databases.redis import RedisConnector
 from app.routers import auth
@@ -26,8 +25,6 @@ from app.utils.llm.helpers import init_llm_configurations
 
 logger = get_logger(__name__)
 
-index = None
-
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -48,17 +45,12 @@ async def lifespan(app: FastAPI):
     app.state.redis_conn = RedisConnector()
 
     # Initialize the LlamaIndex configuration (LLM and Embedding models)
+    # NOTE: The vector store index is built lazily on the first chat request, see `get_retriever`
     try:
         init_llm_configurations(
             llm_model=Constants.LLM_MODEL,
             embedding_model=Constants.EMBEDDING_MODEL,
         )
-
-        # TODO: Remove it as this is just a work around
-        global index
-
-        documents = SimpleDirectoryReader("examples/").load_data()
-        index = VectorStoreIndex.from_documents(documents=documents)
     except Exception as e:
         logger.error(f"Failed to initialize LlamaIndex configurations: {e}", exc_info=True)
 
@@ -69,6 +61,9 @@ async def lifespan(app: FastAPI):
         app.state.qdrant_conn.client.close()
         app.state.redis_conn.client.close()
 
+        # Dispose the async database connection pool
+        await MSSQLConnector.get_async_engine().dispose()
+
 
 def create_app() -> FastAPI:
     """
@@ -58,6 +58,7 @@ class Agent(Base):
         SQLAlchemyEnum(AgentType, native_enum=False), nullable=False, default=AgentType.USER
     )
     is_visible: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True)
+    skip_condense: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
     uploaded_image_path: Mapped[Optional[str]] = mapped_column(String, nullable=True)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
@@ -125,6 +126,9 @@ class AgentRequest(BaseModel):
     prompt: Optional[str] = Field(None, description="Agent prompt")
     agent_type: AgentType = Field(AgentType.USER, description="Agent type")
     is_visible: bool = Field(True, description="Agent visibility")
+    skip_condense: bool = Field(
+        False, description="Use the user message as is, without condensing it with the chat history"
+    )
     uploaded_image_path: Optional[str] = Field(None, description="Uploaded image id")
     starter_messages: Optional[List["StarterMessageRequest"]] = Field(
         default_factory=list, description="List of starter messages"
@@ -160,6 +164,9 @@ class AgentResponse(BaseModel):
     prompt: str = Field(..., description="Agent prompt")
     agent_type: AgentType = Field(AgentType.USER, description="Agent type")
     is_visible: bool = Field(True, description="Agent visibility")
+    skip_condense: bool = Field(
+        False, description="Use the user message as is, without condensing it with the chat history"
+    )
     uploaded_image_path: Optional[str] = Field(None, description="Uploaded image id")
     starter_messages: Optional[List["StarterMessageResponse"]] = Field(
         default_factory=list, description="List of starter messages"
@@ -1,10 +1,13 @@
 from __future__ import annotations
 
+import json
+from contextlib import contextmanager
 from datetime import datetime
 from datetime import timezone
 from enum import Enum
 from typing import Any
 from typing import Dict
+from typing import Generator
 from typing import List
 from typing import Optional
 from typing import TYPE_CHECKING
@@ -16,9 +19,12 @@ from pydantic import BaseModel
 from pydantic import Field
 from pydantic import field_validator
 from sqlalchemy import Boolean
+from sqlalchemy import Case
+from sqlalchemy import case
 from sqlalchemy import DateTime
 from sqlalchemy import Enum as SQLAlchemyEnum
 from sqlalchemy import ForeignKey
+from sqlalchemy import Index
 from sqlalchemy import Integer
 from sqlalchemy import NVARCHAR
 from sqlalchemy import String
@@ -26,16 +32,21 @@ from sqlalchemy import Text
 from sqlalchemy.dialects.mssql import UNIQUEIDENTIFIER
 from sqlalchemy.engine import Connection
 from sqlalchemy.event import listens_for
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import Mapped
 from sqlalchemy.orm import mapped_column
+from sqlalchemy.orm import object_session
 from sqlalchemy.orm import Mapper
 from sqlalchemy.orm import relationship
+from sqlalchemy.orm import Session
 from sqlalchemy.orm import validates
 from sqlalchemy.sql import func
 
 from app.models.base import Base
 from app.settings.constants import Constants
 from app.utils.api.helpers import get_logger
+from app.utils.string import normalize_search_text
 
 if TYPE_CHECKING:
     from app.models import Agent
@@ -115,6 +126,9 @@ class ChatSession(Base):
     """
 
     __tablename__ = "chat_session"
+    __table_args__ = (
+        Index("ix_chat_session_user_id_updated_at_id", "user_id", "updated_at", "id"),
+    )
 
     id: Mapped[UNIQUEIDENTIFIER] = mapped_column(
         UNIQUEIDENTIFIER(as_uuid=True), primary_key=True, default=uuid4
@@ -135,6 +149,10 @@ class ChatSession(Base):
         default=ChatSessionSharedStatus.PRIVATE,
     )
     current_alternate_model: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    summary: Mapped[Optional[str]] = mapped_column(NVARCHAR(), nullable=True)
+    summarized_until_message_id: Mapped[Optional[UNIQUEIDENTIFIER]] = mapped_column(
+        UNIQUEIDENTIFIER(as_uuid=True), nullable=True
+    )
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         server_default=func.now(),
@@ -169,6 +187,18 @@ class ChatMessage(Base):
     """
 
     __tablename__ = "chat_message"
+    __table_args__ = (
+        Index(
+            "ix_chat_message_chat_session_id_created_at_id", "chat_session_id", "created_at", "id"
+        ),
+        Index("ix_chat_message_parent_message_id", "parent_message_id"),
+        Index("ix_chat_message_child_message_id", "child_message_id"),
+        # Key index of the full-text index on search_text
+        Index("ux_chat_message_id", "id", unique=True),
+    )
+    # Fetch the server-generated defaults along with the INSERT, so that they never have to be lazy loaded,
+    # which is not possible with an async session.
+    __mapper_args__ = {"eager_defaults": True}
 
     id: Mapped[UNIQUEIDENTIFIER] = mapped_column(
         UNIQUEIDENTIFIER(as_uuid=True), primary_key=True, default=uuid4
@@ -183,6 +213,10 @@ class ChatMessage(Base):
         UNIQUEIDENTIFIER(as_uuid=True), nullable=True
     )
     message: Mapped[str] = mapped_column(NVARCHAR(), nullable=False)
+    # Object of the full message in the object storage, if the message is offloaded and only its preview is inline
+    message_object_name: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    # Accent-free lowercase full message, covered by the full-text index. It is only loaded when accessed.
+    search_text: Mapped[Optional[str]] = mapped_column(NVARCHAR(), nullable=True, deferred=True)
     token_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
     message_type: Mapped[ChatMessageType] = mapped_column(
         SQLAlchemyEnum(ChatMessageType, native_enum=False),
@@ -217,6 +251,20 @@ class ChatMessage(Base):
         "ChatFeedback", back_populates="chat_message", cascade="all, delete-orphan"
     )
 
+    @hybrid_property
+    def is_truncated(self) -> bool:
+        """
+        Whether the message is only the preview of the offloaded full message.
+
+        Returns:
+            bool: True if the message is offloaded, False otherwise.
+        """
+        return self.message_object_name is not None
+
+    @is_truncated.expression
+    def is_truncated(cls) -> Case:
+        return case((cls.message_object_name.is_(None), False), else_=True)
+
     @validates("token_count")
     def validate_token_count(self, key: Any, token_count: int) -> Union[int, None]:
         """
@@ -249,6 +297,9 @@ class ChatMessage(Base):
         if self.message_type == ChatMessageType.USER:
             message = message[: Constants.MAX_USER_MESSAGE_LENGTH]
 
+        # Keep the full-text search column up to date
+        self.search_text = normalize_search_text(input_str=message)
+
         return message
 
 
@@ -284,6 +335,9 @@ class ChatMessageResponse(BaseModel):
     parent_message_id: Optional[UUID] = Field(None, description="Parent message id")
     child_message_id: Optional[UUID] = Field(None, description="Latest child message id")
     is_sensitive: bool = Field(False, description="Sensitive message flag")
+    is_truncated: bool = Field(
+        False, description="Whether the message is only the preview of a long message"
+    )
     created_at: datetime = Field(..., description="Created at timestamp")
     updated_at: datetime = Field(..., description="Updated at timestamp")
 
@@ -348,6 +402,50 @@ class ChatSessionResponse(BaseModel):
         from_attributes = True
 
 
+class ChatSessionPageResponse(BaseModel):
+    """
+    Pydantic model for a page of chat sessions, sorted from the most recently updated.
+    """
+
+    items: List[ChatSessionResponse] = Field(
+        default_factory=list, description="Chat sessions of the page"
+    )
+    next_cursor: Optional[str] = Field(None, description="Cursor of the next page, if any")
+
+
+class ChatMessagePageResponse(BaseModel):
+    """
+    Pydantic model for a page of chat messages, sorted from the newest.
+    """
+
+    items: List[ChatMessageResponse] = Field(
+        default_factory=list, description="Chat messages of the page"
+    )
+    next_cursor: Optional[str] = Field(None, description="Cursor of the next page, if any")
+
+
+class ChatMessageSearchResponse(ChatMessageResponse):
+    """
+    Pydantic model for a chat message matching a search query.
+    """
+
+    chat_session_description: Optional[str] = Field(
+        None, description="Description (Name) of the chat session"
+    )
+    rank: int = Field(..., description="Relevance rank of the chat message, higher is better")
+
+
+class ChatMessageSearchPageResponse(BaseModel):
+    """
+    Pydantic model for a page of chat messages matching a search query, sorted from the most relevant.
+    """
+
+    items: List[ChatMessageSearchResponse] = Field(
+        default_factory=list, description="Chat messages of the page"
+    )
+    next_offset: Optional[int] = Field(None, description="Offset of the next page, if any")
+
+
 class ChatFeedback(Base):
     """
     Represents feedback for a chat message.
@@ -435,23 +533,108 @@ class ChatStreamResponse(BaseModel):
             logger.error(f"Error converting model to JSON: {e}")
             raise
 
+    @staticmethod
+    def encode(event: ChatMessageStreamEventType, content: Any) -> bytes:
+        """
+        Encode a chat stream event straight into an SSE frame, without building the pydantic models.
+        The frame is the same as the one sent by `EventSourceResponse` for `as_json`, so it is used on the hot path
+        of the stream (e.g. for every delta).
+
+        Args:
+            event (ChatMessageStreamEventType): Type of the chat event.
+            content (Any): JSON serializable content of the chat event.
+
+        Returns:
+            bytes: Encoded SSE frame.
+        """
+        data = json.dumps(content, ensure_ascii=False, separators=(",", ":"))
+        return _CHAT_STREAM_EVENT_PREFIXES[event] + data.encode("utf-8") + _CHAT_STREAM_EVENT_SUFFIX
+
     class Config:
         from_attributes = True
 
 
+# Pre-encoded SSE envelope of the chat stream events, with the separator of `EventSourceResponse`
+_CHAT_STREAM_EVENT_PREFIXES = {
+    event: f'event: {event.value}\r\ndata: {{"c":'.encode("utf-8")
+    for event in ChatMessageStreamEventType
+}
+_CHAT_STREAM_EVENT_SUFFIX = b"}\r\n\r\n"
+
+
+# Keys of `Session.info` holding the chat sessions to touch at commit, and the flag to skip touching them
+_TOUCHED_CHAT_SESSION_IDS = "touched_chat_session_ids"
+_SKIP_CHAT_SESSION_TOUCH = "skip_chat_session_touch"
+
+
+@contextmanager
+def skip_chat_session_touch(
+    db_session: Union[Session, AsyncSession],
+) -> Generator[None, None, None]:
+    """
+    Do not touch the updated_at timestamp of the chat sessions whose messages are inserted within the context,
+    e.g. for bulk imports.
+
+    Args:
+        db_session (Union[Session, AsyncSession]): Database session.
+    """
+    db_session = getattr(db_session, "sync_session", db_session)
+    db_session.info[_SKIP_CHAT_SESSION_TOUCH] = True
+    try:
+        yield
+    finally:
+        db_session.info.pop(_SKIP_CHAT_SESSION_TOUCH, None)
+
+
 @listens_for(ChatMessage, "after_insert")
 def chat_message_after_insert(mapper: Mapper, connection: Connection, target: ChatMessage) -> None:
     """
     After insert event listener for chat message.
+    The chat session is only recorded here, it is touched once per transaction at commit.
 
     Args:
         mapper (Mapper): Mapper instance to map a class to a database table.
         connection (Connection): Connection to the database.
         target (ChatMessage): Chat message table.
     """
-    # Update the updated_at timestamp of the corresponding chat session
-    connection.execute(
+    db_session = object_session(target)
+    if db_session is None or db_session.info.get(_SKIP_CHAT_SESSION_TOUCH):
+        return
+
+    db_session.info.setdefault(_TOUCHED_CHAT_SESSION_IDS, set()).add(target.chat_session_id)
+
+
+@listens_for(Session, "before_commit")
+def touch_chat_sessions_before_commit(db_session: Session) -> None:
+    """
+    Before commit event listener of the database sessions.
+    Update the updated_at timestamp of every chat session which got new messages in the transaction, in one statement.
+
+    Args:
+        db_session (Session): Database session.
+    """
+    # The pending messages are only flushed after this event, flush them to record their chat sessions
+    if any(isinstance(instance, ChatMessage) for instance in db_session.new):
+        db_session.flush()
+
+    chat_session_ids = db_session.info.pop(_TOUCHED_CHAT_SESSION_IDS, None)
+    if not chat_session_ids:
+        return
+
+    db_session.execute(
         ChatSession.__table__.update()
-        .where(ChatSession.id == target.chat_session_id)
+        .where(ChatSession.id.in_(chat_session_ids))
         .values(updated_at=datetime.now(timezone.utc))
     )
+
+
+@listens_for(Session, "after_rollback")
+def forget_touched_chat_sessions_after_rollback(db_session: Session) -> None:
+    """
+    After rollback event listener of the database sessions.
+    The messages of the rolled back transaction are gone, so are their chat sessions to touch.
+
+    Args:
+        db_session (Session): Database session.
+    """
+    db_session.info.pop(_TOUCHED_CHAT_SESSION_IDS, None)
@@ -1,15 +1,20 @@
 from datetime import datetime
 from datetime import timezone
+from enum import Enum
 from typing import Optional
+from uuid import UUID
 from uuid import uuid4
 
 from pydantic import BaseModel
 from pydantic import Field
 from sqlalchemy import Boolean
 from sqlalchemy import DateTime
+from sqlalchemy import Enum as SQLAlchemyEnum
 from sqlalchemy import func
+from sqlalchemy import Index
 from sqlalchemy import NVARCHAR
 from sqlalchemy import String
+from sqlalchemy import text
 from sqlalchemy.dialects.mssql import UNIQUEIDENTIFIER
 from sqlalchemy.orm import Mapped
 from sqlalchemy.orm import mapped_column
@@ -17,6 +22,17 @@ from sqlalchemy.orm import mapped_column
 from app.models.base import Base
 
 
+class IndexStatus(str, Enum):
+    """
+    Enumeration of the indexing states of a document.
+    """
+
+    NOT_STARTED = "not_started"
+    IN_PROGRESS = "in_progress"
+    SUCCESS = "success"
+    FAILED = "failed"
+
+
 class Document(Base):
     """
     Represents a document that contains information about uploaded documents.
@@ -24,6 +40,15 @@ class Document(Base):
     """
 
     __tablename__ = "document"
+    __table_args__ = (
+        # The documents uploaded before the content hash was stored have none
+        Index(
+            "ux_document_content_hash",
+            "content_hash",
+            unique=True,
+            mssql_where=text("content_hash IS NOT NULL"),
+        ),
+    )
 
     id: Mapped[UNIQUEIDENTIFIER] = mapped_column(
         UNIQUEIDENTIFIER(as_uuid=True), primary_key=True, default=uuid4
@@ -33,6 +58,18 @@ class Document(Base):
         DateTime(timezone=True), nullable=True
     )
     document_url: Mapped[str] = mapped_column(String, nullable=False)
+    # Hex SHA-256 of the document content, to detect the re-uploads of the same document
+    content_hash: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+    index_status: Mapped[IndexStatus] = mapped_column(
+        SQLAlchemyEnum(IndexStatus, native_enum=False),
+        nullable=False,
+        default=IndexStatus.NOT_STARTED,
+    )
+    # Id of the indexing background task in charge of the document, only this task updates the index status
+    index_task_id: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    # Key of the indexed chunks of the document, shared by its versions so that a new version is indexed
+    # incrementally against the previous one
+    index_key: Mapped[str] = mapped_column(String(36), nullable=False)
     is_public: Mapped[bool] = mapped_column(Boolean, default=False)
     issue_date: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
@@ -61,8 +98,16 @@ class DocumentUploadResponse(BaseModel):
     Defines the structure of document upload returned to the client.
     """
 
-    task_id: str = Field(..., description="Indexing background task ID")
+    document_id: UUID = Field(
+        ..., description="Document id, to upload a new version of the document"
+    )
+    task_id: Optional[str] = Field(
+        None, description="Indexing background task ID, None if the document is a duplicate"
+    )
     document_url: str = Field(..., description="Uploaded document url")
+    is_duplicate: bool = Field(
+        False, description="Whether the same document has already been uploaded and indexed"
+    )
 
     class Config:
         from_attributes = True
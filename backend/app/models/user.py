@@ -15,6 +15,7 @@ from sqlalchemy import Boolean
 from sqlalchemy import DateTime
 from sqlalchemy import Enum as SQLAlchemyEnum
 from sqlalchemy import ForeignKey
+from sqlalchemy import Integer
 from sqlalchemy import NVARCHAR
 from sqlalchemy import String
 from sqlalchemy.dialects.mssql import UNIQUEIDENTIFIER
@@ -92,6 +93,7 @@ class UserSetting(Base):
     recent_agent_ids: Mapped[str] = mapped_column(String, default="")
     auto_scroll: Mapped[bool] = mapped_column(Boolean, default=True)
     default_model: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    maximum_chat_retention_days: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         server_default=func.now(),
@@ -138,7 +140,7 @@ class UserSettingsRequest(BaseModel):
     auto_scroll: bool = Field(True, description="Auto scroll chat messages")
     default_model: Optional[str] = Field(None, description="Default model for the user")
     maximum_chat_retention_days: Optional[int] = Field(
-        None, description="Maximum chat retention days"
+        None, ge=1, description="Maximum chat retention days"
     )
 
     class Config:
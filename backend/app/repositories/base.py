@@ -1,3 +1,4 @@
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 
@@ -13,3 +14,19 @@ class BaseRepository:
             raise TypeError(f"db_session must be an instance of Session, got {type(db_session)}")
 
         self._db_session = db_session
+
+
+class BaseAsyncRepository:
+    def __init__(self, db_session: AsyncSession):
+        """
+        Base repository class for handling database operations with an async session.
+
+        Args:
+            db_session (AsyncSession): Async database session
+        """
+        if not isinstance(db_session, AsyncSession):
+            raise TypeError(
+                f"db_session must be an instance of AsyncSession, got {type(db_session)}"
+            )
+
+        self._db_session = db_session
@@ -1,23 +1,154 @@
+from datetime import datetime
 from typing import Any
 from typing import Dict
 from typing import List
 from typing import Optional
 from typing import Tuple
-
+from uuid import UUID
+
+from sqlalchemy import case
+from sqlalchemy import cast
+from sqlalchemy import CTE
+from sqlalchemy import delete
+from sqlalchemy import Exists
+from sqlalchemy import exists
+from sqlalchemy import func
+from sqlalchemy import Integer
+from sqlalchemy import literal
+from sqlalchemy import literal_column
+from sqlalchemy import select
+from sqlalchemy import update
+from sqlalchemy.engine import Result
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 from sqlalchemy.orm import noload
+from sqlalchemy.orm import selectinload
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
 from sqlalchemy.sql import and_
+from sqlalchemy.sql import or_
 
 from app.models import ChatFeedback
 from app.models import ChatMessage
 from app.models import ChatSession
+from app.models import UserSetting
+from app.models.chat import ChatMessageResponse
+from app.models.chat import ChatMessageSearchResponse
+from app.models.chat import ChatSessionResponse
+from app.repositories.base import BaseAsyncRepository
 from app.repositories.base import BaseRepository
+from app.settings import Constants
 from app.utils.api.api_response import APIError
 from app.utils.api.error_handler import ErrorCodesMappingNumber
 from app.utils.api.helpers import get_logger
 
 logger = get_logger(__name__)
 
+# Columns of the chat sessions and chat messages listed by page, i.e. the fields of their response models
+_CHAT_SESSION_COLUMNS = [
+    getattr(ChatSession, field)
+    for field in ChatSessionResponse.model_fields
+    if field != "chat_messages"
+]
+_CHAT_MESSAGE_COLUMNS = [
+    getattr(ChatMessage, field).label(field) for field in ChatMessageResponse.model_fields
+]
+
+# The active chain of a long chat session is deeper than the default recursion limit of SQL Server (100)
+_UNLIMITED_RECURSION = "OPTION (MAXRECURSION 0)"
+
+
+def _is_owned_by(chat_session_id: str, user_id: str) -> Exists:
+    """
+    Build the condition that the chat session belongs to the user, so that the ownership is checked
+    inside the statement that reads or writes the chat messages instead of in a separate round trip.
+
+    Args:
+        chat_session_id(str): Chat session id
+        user_id(str): User id
+
+    Returns:
+        Exists: EXISTS condition on the chat session.
+    """
+    return exists().where(and_(ChatSession.id == chat_session_id, ChatSession.user_id == user_id))
+
+
+def _get_active_chain(
+    chat_session_id: str, user_id: str, token_budget: Optional[int] = None
+) -> CTE:
+    """
+    Build the recursive CTE of the active chain of the chat session, i.e. the newest message and its ancestors
+    through parent_message_id. Position 1 is the newest message.
+
+    Messages written before their token count was stored (token_count = 0) are estimated at 4 characters per token.
+
+    Args:
+        chat_session_id(str): Chat session id
+        user_id(str): User id
+        token_budget(Optional[int]): Stop walking up the chain once the running token count exceeds the budget,
+            the newest message is always kept. Defaults to None (whole chain).
+
+    Returns:
+        CTE: Recursive CTE with the id, parent_message_id, position and running_tokens columns.
+    """
+
+    def get_token_count(chat_message: Any) -> Any:
+        return cast(
+            func.coalesce(
+                func.nullif(chat_message.token_count, 0), func.len(chat_message.message) / 4
+            ),
+            Integer,
+        )
+
+    newest_message_id = (
+        select(ChatMessage.id)
+        .join(ChatSession, ChatMessage.chat_session_id == ChatSession.id)
+        .where(and_(ChatMessage.chat_session_id == chat_session_id, ChatSession.user_id == user_id))
+        .order_by(ChatMessage.created_at.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    active_chain = (
+        select(
+            ChatMessage.id.label("id"),
+            ChatMessage.parent_message_id.label("parent_message_id"),
+            cast(literal(1), Integer).label("position"),
+            get_token_count(ChatMessage).label("running_tokens"),
+        )
+        .where(ChatMessage.id == newest_message_id)
+        .cte("active_chain", recursive=True)
+    )
+
+    parent = aliased(ChatMessage)
+    running_tokens = cast(active_chain.c.running_tokens + get_token_count(parent), Integer)
+    ancestors = (
+        select(
+            parent.id,
+            parent.parent_message_id,
+            cast(active_chain.c.position + 1, Integer),
+            running_tokens,
+        )
+        .join(active_chain, parent.id == active_chain.c.parent_message_id)
+        .where(parent.chat_session_id == chat_session_id)
+    )
+    if token_budget is not None:
+        ancestors = ancestors.where(running_tokens <= token_budget)
+
+    return active_chain.union_all(ancestors)
+
+
+def _get_retention_cutoff() -> Any:
+    """
+    Build the time before which the chat messages of a user are expired, according to the chat retention
+    in the user settings. It is NULL, i.e. nothing is expired, for the users without a chat retention.
+
+    Returns:
+        Any: SQL expression of the retention cutoff.
+    """
+    return func.dateadd(
+        literal_column("day"), -UserSetting.maximum_chat_retention_days, func.sysdatetimeoffset()
+    )
+
 
 class ChatRepository(BaseRepository):
     def __init__(self, db_session: Session):
@@ -30,66 +161,246 @@ class ChatRepository(BaseRepository):
         super().__init__(db_session=db_session)
 
     def get_chat_sessions(
-        self, user_id: str, **filter
-    ) -> Tuple[List[ChatSession], Optional[APIError]]:
+        self, user_id: str, limit: int, cursor: Optional[Tuple[datetime, UUID]] = None
+    ) -> Tuple[List[ChatSessionResponse], Optional[APIError]]:
         """
-        Get all chat sessions of the user. Sort by updated_at in descending order.
+        Get a page of the chat sessions of the user. Sort by updated_at then id in descending order.
+        The rows are projected straight to the response model, without loading the ORM objects.
 
         Args:
             user_id(str): User id
-            **filter: Additional filters
+            limit(int): Maximum number of chat sessions
+            cursor(Optional[Tuple[datetime, UUID]]): updated_at and id of the last chat session of the previous page.
+                Defaults to None (first page).
 
         Returns:
-            Tuple[List[ChatSession], Optional[APIError]]: List of chat session objects and APIError object if any error
+            Tuple[List[ChatSessionResponse], Optional[APIError]]: List of chat sessions and APIError object if any error
         """
         try:
-            query = (
-                self._db_session.query(ChatSession)
-                .options(noload(ChatSession.chat_messages))
-                .filter(ChatSession.user_id == user_id)
-            )
-
-            # Apply additional filters
-            for field, value in filter.items():
-                query = query.filter(getattr(ChatSession, field) == value)
+            query = select(*_CHAT_SESSION_COLUMNS).where(ChatSession.user_id == user_id)
+            if cursor:
+                updated_at, id = cursor
+                query = query.where(
+                    or_(
+                        ChatSession.updated_at < updated_at,
+                        and_(ChatSession.updated_at == updated_at, ChatSession.id < id),
+                    )
+                )
 
-            chat_sessions = query.order_by(ChatSession.updated_at.desc()).all()
-            return chat_sessions, None
+            rows = self._db_session.execute(
+                query.order_by(ChatSession.updated_at.desc(), ChatSession.id.desc()).limit(limit)
+            )
+            return [ChatSessionResponse.model_validate(row) for row in rows], None
         except Exception as e:
             logger.error(f"Error getting chat sessions: {e}")
             return [], APIError(kind=ErrorCodesMappingNumber.INTERNAL_SERVER_ERROR.value)
 
     def get_chat_messages(
-        self, chat_session_id: str, user_id: str
-    ) -> Tuple[List[ChatMessage], Optional[APIError]]:
+        self,
+        chat_session_id: str,
+        user_id: str,
+        limit: int,
+        cursor: Optional[Tuple[datetime, UUID]] = None,
+    ) -> Tuple[List[ChatMessageResponse], Optional[APIError]]:
         """
-        Get all chat messages of the chat session. Sort by created_at in ascending order.
+        Get a page of the chat messages of the chat session. Sort by created_at then id in descending order.
+        The rows are projected straight to the response model, without loading the ORM objects.
 
         Args:
             chat_session_id(str): Chat session id
             user_id(str): User id
+            limit(int): Maximum number of chat messages
+            cursor(Optional[Tuple[datetime, UUID]]): created_at and id of the last chat message of the previous page.
+                Defaults to None (first page).
 
         Returns:
-            Tuple[List[ChatMessage], Optional[APIError]]: List of chat message objects and APIError object if any error
+            Tuple[List[ChatMessageResponse], Optional[APIError]]: List of chat messages and APIError object if any error
         """
         try:
-            chat_messages = (
-                self._db_session.query(ChatMessage)
-                .join(ChatSession, ChatMessage.chat_session_id == ChatSession.id)
-                .filter(
-                    and_(
-                        ChatMessage.chat_session_id == chat_session_id,
-                        ChatSession.user_id == user_id,
+            query = select(*_CHAT_MESSAGE_COLUMNS).where(
+                and_(
+                    ChatMessage.chat_session_id == chat_session_id,
+                    _is_owned_by(chat_session_id=chat_session_id, user_id=user_id),
+                )
+            )
+            if cursor:
+                created_at, id = cursor
+                query = query.where(
+                    or_(
+                        ChatMessage.created_at < created_at,
+                        and_(ChatMessage.created_at == created_at, ChatMessage.id < id),
                     )
                 )
-                .order_by(ChatMessage.created_at.asc())
-                .all()
+
+            rows = self._db_session.execute(
+                query.order_by(ChatMessage.created_at.desc(), ChatMessage.id.desc()).limit(limit)
             )
-            return chat_messages, None
+            return [ChatMessageResponse.model_validate(row) for row in rows], None
         except Exception as e:
             logger.error(f"Error getting chat messages: {e}")
             return [], APIError(kind=ErrorCodesMappingNumber.INTERNAL_SERVER_ERROR.value)
 
+    def get_chat_history_for_export(
+        self,
+        user_id: str,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None,
+    ) -> Tuple[Optional[Result], Optional[APIError]]:
+        """
+        Get the chat messages of the user along with their chat session, grouped by chat session
+        and sorted by created_at. The rows are fetched by batches of `CHAT_EXPORT_BATCH_SIZE` while iterating
+        over the result, so that the whole chat history is never held in memory.
+
+        The chat session columns are labelled with the "chat_session__" prefix.
+
+        Args:
+            user_id(str): User id
+            created_after(Optional[datetime]): Only export the chat messages created at or after this time
+            created_before(Optional[datetime]): Only export the chat messages created before this time
+
+        Returns:
+            Tuple[Optional[Result], Optional[APIError]]: Result of the rows and APIError object if any error
+        """
+        try:
+            query = (
+                select(
+                    *[
+                        column.label(f"chat_session__{column.key}")
+                        for column in _CHAT_SESSION_COLUMNS
+                    ],
+                    *_CHAT_MESSAGE_COLUMNS,
+                    ChatMessage.message_object_name,
+                )
+                .join(ChatSession, ChatMessage.chat_session_id == ChatSession.id)
+                .where(ChatSession.user_id == user_id)
+            )
+            if created_after:
+                query = query.where(ChatMessage.created_at >= created_after)
+            if created_before:
+                query = query.where(ChatMessage.created_at < created_before)
+
+            result = self._db_session.execute(
+                query.order_by(
+                    ChatSession.created_at, ChatSession.id, ChatMessage.created_at, ChatMessage.id
+                ).execution_options(yield_per=Constants.CHAT_EXPORT_BATCH_SIZE)
+            )
+            return result, None
+        except Exception as e:
+            logger.error(f"Error getting chat history for export: {e}")
+            return None, APIError(kind=ErrorCodesMappingNumber.INTERNAL_SERVER_ERROR.value)
+
+    def search_chat_messages(
+        self, user_id: str, search_condition: str, limit: int, offset: int = 0
+    ) -> Tuple[List[ChatMessageSearchResponse], Optional[APIError]]:
+        """
+        Search the chat messages of the user with the full-text index of the chat messages.
+        Sort by the relevance rank in descending order, then by created_at and id in descending order.
+
+        Args:
+            user_id(str): User id
+            search_condition(str): Full-text search condition, on the accent-free lowercase messages
+            limit(int): Maximum number of chat messages
+            offset(int): Number of chat messages to skip. Defaults to 0.
+
+        Returns:
+            Tuple[List[ChatMessageSearchResponse], Optional[APIError]]: List of chat messages and APIError object if any error
+        """
+        try:
+            matches = (
+                func.containstable(
+                    literal_column(ChatMessage.__tablename__),
+                    literal_column(ChatMessage.search_text.key),
+                    search_condition,
+                )
+                .table_valued("KEY", "RANK")
+                .alias("matches")
+            )
+            query = (
+                select(
+                    *_CHAT_MESSAGE_COLUMNS,
+                    ChatSession.description.label("chat_session_description"),
+                    matches.c.RANK.label("rank"),
+                )
+                .select_from(ChatMessage)
+                .join(matches, ChatMessage.id == matches.c.KEY)
+                .join(ChatSession, ChatMessage.chat_session_id == ChatSession.id)
+                .where(ChatSession.user_id == user_id)
+                .order_by(
+                    matches.c.RANK.desc(), ChatMessage.created_at.desc(), ChatMessage.id.desc()
+                )
+                .offset(offset)
+                .limit(limit)
+            )
+
+            rows = self._db_session.execute(query)
+            return [ChatMessageSearchResponse.model_validate(row) for row in rows], None
+        except Exception as e:
+            logger.error(f"Error searching chat messages: {e}")
+            return [], APIError(kind=ErrorCodesMappingNumber.INTERNAL_SERVER_ERROR.value)
+
+    def get_active_chat_messages(
+        self, chat_session_id: str, user_id: str
+    ) -> Tuple[List[ChatMessage], Optional[APIError]]:
+        """
+        Get the chat messages of the active chain of the chat session in a single query,
+        i.e. the newest message and its ancestors. Sort from the root to the newest message.
+
+        Args:
+            chat_session_id(str): Chat session id
+            user_id(str): User id
+
+        Returns:
+            Tuple[List[ChatMessage], Optional[APIError]]: List of chat message objects and APIError object if any error
+        """
+        try:
+            active_chain = _get_active_chain(chat_session_id=chat_session_id, user_id=user_id)
+            chat_messages = self._db_session.scalars(
+                select(ChatMessage)
+                .join(active_chain, ChatMessage.id == active_chain.c.id)
+                .order_by(active_chain.c.position.desc())
+                .suffix_with(_UNLIMITED_RECURSION, dialect="mssql")
+            ).all()
+            return list(chat_messages), None
+        except Exception as e:
+            logger.error(f"Error getting active chat messages: {e}")
+            return [], APIError(kind=ErrorCodesMappingNumber.INTERNAL_SERVER_ERROR.value)
+
+    def get_chat_session_with_active_chat_messages(
+        self, chat_session_id: str, user_id: str
+    ) -> Tuple[Optional[ChatSession], Optional[APIError]]:
+        """
+        Get chat session by id, with its chat messages limited to the active chain.
+
+        Args:
+            chat_session_id(str): Chat session id
+            user_id(str): User id
+
+        Returns:
+            Tuple[Optional[ChatSession], Optional[APIError]]: Chat session object and APIError object if any error
+        """
+        try:
+            chat_session = (
+                self._db_session.query(ChatSession)
+                .options(noload(ChatSession.chat_messages))
+                .filter(and_(ChatSession.id == chat_session_id, ChatSession.user_id == user_id))
+                .first()
+            )
+            if not chat_session:
+                return None, APIError(kind=ErrorCodesMappingNumber.CHAT_SESSION_NOT_FOUND.value)
+        except Exception as e:
+            logger.error(f"Error getting chat session: {e}")
+            return None, APIError(kind=ErrorCodesMappingNumber.INTERNAL_SERVER_ERROR.value)
+
+        chat_messages, err = self.get_active_chat_messages(
+            chat_session_id=chat_session_id, user_id=user_id
+        )
+        if err:
+            return None, err
+
+        # Populate the relationship as loaded, without marking the chat session as modified
+        set_committed_value(chat_session, "chat_messages", chat_messages)
+        return chat_session, None
+
     def get_chat_session(
         self, chat_session_id: str, user_id: str
     ) -> Tuple[Optional[ChatSession], Optional[APIError]]:
@@ -170,23 +481,6 @@ class ChatRepository(BaseRepository):
             logger.error(f"Error creating chat session: {e}")
             return APIError(kind=ErrorCodesMappingNumber.INTERNAL_SERVER_ERROR.value)
 
-    def create_chat_message(self, chat_message: ChatMessage) -> Optional[APIError]:
-        """
-        Create chat message.
-
-        Args:
-            chat_message(ChatMessage): Chat message object
-
-        Returns:
-            Optional[APIError]: APIError object if any error
-        """
-        try:
-            self._db_session.add(chat_message)
-            return None
-        except Exception as e:
-            logger.error(f"Error creating chat message: {e}")
-            return APIError(kind=ErrorCodesMappingNumber.INTERNAL_SERVER_ERROR.value)
-
     def update_chat_session(
         self, chat_session_id: str, chat_session: Dict[str, Any], user_id: str
     ) -> Optional[APIError]:
@@ -219,127 +513,469 @@ class ChatRepository(BaseRepository):
             logger.error(f"Error updating chat session: {e}")
             return APIError(kind=ErrorCodesMappingNumber.INTERNAL_SERVER_ERROR.value)
 
-    def update_chat_message(
-        self, chat_session_id: str, chat_message_id: str, chat_message: Dict[str, Any], user_id: str
-    ) -> Optional[APIError]:
+    def delete_chat_session(
+        self, chat_session_id: str, user_id: str
+    ) -> Tuple[List[Optional[str]], Optional[APIError]]:
         """
-        Update chat message.
+        Delete chat session by id, along with its chat messages.
+        The chat messages are deleted explicitly, so that the object names of the offloaded messages are returned.
 
         Args:
             chat_session_id(str): Chat session id
-            chat_message_id(str): Chat message id
-            chat_message(Dict[str, Any]): Chat message object
             user_id(str): User id
 
+        Returns:
+            Tuple[List[Optional[str]], Optional[APIError]]: Object names of the deleted chat messages, None if not
+            offloaded, and APIError object if any error
+        """
+        try:
+            message_object_names = self._db_session.scalars(
+                delete(ChatMessage)
+                .where(
+                    and_(
+                        ChatMessage.chat_session_id == chat_session_id,
+                        _is_owned_by(chat_session_id=chat_session_id, user_id=user_id),
+                    )
+                )
+                .returning(ChatMessage.message_object_name)
+            ).all()
+            self._db_session.query(ChatSession).filter(
+                and_(ChatSession.id == chat_session_id, ChatSession.user_id == user_id)
+            ).delete()
+            return list(message_object_names), None
+        except Exception as e:
+            logger.error(f"Error deleting chat session: {e}")
+            return [], APIError(kind=ErrorCodesMappingNumber.INTERNAL_SERVER_ERROR.value)
+
+    def delete_expired_chat_messages(
+        self, batch_size: int
+    ) -> Tuple[List[Optional[str]], Optional[APIError]]:
+        """
+        Delete a batch of the chat messages older than the chat retention of their users.
+        The users without a chat retention keep their chat messages forever.
+
+        Args:
+            batch_size(int): Maximum number of chat messages to delete
+
+        Returns:
+            Tuple[List[Optional[str]], Optional[APIError]]: Object name of the offloaded message of each deleted
+            chat message (None if stored inline) and APIError object if any error
+        """
+        try:
+            expired_chat_message_ids = (
+                select(ChatMessage.id)
+                .join(ChatSession, ChatMessage.chat_session_id == ChatSession.id)
+                .join(UserSetting, UserSetting.id == ChatSession.user_id)
+                .where(ChatMessage.created_at < _get_retention_cutoff())
+                .limit(batch_size)
+            )
+            message_object_names = self._db_session.scalars(
+                delete(ChatMessage)
+                .where(ChatMessage.id.in_(expired_chat_message_ids))
+                .returning(ChatMessage.message_object_name)
+                .execution_options(synchronize_session=False)
+            ).all()
+            return list(message_object_names), None
+        except Exception as e:
+            logger.error(f"Error deleting expired chat messages: {e}")
+            return [], APIError(kind=ErrorCodesMappingNumber.INTERNAL_SERVER_ERROR.value)
+
+    def delete_expired_chat_sessions(self, batch_size: int) -> Tuple[int, Optional[APIError]]:
+        """
+        Delete a batch of the chat sessions which are left without chat messages
+        and not updated within the chat retention of their users.
+
+        Args:
+            batch_size(int): Maximum number of chat sessions to delete
+
+        Returns:
+            Tuple[int, Optional[APIError]]: Number of deleted chat sessions and APIError object if any error
+        """
+        try:
+            expired_chat_session_ids = (
+                select(ChatSession.id)
+                .join(UserSetting, UserSetting.id == ChatSession.user_id)
+                .where(
+                    and_(
+                        ChatSession.updated_at < _get_retention_cutoff(),
+                        ~exists().where(ChatMessage.chat_session_id == ChatSession.id),
+                    )
+                )
+                .limit(batch_size)
+            )
+            result = self._db_session.execute(
+                delete(ChatSession)
+                .where(ChatSession.id.in_(expired_chat_session_ids))
+                .execution_options(synchronize_session=False)
+            )
+            return result.rowcount, None
+        except Exception as e:
+            logger.error(f"Error deleting expired chat sessions: {e}")
+            return 0, APIError(kind=ErrorCodesMappingNumber.INTERNAL_SERVER_ERROR.value)
+
+    def create_chat_feedback(self, chat_feedback: ChatFeedback) -> Optional[APIError]:
+        """
+        Create chat feedback.
+
+        Args:
+            chat_feedback(ChatFeedback): Chat feedback object
+
         Returns:
             Optional[APIError]: APIError object if any error
         """
         try:
-            # Verify the chat session belongs to the user
-            chat_session = (
-                self._db_session.query(ChatSession)
-                .filter(and_(ChatSession.id == chat_session_id, ChatSession.user_id == user_id))
-                .first()
+            self._db_session.add(chat_feedback)
+            return None
+        except Exception as e:
+            logger.error(f"Error creating chat feedback: {e}")
+            return APIError(kind=ErrorCodesMappingNumber.INTERNAL_SERVER_ERROR.value)
+
+
+class AsyncChatRepository(BaseAsyncRepository):
+    def __init__(self, db_session: AsyncSession):
+        """
+        Async chat repository class for handling the chat-related database operations of the chat stream.
+        Relationships are never lazy loaded with an async session, so they are either eagerly loaded or queried explicitly.
+
+        Args:
+            db_session (AsyncSession): Async database session
+        """
+        super().__init__(db_session=db_session)
+
+    async def get_chat_session(
+        self, chat_session_id: str, user_id: str
+    ) -> Tuple[Optional[ChatSession], Optional[APIError]]:
+        """
+        Get chat session by id, with its agent eagerly loaded.
+
+        Args:
+            chat_session_id(str): Chat session id
+            user_id(str): User id
+
+        Returns:
+            Tuple[Optional[ChatSession], Optional[APIError]]: Chat session object and APIError object if any error
+        """
+        try:
+            chat_session = await self._db_session.scalar(
+                select(ChatSession)
+                .options(selectinload(ChatSession.agent), noload(ChatSession.chat_messages))
+                .where(and_(ChatSession.id == chat_session_id, ChatSession.user_id == user_id))
             )
             if not chat_session:
-                return APIError(kind=ErrorCodesMappingNumber.UNAUTHORIZED_REQUEST.value)
+                return None, APIError(kind=ErrorCodesMappingNumber.CHAT_SESSION_NOT_FOUND.value)
 
-            # Check if chat message exists
-            chat_message_exists = (
-                self._db_session.query(ChatMessage)
-                .filter(
+            return chat_session, None
+        except Exception as e:
+            logger.error(f"Error getting chat session: {e}")
+            return None, APIError(kind=ErrorCodesMappingNumber.INTERNAL_SERVER_ERROR.value)
+
+    async def get_chat_history_within_budget(
+        self, chat_session_id: str, user_id: str, token_budget: int
+    ) -> Tuple[List[ChatMessage], Optional[APIError]]:
+        """
+        Get the newest chat messages of the active chain whose total token count fits the token budget.
+        The chain is walked from the newest message and the walk stops at the budget, so the cost does not grow
+        with the length of the chat session. The newest message is always returned. Sort from the oldest message.
+
+        Args:
+            chat_session_id(str): Chat session id
+            user_id(str): User id
+            token_budget(int): Maximum number of tokens of the returned messages
+
+        Returns:
+            Tuple[List[ChatMessage], Optional[APIError]]: List of chat message objects and APIError object if any error
+        """
+        try:
+            active_chain = _get_active_chain(
+                chat_session_id=chat_session_id, user_id=user_id, token_budget=token_budget
+            )
+            chat_messages = await self._db_session.scalars(
+                select(ChatMessage)
+                .join(active_chain, ChatMessage.id == active_chain.c.id)
+                .order_by(active_chain.c.position.desc())
+                .suffix_with(_UNLIMITED_RECURSION, dialect="mssql")
+            )
+            return list(chat_messages), None
+        except Exception as e:
+            logger.error(f"Error getting chat history: {e}")
+            return [], APIError(kind=ErrorCodesMappingNumber.INTERNAL_SERVER_ERROR.value)
+
+    async def get_chat_message_ancestors(
+        self,
+        chat_message_id: str,
+        chat_session_id: str,
+        user_id: str,
+        stop_message_id: Optional[str] = None,
+    ) -> Tuple[List[ChatMessage], Optional[APIError]]:
+        """
+        Get the chat message and its ancestors through parent_message_id, up to a stop message (excluded).
+        The chain position is the boundary, so that messages created at the same time are never skipped
+        nor returned twice, and the messages of the other branches are never returned. Sort from the oldest message.
+
+        Args:
+            chat_message_id(str): Id of the newest message to return
+            chat_session_id(str): Chat session id
+            user_id(str): User id
+            stop_message_id(Optional[str]): Stop walking up the chain at this message. Defaults to None (root).
+
+        Returns:
+            Tuple[List[ChatMessage], Optional[APIError]]: List of chat message objects and APIError object if any error
+        """
+        try:
+            ancestor_chain = (
+                select(
+                    ChatMessage.id.label("id"),
+                    ChatMessage.parent_message_id.label("parent_message_id"),
+                    cast(literal(1), Integer).label("position"),
+                )
+                .where(
                     and_(
                         ChatMessage.id == chat_message_id,
                         ChatMessage.chat_session_id == chat_session_id,
+                        _is_owned_by(chat_session_id=chat_session_id, user_id=user_id),
                     )
                 )
-                .first()
+                .cte("ancestor_chain", recursive=True)
             )
-            if not chat_message_exists:
-                return APIError(kind=ErrorCodesMappingNumber.CHAT_MESSAGE_NOT_FOUND.value)
 
-            # Update the chat message
-            self._db_session.query(ChatMessage).filter(
-                and_(
-                    ChatMessage.id == chat_message_id,
-                    ChatMessage.chat_session_id == chat_session_id,
+            parent = aliased(ChatMessage)
+            ancestors = (
+                select(
+                    parent.id,
+                    parent.parent_message_id,
+                    cast(ancestor_chain.c.position + 1, Integer),
                 )
-            ).update(chat_message)
-            return None
+                .join(ancestor_chain, parent.id == ancestor_chain.c.parent_message_id)
+                .where(parent.chat_session_id == chat_session_id)
+            )
+            if stop_message_id is not None:
+                ancestors = ancestors.where(parent.id != stop_message_id)
+            ancestor_chain = ancestor_chain.union_all(ancestors)
+
+            query = select(ChatMessage).join(ancestor_chain, ChatMessage.id == ancestor_chain.c.id)
+            if stop_message_id is not None:
+                query = query.where(ChatMessage.id != stop_message_id)
+
+            chat_messages = await self._db_session.scalars(
+                query.order_by(ancestor_chain.c.position.desc()).suffix_with(
+                    _UNLIMITED_RECURSION, dialect="mssql"
+                )
+            )
+            return list(chat_messages), None
         except Exception as e:
-            logger.error(f"Error updating chat message: {e}")
-            return APIError(kind=ErrorCodesMappingNumber.INTERNAL_SERVER_ERROR.value)
+            logger.error(f"Error getting chat message ancestors: {e}")
+            return [], APIError(kind=ErrorCodesMappingNumber.INTERNAL_SERVER_ERROR.value)
 
-    def delete_chat_session(self, chat_session_id: str, user_id: str) -> Optional[APIError]:
+    async def get_chat_message(
+        self, chat_message_id: str, chat_session_id: str, user_id: str
+    ) -> Tuple[Optional[ChatMessage], Optional[APIError]]:
         """
-        Delete chat session by id.
+        Get chat message by id.
 
         Args:
+            chat_message_id(str): Message id
             chat_session_id(str): Chat session id
             user_id(str): User id
 
+        Returns:
+            Tuple[Optional[ChatMessage], Optional[APIError]]: Chat message object and APIError object if any error
+        """
+        try:
+            chat_message = await self._db_session.scalar(
+                select(ChatMessage)
+                .join(ChatSession, ChatMessage.chat_session_id == ChatSession.id)
+                .where(
+                    and_(
+                        ChatMessage.id == chat_message_id,
+                        ChatMessage.chat_session_id == chat_session_id,
+                        ChatSession.user_id == user_id,
+                    )
+                )
+            )
+            if not chat_message:
+                return None, APIError(kind=ErrorCodesMappingNumber.CHAT_MESSAGE_NOT_FOUND.value)
+
+            return chat_message, None
+        except Exception as e:
+            logger.error(f"Error getting chat message: {e}")
+            return None, APIError(kind=ErrorCodesMappingNumber.INTERNAL_SERVER_ERROR.value)
+
+    async def create_chat_message(self, chat_message: ChatMessage) -> Optional[APIError]:
+        """
+        Create chat message. The message is inserted on the next flush.
+
+        Args:
+            chat_message(ChatMessage): Chat message object
+
         Returns:
             Optional[APIError]: APIError object if any error
         """
         try:
-            self._db_session.query(ChatSession).filter(
-                and_(ChatSession.id == chat_session_id, ChatSession.user_id == user_id)
-            ).delete()
+            self._db_session.add(chat_message)
             return None
         except Exception as e:
-            logger.error(f"Error deleting chat session: {e}")
+            logger.error(f"Error creating chat message: {e}")
             return APIError(kind=ErrorCodesMappingNumber.INTERNAL_SERVER_ERROR.value)
 
-    def delete_chat_message(
-        self, chat_message_id: str, chat_session_id: str, user_id: str
+    async def update_chat_session(
+        self, chat_session_id: str, chat_session: Dict[str, Any], user_id: str
     ) -> Optional[APIError]:
         """
-        Delete chat message by id.
+        Update chat session.
 
         Args:
-            chat_message_id(str): Message id
             chat_session_id(str): Chat session id
+            chat_session(Dict[str, Any]): Chat session object
             user_id(str): User id
 
         Returns:
             Optional[APIError]: APIError object if any error
         """
         try:
-            # Verify the chat session belongs to the user
-            chat_session = (
-                self._db_session.query(ChatSession)
-                .filter(and_(ChatSession.id == chat_session_id, ChatSession.user_id == user_id))
-                .first()
+            result = await self._db_session.execute(
+                update(ChatSession)
+                .where(and_(ChatSession.id == chat_session_id, ChatSession.user_id == user_id))
+                .values(**chat_session)
             )
+            if result.rowcount == 0:
+                return APIError(kind=ErrorCodesMappingNumber.CHAT_SESSION_NOT_FOUND.value)
 
-            if not chat_session:
-                return APIError(kind=ErrorCodesMappingNumber.UNAUTHORIZED_REQUEST.value)
+            return None
+        except Exception as e:
+            logger.error(f"Error updating chat session: {e}")
+            return APIError(kind=ErrorCodesMappingNumber.INTERNAL_SERVER_ERROR.value)
 
-            # Delete the chat message
-            self._db_session.query(ChatMessage).filter(
-                and_(
-                    ChatMessage.id == chat_message_id,
-                    ChatMessage.chat_session_id == chat_session_id,
+    async def update_chat_message(
+        self, chat_session_id: str, chat_message_id: str, chat_message: Dict[str, Any], user_id: str
+    ) -> Optional[APIError]:
+        """
+        Update chat message. The ownership of the chat session is checked by the UPDATE statement itself.
+
+        Args:
+            chat_session_id(str): Chat session id
+            chat_message_id(str): Chat message id
+            chat_message(Dict[str, Any]): Chat message object
+            user_id(str): User id
+
+        Returns:
+            Optional[APIError]: APIError object if any error
+        """
+        try:
+            result = await self._db_session.execute(
+                update(ChatMessage)
+                .where(
+                    and_(
+                        ChatMessage.id == chat_message_id,
+                        ChatMessage.chat_session_id == chat_session_id,
+                        _is_owned_by(chat_session_id=chat_session_id, user_id=user_id),
+                    )
                 )
-            ).delete()
+                .values(**chat_message)
+            )
+            if result.rowcount == 0:
+                return APIError(kind=ErrorCodesMappingNumber.CHAT_MESSAGE_NOT_FOUND.value)
+
             return None
         except Exception as e:
-            logger.error(f"Error deleting chat message: {e}")
+            logger.error(f"Error updating chat message: {e}")
             return APIError(kind=ErrorCodesMappingNumber.INTERNAL_SERVER_ERROR.value)
 
-    def create_chat_feedback(self, chat_feedback: ChatFeedback) -> Optional[APIError]:
+    async def update_message_chain(
+        self,
+        chat_session_id: str,
+        user_id: str,
+        parent_message_id: Optional[str] = None,
+        child_message_id: Optional[str] = None,
+    ) -> Optional[APIError]:
         """
-        Create chat feedback.
+        Link the parent message to the child message in a single UPDATE statement:
+        the child message id of the parent and the parent message id of the child are set together.
+        If only one of them is given, its pointer to the other side is cleared.
 
         Args:
-            chat_feedback(ChatFeedback): Chat feedback object
+            chat_session_id(str): Chat session id
+            user_id(str): User id
+            parent_message_id(Optional[str]): Parent message id. Defaults to None.
+            child_message_id(Optional[str]): Child message id. Defaults to None.
 
         Returns:
             Optional[APIError]: APIError object if any error
         """
+        chat_message_ids = [
+            chat_message_id
+            for chat_message_id in (parent_message_id, child_message_id)
+            if chat_message_id
+        ]
+        if not chat_message_ids:
+            return None
+
         try:
-            self._db_session.add(chat_feedback)
+            result = await self._db_session.execute(
+                update(ChatMessage)
+                .where(
+                    and_(
+                        ChatMessage.id.in_(chat_message_ids),
+                        ChatMessage.chat_session_id == chat_session_id,
+                        _is_owned_by(chat_session_id=chat_session_id, user_id=user_id),
+                    )
+                )
+                .values(
+                    child_message_id=case(
+                        (
+                            ChatMessage.id == parent_message_id,
+                            literal(child_message_id, ChatMessage.child_message_id.type),
+                        ),
+                        else_=ChatMessage.child_message_id,
+                    ),
+                    parent_message_id=case(
+                        (
+                            ChatMessage.id == child_message_id,
+                            literal(parent_message_id, ChatMessage.parent_message_id.type),
+                        ),
+                        else_=ChatMessage.parent_message_id,
+                    ),
+                )
+            )
+            if result.rowcount != len(chat_message_ids):
+                return APIError(kind=ErrorCodesMappingNumber.CHAT_MESSAGE_NOT_FOUND.value)
+
             return None
         except Exception as e:
-            logger.error(f"Error creating chat feedback: {e}")
+            logger.error(f"Error updating message chain: {e}")
             return APIError(kind=ErrorCodesMappingNumber.INTERNAL_SERVER_ERROR.value)
+
+    async def delete_chat_messages(
+        self, chat_message_ids: List[str], chat_session_id: str, user_id: str
+    ) -> Tuple[List[Optional[str]], Optional[APIError]]:
+        """
+        Delete chat messages by id in a single DELETE statement,
+        which checks the ownership of the chat session itself.
+
+        Args:
+            chat_message_ids(List[str]): Message ids
+            chat_session_id(str): Chat session id
+            user_id(str): User id
+
+        Returns:
+            Tuple[List[Optional[str]], Optional[APIError]]: Object names of the deleted chat messages, None if not
+            offloaded, and APIError object if any error
+        """
+        if not chat_message_ids:
+            return [], None
+
+        try:
+            message_object_names = await self._db_session.scalars(
+                delete(ChatMessage)
+                .where(
+                    and_(
+                        ChatMessage.id.in_(chat_message_ids),
+                        ChatMessage.chat_session_id == chat_session_id,
+                        _is_owned_by(chat_session_id=chat_session_id, user_id=user_id),
+                    )
+                )
+                .returning(ChatMessage.message_object_name)
+            )
+            return list(message_object_names), None
+        except Exception as e:
+            logger.error(f"Error deleting chat messages: {e}")
+            return [], APIError(kind=ErrorCodesMappingNumber.INTERNAL_SERVER_ERROR.value)
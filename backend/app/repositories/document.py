@@ -1,8 +1,15 @@
+from datetime import datetime
+from datetime import timezone
 from typing import Optional
+from typing import Tuple
 
+from sqlalchemy import or_
+from sqlalchemy import select
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 
 from app.models.document import Document
+from app.models.document import IndexStatus
 from app.repositories.base import BaseRepository
 from app.utils.api.api_response import APIError
 from app.utils.api.error_handler import ErrorCodesMappingNumber
@@ -21,6 +28,50 @@ class DocumentRepository(BaseRepository):
         """
         super().__init__(db_session=db_session)
 
+    def get_document_by_content_hash(
+        self, content_hash: str
+    ) -> Tuple[Optional[Document], Optional[APIError]]:
+        """
+        Get the document with the given content.
+
+        Args:
+            content_hash(str): Hex SHA-256 of the document content.
+
+        Returns:
+            Tuple[Optional[Document], Optional[APIError]]: Document object, None if no document has this content,
+            and APIError object if any error.
+        """
+        try:
+            document = self._db_session.execute(
+                select(Document).where(Document.content_hash == content_hash)
+            ).scalar_one_or_none()
+            return document, None
+        except Exception as e:
+            logger.error(f"Error getting document by content hash: {e}", exc_info=True)
+            return None, APIError(kind=ErrorCodesMappingNumber.INTERNAL_SERVER_ERROR.value)
+
+    def get_document(self, document_id: str) -> Tuple[Optional[Document], Optional[APIError]]:
+        """
+        Get a document that has not been deleted.
+
+        Args:
+            document_id(str): Document id.
+
+        Returns:
+            Tuple[Optional[Document], Optional[APIError]]: Document object and APIError object if any error.
+        """
+        try:
+            document = self._db_session.execute(
+                select(Document).where(Document.id == document_id, Document.deleted_at.is_(None))
+            ).scalar_one_or_none()
+            if document is None:
+                return None, APIError(kind=ErrorCodesMappingNumber.DOCUMENT_NOT_FOUND.value)
+
+            return document, None
+        except Exception as e:
+            logger.error(f"Error getting document: {e}", exc_info=True)
+            return None, APIError(kind=ErrorCodesMappingNumber.INTERNAL_SERVER_ERROR.value)
+
     def create_document(self, document: Document) -> Optional[APIError]:
         """
         Create a new document.
@@ -37,3 +88,94 @@ class DocumentRepository(BaseRepository):
         except Exception as e:
             logger.error(f"Error creating document: {e}", exc_info=True)
             return APIError(kind=ErrorCodesMappingNumber.INTERNAL_SERVER_ERROR.value)
+
+    def retire_document(self, document: Document) -> Optional[APIError]:
+        """
+        Retire a document replaced by its new version, which takes over its indexed chunks.
+        Its content hash is cleared, so that uploading its content again indexes it again.
+
+        Args:
+            document(Document): Replaced document.
+
+        Returns:
+            Optional[APIError]: APIError object if any error.
+        """
+        try:
+            document.is_outdated = True
+            document.content_hash = None
+            document.deleted_at = datetime.now(timezone.utc)
+            return None
+        except Exception as e:
+            logger.error(f"Error retiring document: {e}", exc_info=True)
+            return APIError(kind=ErrorCodesMappingNumber.INTERNAL_SERVER_ERROR.value)
+
+    def claim_document_indexing(
+        self, document_id: str, task_id: str, stale_before: datetime
+    ) -> Tuple[bool, Optional[APIError]]:
+        """
+        Hand the indexing of a document over to a new background task, if its previous indexing failed or is stale.
+        The check and the update are a single statement, so that concurrent uploads enqueue a single task.
+
+        Args:
+            document_id(str): Document id.
+            task_id(str): Id of the new indexing background task.
+            stale_before(datetime): A pending or running indexing not updated since then is stale.
+
+        Returns:
+            Tuple[bool, Optional[APIError]]: Whether the indexing is handed over to the new task,
+            and APIError object if any error.
+        """
+        try:
+            result = self._db_session.execute(
+                update(Document)
+                .where(
+                    Document.id == document_id,
+                    Document.index_status != IndexStatus.SUCCESS,
+                    or_(
+                        Document.index_status == IndexStatus.FAILED,
+                        Document.updated_at < stale_before,
+                    ),
+                )
+                .values(index_status=IndexStatus.NOT_STARTED, index_task_id=task_id)
+            )
+            return result.rowcount > 0, None
+        except Exception as e:
+            logger.error(f"Error claiming document indexing: {e}", exc_info=True)
+            return False, APIError(kind=ErrorCodesMappingNumber.INTERNAL_SERVER_ERROR.value)
+
+    def update_document_index_status(
+        self, document_id: str, task_id: str, index_status: IndexStatus
+    ) -> Optional[APIError]:
+        """
+        Record the indexing state of the document, reported by the indexing background task in charge of it.
+        A document indexed completely is also marked as synced.
+
+        Args:
+            document_id(str): Document id.
+            task_id(str): Id of the reporting indexing background task.
+            index_status(IndexStatus): Indexing state of the document.
+
+        Returns:
+            Optional[APIError]: APIError object if any error.
+        """
+        try:
+            values = {"index_status": index_status}
+            if index_status == IndexStatus.SUCCESS:
+                values["last_synced_at"] = datetime.now(timezone.utc)
+
+            # A stale task, whose document has been handed over to another task, does not report anymore
+            result = self._db_session.execute(
+                update(Document)
+                .where(Document.id == document_id, Document.index_task_id == task_id)
+                .values(**values)
+            )
+            if result.rowcount == 0:
+                logger.warning(
+                    f"Document {document_id} not found or not indexed by task {task_id}, "
+                    f"its index status is not updated"
+                )
+
+            return None
+        except Exception as e:
+            logger.error(f"Error updating document index status: {e}", exc_info=True)
+            return APIError(kind=ErrorCodesMappingNumber.INTERNAL_SERVER_ERROR.value)
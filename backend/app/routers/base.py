@@ -1,7 +1,12 @@
 from fastapi import APIRouter
+from fastapi import Depends
 from fastapi import status
 
 from app import __version__
+from app.databases.redis import get_redis_connector
+from app.databases.redis import RedisConnector
+from app.integrations.llama_index.engines import get_condense_stats
+from app.integrations.llama_index.llms import get_llm_rate_limiter_stats
 from app.utils.api.api_response import APIResponse
 from app.utils.api.api_response import BackendAPIResponse
 
@@ -48,3 +53,37 @@ def version() -> BackendAPIResponse:
         BackendAPIResponse: API response
     """
     return BackendAPIResponse().set_data({"version": __version__}).respond()
+
+
+@router.get("/metrics/llm", response_model=APIResponse, status_code=status.HTTP_200_OK)
+def llm_metrics(
+    redis_connector: RedisConnector = Depends(get_redis_connector),
+) -> BackendAPIResponse:
+    """
+    Show the queue depth, in-flight requests and wait time of the LLM rate limiters
+
+    Args:
+        redis_connector (RedisConnector): Redis connector object.
+
+    Returns:
+        BackendAPIResponse: API response
+    """
+    stats = get_llm_rate_limiter_stats(redis_client=redis_connector.get_client())
+    return BackendAPIResponse().set_data(stats).respond()
+
+
+@router.get("/metrics/condense", response_model=APIResponse, status_code=status.HTTP_200_OK)
+def condense_metrics(
+    redis_connector: RedisConnector = Depends(get_redis_connector),
+) -> BackendAPIResponse:
+    """
+    Show the outcomes of the condense stage and the number of saved condense LLM calls
+
+    Args:
+        redis_connector (RedisConnector): Redis connector object.
+
+    Returns:
+        BackendAPIResponse: API response
+    """
+    stats = get_condense_stats(redis_client=redis_connector.get_client())
+    return BackendAPIResponse().set_data(stats).respond()
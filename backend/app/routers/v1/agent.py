@@ -7,6 +7,7 @@ from sqlalchemy.orm import Session
 from app.databases.minio import get_minio_connector
 from app.databases.minio import MinioConnector
 from app.databases.mssql import get_db_session
+from app.databases.mssql import get_read_db_session
 from app.models import User
 from app.models.agent import AgentRequest
 from app.models.agent import AgentResponse
@@ -25,14 +26,14 @@ router = APIRouter(prefix="/agents", tags=["agent", "assistant"])
 
 @router.get("", response_model=APIResponse, status_code=status.HTTP_200_OK)
 def get_agents(
-    db_session: Session = Depends(get_db_session),
+    db_session: Session = Depends(get_read_db_session),
     user: User = Depends(get_current_user_from_token),
 ) -> BackendAPIResponse:
     """
     Get all agents.
 
     Args:
-        db_session (Session): Database session. Defaults to relational database session.
+        db_session (Session): Read-only database session. Defaults to the read replica session.
         user (User): User object.
 
     Returns:
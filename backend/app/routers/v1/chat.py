@@ -1,20 +1,34 @@
+from datetime import datetime
+from typing import Iterator
+from typing import Optional
+
 from fastapi import APIRouter
 from fastapi import Depends
+from fastapi import Header
 from fastapi import HTTPException
+from fastapi import Query
 from fastapi import status
 from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from sse_starlette import EventSourceResponse
 
+from app.databases.mssql import get_async_db_session
 from app.databases.mssql import get_db_session
+from app.databases.mssql import get_read_db_session
+from app.databases.mssql import ReadSessionLocal
 from app.databases.qdrant import get_qdrant_connector
 from app.databases.qdrant import QdrantConnector
+from app.databases.redis import get_redis_connector
+from app.databases.redis import RedisConnector
 from app.models import User
 from app.models.chat import ChatFeedbackRequest
 from app.models.chat import ChatMessageRequest
 from app.models.chat import ChatMessageRequestType
+from app.models.chat import ChatMessageResponse
 from app.models.chat import ChatSessionRequest
 from app.models.chat import ChatSessionResponse
+from app.services.chat import AsyncChatService
 from app.services.chat import ChatService
 from app.settings import Constants
 from app.utils.api.api_response import APIResponse
@@ -29,13 +43,18 @@ router = APIRouter(prefix="/chat", tags=["chat", "session", "message"])
 
 @router.get("/chat-sessions", response_model=APIResponse, status_code=status.HTTP_200_OK)
 def get_chat_sessions(
-    db_session: Session = Depends(get_db_session), user: User = Depends(get_current_user_from_token)
+    limit: int = Query(Constants.CHAT_SESSION_PAGE_SIZE, ge=1, le=Constants.MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db_session: Session = Depends(get_read_db_session),
+    user: User = Depends(get_current_user_from_token),
 ) -> BackendAPIResponse:
     """
-    Get all chat sessions of the user.
+    Get a page of the chat sessions of the user, from the most recently updated.
 
     Args:
-        db_session (Session): Database session. Defaults to relational database session.
+        limit (int): Maximum number of chat sessions. Defaults to 50.
+        cursor (Optional[str]): Cursor of the page, i.e. the next_cursor of the previous page. Defaults to None.
+        db_session (Session): Read-only database session. Defaults to the read replica session.
         user (User): User object
 
     Returns:
@@ -46,25 +65,111 @@ def get_chat_sessions(
         raise HTTPException(status_code=status_code, detail=detail)
 
     # Get chat sessions of user
-    chat_sessions, err = ChatService(db_session=db_session).get_chat_sessions(user_id=user.id)
+    chat_session_page, err = ChatService(db_session=db_session).get_chat_sessions(
+        user_id=user.id, limit=limit, cursor=cursor
+    )
     if err:
         status_code, detail = err.kind
         raise HTTPException(status_code=status_code, detail=detail)
 
-    # Parse chat sessions
-    if chat_sessions:
-        data = [ChatSessionResponse.model_validate(chat_session) for chat_session in chat_sessions]
-    else:
-        data = []
+    return (
+        BackendAPIResponse()
+        .set_message(message=Constants.API_SUCCESS)
+        .set_data(data=chat_session_page)
+        .respond()
+    )
+
+
+@router.get("/search", response_model=APIResponse, status_code=status.HTTP_200_OK)
+def search_chat_messages(
+    q: str = Query(..., min_length=1, max_length=Constants.MAX_SEARCH_QUERY_LENGTH),
+    limit: int = Query(Constants.CHAT_MESSAGE_PAGE_SIZE, ge=1, le=Constants.MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
+    db_session: Session = Depends(get_read_db_session),
+    user: User = Depends(get_current_user_from_token),
+) -> BackendAPIResponse:
+    """
+    Search the chat history of the user, from the most relevant chat message.
+    The search is accent-insensitive and every word of the query matches as a prefix.
+
+    Args:
+        q (str): Search query.
+        limit (int): Maximum number of chat messages. Defaults to 50.
+        offset (int): Number of chat messages to skip, i.e. the next_offset of the previous page. Defaults to 0.
+        db_session (Session): Read-only database session. Defaults to the read replica session.
+        user (User): User object
+
+    Returns:
+        BackendAPIResponse: API response.
+    """
+    if not user:
+        status_code, detail = ErrorCodesMappingNumber.UNAUTHORIZED_REQUEST.value
+        raise HTTPException(status_code=status_code, detail=detail)
+
+    chat_message_page, err = ChatService(db_session=db_session).search_chat_messages(
+        user_id=user.id, search_query=q, limit=limit, offset=offset
+    )
+    if err:
+        status_code, detail = err.kind
+        raise HTTPException(status_code=status_code, detail=detail)
 
     return (
         BackendAPIResponse()
         .set_message(message=Constants.API_SUCCESS)
-        .set_data(data=data)
+        .set_data(data=chat_message_page)
         .respond()
     )
 
 
+@router.get("/export", status_code=status.HTTP_200_OK)
+def export_chat_history(
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    user: User = Depends(get_current_user_from_token),
+) -> StreamingResponse:
+    """
+    Export the chat sessions and chat messages of the user as NDJSON, e.g. for compliance dumps
+    or to build evaluation datasets. Each line is a "chat_session" record or a "chat_message" record
+    of the preceding chat session. The export is streamed from the read replica.
+
+    Args:
+        start_date (Optional[datetime]): Only export the chat messages created at or after this time. Defaults to None.
+        end_date (Optional[datetime]): Only export the chat messages created before this time. Defaults to None.
+        user (User): User object.
+
+    Returns:
+        StreamingResponse: NDJSON stream of the chat history.
+    """
+    if not user:
+        status_code, detail = ErrorCodesMappingNumber.UNAUTHORIZED_REQUEST.value
+        raise HTTPException(status_code=status_code, detail=detail)
+
+    # The database session outlives this function, it is closed once the export is streamed
+    db_session = ReadSessionLocal()
+    lines, err = ChatService(db_session=db_session).export_chat_history(
+        user_id=user.id, created_after=start_date, created_before=end_date
+    )
+    if err:
+        db_session.close()
+        status_code, detail = err.kind
+        raise HTTPException(status_code=status_code, detail=detail)
+
+    def stream() -> Iterator[bytes]:
+        try:
+            yield from lines
+        except Exception as e:
+            logger.error(f"Error exporting chat history: {e}")
+            raise
+        finally:
+            db_session.close()
+
+    return StreamingResponse(
+        stream(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="chat-history.ndjson"'},
+    )
+
+
 @router.get(
     "/chat-sessions/{chat_session_id}", response_model=APIResponse, status_code=status.HTTP_200_OK
 )
@@ -110,6 +215,94 @@ def get_chat_session(
     )
 
 
+@router.get(
+    "/chat-sessions/{chat_session_id}/messages",
+    response_model=APIResponse,
+    status_code=status.HTTP_200_OK,
+)
+def get_chat_messages(
+    chat_session_id: str,
+    limit: int = Query(Constants.CHAT_MESSAGE_PAGE_SIZE, ge=1, le=Constants.MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db_session: Session = Depends(get_db_session),
+    user: User = Depends(get_current_user_from_token),
+) -> BackendAPIResponse:
+    """
+    Get a page of the chat messages of the chat session, from the newest.
+
+    Args:
+        chat_session_id (str): Chat session id.
+        limit (int): Maximum number of chat messages. Defaults to 50.
+        cursor (Optional[str]): Cursor of the page, i.e. the next_cursor of the previous page. Defaults to None.
+        db_session (Session): Database session. Defaults to relational database session.
+        user (User): User object.
+
+    Returns:
+        BackendAPIResponse: API response.
+    """
+    if not user:
+        status_code, detail = ErrorCodesMappingNumber.UNAUTHORIZED_REQUEST.value
+        raise HTTPException(status_code=status_code, detail=detail)
+
+    # Get chat messages of the chat session
+    chat_message_page, err = ChatService(db_session=db_session).get_chat_messages(
+        chat_session_id=chat_session_id, user_id=user.id, limit=limit, cursor=cursor
+    )
+    if err:
+        status_code, detail = err.kind
+        raise HTTPException(status_code=status_code, detail=detail)
+
+    return (
+        BackendAPIResponse()
+        .set_message(message=Constants.API_SUCCESS)
+        .set_data(data=chat_message_page)
+        .respond()
+    )
+
+
+@router.get(
+    "/chat-sessions/{chat_session_id}/messages/{chat_message_id}",
+    response_model=APIResponse,
+    status_code=status.HTTP_200_OK,
+)
+def get_chat_message(
+    chat_session_id: str,
+    chat_message_id: str,
+    db_session: Session = Depends(get_db_session),
+    user: User = Depends(get_current_user_from_token),
+) -> BackendAPIResponse:
+    """
+    Get chat message by id, with its full message. The long messages are only previewed in the other responses.
+
+    Args:
+        chat_session_id (str): Chat session id.
+        chat_message_id (str): Chat message id.
+        db_session (Session): Database session. Defaults to relational database session.
+        user (User): User object.
+
+    Returns:
+        BackendAPIResponse: API response.
+    """
+    if not user:
+        status_code, detail = ErrorCodesMappingNumber.UNAUTHORIZED_REQUEST.value
+        raise HTTPException(status_code=status_code, detail=detail)
+
+    # Get chat message
+    chat_message, err = ChatService(db_session=db_session).get_chat_message(
+        chat_message_id=chat_message_id, chat_session_id=chat_session_id, user_id=user.id
+    )
+    if err:
+        status_code, detail = err.kind
+        raise HTTPException(status_code=status_code, detail=detail)
+
+    return (
+        BackendAPIResponse()
+        .set_message(message=Constants.API_SUCCESS)
+        .set_data(data=ChatMessageResponse.model_validate(chat_message))
+        .respond()
+    )
+
+
 @router.post("/chat-sessions", response_model=APIResponse, status_code=status.HTTP_201_CREATED)
 def create_chat_session(
     chat_session_request: ChatSessionRequest,
@@ -231,12 +424,13 @@ def delete_chat_session(
     "/chat-sessions/{chat_session_id}/messages",
     status_code=status.HTTP_201_CREATED,
 )
-def handle_new_chat_message(
+async def handle_new_chat_message(
     chat_session_id: str,
     chat_message_request: ChatMessageRequest,
-    db_session: Session = Depends(get_db_session),
+    db_session: AsyncSession = Depends(get_async_db_session),
     user: User = Depends(get_current_user_from_token),
     qdrant_connector: QdrantConnector = Depends(get_qdrant_connector),
+    redis_connector: RedisConnector = Depends(get_redis_connector),
 ) -> StreamingResponse:
     """
     This endpoint is both used for all the following purposes:
@@ -247,9 +441,10 @@ def handle_new_chat_message(
     Args:
         chat_session_id (str): Chat session id.
         chat_message_request (ChatMessageRequest): Chat message request object.
-        db_session (Session): Database session. Defaults to relational database session.
+        db_session (AsyncSession): Async database session. Defaults to relational database session.
         user (User): Current user object.
         qdrant_connector (QdrantConnector): Qdrant connector object.
+        redis_connector (RedisConnector): Redis connector object.
 
     Returns:
         StreamingResponse: Streams the response with chat request and new chat response.
@@ -263,8 +458,8 @@ def handle_new_chat_message(
         raise HTTPException(status_code=status_code, detail=detail)
 
     # Generate the content
-    content = ChatService(
-        db_session=db_session, qdrant_connector=qdrant_connector
+    content = AsyncChatService(
+        db_session=db_session, qdrant_connector=qdrant_connector, redis_connector=redis_connector
     ).generate_stream_chat_message(
         chat_message_request=chat_message_request,
         chat_session_id=chat_session_id,
@@ -274,6 +469,49 @@ def handle_new_chat_message(
     return EventSourceResponse(content=content)
 
 
+@router.get(
+    "/chat-sessions/{chat_session_id}/messages/{chat_message_id}/stream",
+    status_code=status.HTTP_200_OK,
+)
+async def resume_chat_message_stream(
+    chat_session_id: str,
+    chat_message_id: str,
+    last_event_id: Optional[str] = Header(default=None, alias="Last-Event-ID"),
+    db_session: AsyncSession = Depends(get_async_db_session),
+    user: User = Depends(get_current_user_from_token),
+    redis_connector: RedisConnector = Depends(get_redis_connector),
+) -> StreamingResponse:
+    """
+    Resume the stream of a chat response message after a reconnect or a page refresh.
+    The response keeps being generated while no client is connected, so resuming never generates it again.
+
+    Args:
+        chat_session_id (str): Chat session id.
+        chat_message_id (str): Chat response message id, i.e. the child message id sent in the metadata event.
+        last_event_id (Optional[str]): Id of the last event received by the client. Defaults to None.
+        db_session (AsyncSession): Async database session. Defaults to relational database session.
+        user (User): Current user object.
+        redis_connector (RedisConnector): Redis connector object.
+
+    Returns:
+        StreamingResponse: Streams the remaining events of the chat response.
+    """
+    if not user:
+        status_code, detail = ErrorCodesMappingNumber.UNAUTHORIZED_REQUEST.value
+        raise HTTPException(status_code=status_code, detail=detail)
+
+    content = AsyncChatService(
+        db_session=db_session, redis_connector=redis_connector
+    ).resume_stream_chat_message(
+        chat_session_id=chat_session_id,
+        chat_message_id=chat_message_id,
+        user_id=user.id,
+        last_event_id=last_event_id,
+    )
+
+    return EventSourceResponse(content=content)
+
+
 @router.post("/feedback", response_model=APIResponse, status_code=status.HTTP_201_CREATED)
 def create_chat_feedback(
     chat_feedback_request: ChatFeedbackRequest,
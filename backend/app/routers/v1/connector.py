@@ -5,6 +5,7 @@ from fastapi import status
 from sqlalchemy.orm import Session
 
 from app.databases.mssql import get_db_session
+from app.databases.mssql import get_read_db_session
 from app.models.connector import ConnectorRequest
 from app.models.connector import ConnectorResponse
 from app.services.connector import ConnectorService
@@ -18,12 +19,12 @@ router = APIRouter(prefix="/connectors", tags=["connectors"])
 
 
 @router.get("", response_model=APIResponse, status_code=status.HTTP_200_OK)
-def get_connectors(db_session: Session = Depends(get_db_session)) -> BackendAPIResponse:
+def get_connectors(db_session: Session = Depends(get_read_db_session)) -> BackendAPIResponse:
     """
     Get all connectors.
 
     Args:
-        db_session (Session, optional): Database session. Defaults to relational database engine.
+        db_session (Session, optional): Read-only database session. Defaults to the read replica session.
 
     Returns:
         BackendAPIResponse: API response with the list of connectors.
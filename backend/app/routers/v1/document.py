@@ -1,6 +1,8 @@
 from datetime import datetime
 from datetime import timezone
 from typing import List
+from typing import Optional
+from uuid import UUID
 
 from fastapi import APIRouter
 from fastapi import Depends
@@ -29,6 +31,7 @@ router = APIRouter(prefix="/documents", tags=["documents"])
 def upload_documents(
     issue_date: datetime = Form(default_factory=lambda: datetime.now(timezone.utc)),
     uploaded_documents: List[UploadFile] = File(..., max_length=Constants.MAX_FILE_SIZE),
+    replaces_document_id: Optional[UUID] = Form(None),
     db_session: Session = Depends(get_db_session),
     minio_connector: MinioConnector = Depends(get_minio_connector),
 ) -> BackendAPIResponse:
@@ -38,6 +41,8 @@ def upload_documents(
     Args:
         issue_date (datetime): Issue date of the document. Defaults to the current date.
         uploaded_documents (List[UploadFile]): List of documents to upload.
+        replaces_document_id (Optional[UUID]): Id of the previous version of the uploaded document, which is
+            re-indexed incrementally against it. Defaults to None.
         db_session (Session): Database session. Defaults to relational database session.
         minio_connector (MinioConnector): MinIO connector.
 
@@ -48,7 +53,11 @@ def upload_documents(
     uploaded_document_results, err = DocumentService(
         db_session=db_session,
         minio_connector=minio_connector,
-    ).upload_documents(issue_date=issue_date, uploaded_documents=uploaded_documents)
+    ).upload_documents(
+        issue_date=issue_date,
+        uploaded_documents=uploaded_documents,
+        replaces_document_id=str(replaces_document_id) if replaces_document_id else None,
+    )
     if err:
         status_code, detail = err.kind
         raise HTTPException(status_code=status_code, detail=detail)
@@ -56,8 +65,13 @@ def upload_documents(
     # Parse response
     if uploaded_document_results:
         data = [
-            DocumentUploadResponse(task_id=task_id, document_url=document_url)
-            for document_url, task_id in uploaded_document_results
+            DocumentUploadResponse(
+                document_id=document.id,
+                task_id=task_id,
+                document_url=document.document_url,
+                is_duplicate=task_id is None,
+            )
+            for document, task_id in uploaded_document_results
         ]
     else:
         data = []
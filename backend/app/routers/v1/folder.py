@@ -5,6 +5,7 @@ from fastapi import status
 from sqlalchemy.orm import Session
 
 from app.databases.mssql import get_db_session
+from app.databases.mssql import get_read_db_session
 from app.models import User
 from app.models.folder import FolderRequest
 from app.models.folder import FolderResponse
@@ -22,13 +23,14 @@ router = APIRouter(prefix="/folders", tags=["folders", "chat", "session", "messa
 
 @router.get("", response_model=APIResponse, status_code=status.HTTP_200_OK)
 def get_folders(
-    db_session: Session = Depends(get_db_session), user: User = Depends(get_current_user_from_token)
+    db_session: Session = Depends(get_read_db_session),
+    user: User = Depends(get_current_user_from_token),
 ) -> BackendAPIResponse:
     """
     Get all chat folders of the user.
 
     Args:
-        db_session (Session): Database session. Defaults to relational database session.
+        db_session (Session): Read-only database session. Defaults to the read replica session.
         user (User): User object
 
     Returns:
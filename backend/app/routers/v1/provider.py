@@ -5,6 +5,7 @@ from fastapi import status
 from sqlalchemy.orm import Session
 
 from app.databases.mssql import get_db_session
+from app.databases.mssql import get_read_db_session
 from app.models.provider import EmbeddingProviderRequest
 from app.models.provider import EmbeddingProviderResponse
 from app.models.provider import LLMProviderRequest
@@ -21,12 +22,14 @@ router = APIRouter(prefix="/providers", tags=["embedding", "llm", "provider", "m
 
 
 @router.get("/embeddings", response_model=APIResponse, status_code=status.HTTP_200_OK)
-def get_embedding_providers(db_session: Session = Depends(get_db_session)) -> BackendAPIResponse:
+def get_embedding_providers(
+    db_session: Session = Depends(get_read_db_session),
+) -> BackendAPIResponse:
     """
     Get all embedding providers of the application.
 
     Args:
-        db_session (Session): Database session. Defaults to relational database session.
+        db_session (Session): Read-only database session. Defaults to the read replica session.
 
     Returns:
         BackendAPIResponse: API response
@@ -137,13 +140,13 @@ def update_embedding_provider(
 
 @router.get("/llms", response_model=APIResponse, status_code=status.HTTP_200_OK)
 def get_llm_providers(
-    db_session: Session = Depends(get_db_session),
+    db_session: Session = Depends(get_read_db_session),
 ) -> BackendAPIResponse:
     """
     Get all llm providers of the application.
 
     Args:
-        db_session (Session): Database session. Defaults to relational database session.
+        db_session (Session): Read-only database session. Defaults to the read replica session.
 
     Returns:
         BackendAPIResponse: API response.
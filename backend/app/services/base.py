@@ -1,5 +1,7 @@
+from contextlib import asynccontextmanager
 from contextlib import contextmanager
 
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.utils.api.error_handler import DatabaseTransactionError
@@ -33,3 +35,35 @@ class BaseService:
             # Rollback the transaction if an exception occurs
             self._db_session.rollback()
             raise DatabaseTransactionError(message="Database transaction error", detail=str(e))
+
+
+class BaseAsyncService:
+    def __init__(self, db_session: AsyncSession):
+        """
+        Constructor for BaseAsyncService class.
+
+        Args:
+            db_session (AsyncSession): Async database session.
+        """
+        if not isinstance(db_session, AsyncSession):
+            raise TypeError(
+                f"db_session must be an instance of AsyncSession, got {type(db_session)}"
+            )
+
+        self._db_session = db_session
+
+    @asynccontextmanager
+    async def _transaction(self):
+        """
+        Async context manager for handling transaction
+        """
+        try:
+            # Yield the control back to the caller
+            yield
+
+            # Commit the transaction
+            await self._db_session.commit()
+        except Exception as e:
+            # Rollback the transaction if an exception occurs
+            await self._db_session.rollback()
+            raise DatabaseTransactionError(message="Database transaction error", detail=str(e))
@@ -1,71 +1,226 @@
 import asyncio
+import json
 from collections.abc import AsyncGenerator
+from datetime import datetime
+from typing import Any
+from typing import Dict
+from typing import Iterator
 from typing import List
 from typing import Optional
+from typing import Set
 from typing import Tuple
+from uuid import UUID
+from uuid import uuid4
 
 from llama_index.core import Settings
-from llama_index.core.chat_engine import CondensePlusContextChatEngine
-from llama_index.core.types import ChatMessage as LlamaIndexChatMessage
+from llama_index.core.base.llms.generic_utils import messages_to_history_str
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.databases.minio import MinioConnector
+from app.databases.mssql import AsyncSessionLocal
 from app.databases.qdrant import QdrantConnector
+from app.databases.redis import RedisConnector
+from app.integrations.llama_index.engines import ChatEngineFactory
+from app.integrations.llama_index.engines import SemanticAnswerCache
+from app.integrations.llama_index.llms import RateLimitedLLM
+from app.integrations.llama_index.utils import count_tokens
 from app.integrations.llama_index.utils import llamaify_messages
+from app.models import Agent
 from app.models import ChatFeedback
 from app.models import ChatMessage
 from app.models import ChatSession
 from app.models.chat import ChatFeedbackRequest
 from app.models.chat import ChatMessageRequest
+from app.models.chat import ChatMessageErrorType
+from app.models.chat import ChatMessagePageResponse
 from app.models.chat import ChatMessageRequestType
 from app.models.chat import ChatMessageResponse
+from app.models.chat import ChatMessageSearchPageResponse
 from app.models.chat import ChatMessageStreamEventType
 from app.models.chat import ChatMessageType
+from app.models.chat import ChatSessionPageResponse
 from app.models.chat import ChatSessionRequest
+from app.models.chat import ChatSessionResponse
 from app.models.chat import ChatStreamResponse
+from app.repositories.chat import AsyncChatRepository
 from app.repositories.chat import ChatRepository
+from app.services.base import BaseAsyncService
 from app.services.base import BaseService
 from app.settings import Constants
 from app.utils.api.api_response import APIError
 from app.utils.api.error_handler import ConversationError
+from app.utils.api.error_handler import ErrorCodesMappingNumber
+from app.utils.api.helpers import decode_cursor
+from app.utils.api.helpers import encode_cursor
 from app.utils.api.helpers import get_logger
+from app.utils.api.streaming import coalesce_stream
+from app.utils.api.streaming import RedisChatStream
+from app.utils.chat import delete_offloaded_chat_messages
+from app.utils.chat import hydrate_chat_messages
+from app.utils.chat import load_chat_message
+from app.utils.chat import offload_chat_message
+from app.utils.llm.helpers import get_chat_session_naming_llm
+from app.utils.string import build_full_text_query
+from app.utils.string import normalize_search_text
 
 logger = get_logger(__name__)
 
+# Chat generations running detached from their requests
+_detached_generations: Set[asyncio.Task] = set()
+
 
 class ChatService(BaseService):
-    def __init__(self, db_session: Session, qdrant_connector: Optional[QdrantConnector] = None):
+    def __init__(self, db_session: Session):
         """
         Chat service class for handling chat-related operations.
+        The streaming chat operations are handled by `AsyncChatService`.
 
         Args:
             db_session(Session): Database session
-            qdrant_connector(QdrantConnector): Vector database connection. Defaults to None.
         """
         super().__init__(db_session=db_session)
 
         # Define repositories
         self._chat_repository = ChatRepository(db_session=self._db_session)
 
-        # Define external storage's connectors
-        self._qdrant_connector = qdrant_connector
+    @staticmethod
+    def _decode_cursor(
+        cursor: Optional[str],
+    ) -> Tuple[Optional[Tuple[datetime, UUID]], Optional[APIError]]:
+        """
+        Decode the pagination cursor of the request.
+
+        Args:
+            cursor(Optional[str]): Pagination cursor
 
-    def get_chat_sessions(self, user_id: str) -> Tuple[List[ChatSession], Optional[APIError]]:
+        Returns:
+            Tuple[Optional[Tuple[datetime, UUID]], Optional[APIError]]: Keyset of the cursor and APIError object if any error
+        """
+        if not cursor:
+            return None, None
+
+        try:
+            return decode_cursor(cursor), None
+        except ValueError as e:
+            logger.warning(f"Error decoding pagination cursor: {e}")
+            return None, APIError(kind=ErrorCodesMappingNumber.INVALID_REQUEST.value)
+
+    def get_chat_sessions(
+        self,
+        user_id: str,
+        limit: int = Constants.CHAT_SESSION_PAGE_SIZE,
+        cursor: Optional[str] = None,
+    ) -> Tuple[Optional[ChatSessionPageResponse], Optional[APIError]]:
         """
-        Get all chat sessions of the user.
+        Get a page of the chat sessions of the user, from the most recently updated.
 
         Args:
             user_id(str): User id
+            limit(int): Maximum number of chat sessions. Defaults to 50.
+            cursor(Optional[str]): Cursor of the page. Defaults to None (first page).
 
         Returns:
-            Tuple[List[ChatSession], Optional[APIError]]: List of chat session objects and APIError object if any error
+            Tuple[Optional[ChatSessionPageResponse], Optional[APIError]]: Page of chat sessions and APIError object if any error
         """
-        return self._chat_repository.get_chat_sessions(user_id=user_id)
+        keyset, err = self._decode_cursor(cursor)
+        if err:
+            return None, err
+
+        # Fetch one more chat session to know whether there is a next page
+        chat_sessions, err = self._chat_repository.get_chat_sessions(
+            user_id=user_id, limit=limit + 1, cursor=keyset
+        )
+        if err:
+            return None, err
+
+        next_cursor = None
+        if len(chat_sessions) > limit:
+            chat_sessions = chat_sessions[:limit]
+            next_cursor = encode_cursor(chat_sessions[-1].updated_at, chat_sessions[-1].id)
+
+        return ChatSessionPageResponse(items=chat_sessions, next_cursor=next_cursor), None
+
+    def get_chat_messages(
+        self,
+        chat_session_id: str,
+        user_id: str,
+        limit: int = Constants.CHAT_MESSAGE_PAGE_SIZE,
+        cursor: Optional[str] = None,
+    ) -> Tuple[Optional[ChatMessagePageResponse], Optional[APIError]]:
+        """
+        Get a page of the chat messages of the chat session, from the newest.
+
+        Args:
+            chat_session_id(str): Chat session id
+            user_id(str): User id
+            limit(int): Maximum number of chat messages. Defaults to 50.
+            cursor(Optional[str]): Cursor of the page. Defaults to None (first page).
+
+        Returns:
+            Tuple[Optional[ChatMessagePageResponse], Optional[APIError]]: Page of chat messages and APIError object if any error
+        """
+        keyset, err = self._decode_cursor(cursor)
+        if err:
+            return None, err
+
+        # Fetch one more chat message to know whether there is a next page
+        chat_messages, err = self._chat_repository.get_chat_messages(
+            chat_session_id=chat_session_id, user_id=user_id, limit=limit + 1, cursor=keyset
+        )
+        if err:
+            return None, err
+
+        next_cursor = None
+        if len(chat_messages) > limit:
+            chat_messages = chat_messages[:limit]
+            next_cursor = encode_cursor(chat_messages[-1].created_at, chat_messages[-1].id)
+
+        return ChatMessagePageResponse(items=chat_messages, next_cursor=next_cursor), None
+
+    def search_chat_messages(
+        self,
+        user_id: str,
+        search_query: str,
+        limit: int = Constants.CHAT_MESSAGE_PAGE_SIZE,
+        offset: int = 0,
+    ) -> Tuple[Optional[ChatMessageSearchPageResponse], Optional[APIError]]:
+        """
+        Search the chat history of the user, accent-insensitively, from the most relevant chat message.
+
+        Args:
+            user_id(str): User id
+            search_query(str): Search query
+            limit(int): Maximum number of chat messages. Defaults to 50.
+            offset(int): Number of chat messages to skip. Defaults to 0.
+
+        Returns:
+            Tuple[Optional[ChatMessageSearchPageResponse], Optional[APIError]]: Page of chat messages and APIError object if any error
+        """
+        search_condition = build_full_text_query(input_str=search_query)
+        if search_condition is None:
+            return None, APIError(kind=ErrorCodesMappingNumber.INVALID_REQUEST.value)
+
+        # Fetch one more chat message to know whether there is a next page
+        chat_messages, err = self._chat_repository.search_chat_messages(
+            user_id=user_id, search_condition=search_condition, limit=limit + 1, offset=offset
+        )
+        if err:
+            return None, err
+
+        next_offset = None
+        if len(chat_messages) > limit:
+            chat_messages = chat_messages[:limit]
+            next_offset = offset + limit
+
+        return ChatMessageSearchPageResponse(items=chat_messages, next_offset=next_offset), None
 
     def get_chat_session(
         self, chat_session_id: str, user_id: str
     ) -> Tuple[Optional[ChatSession], Optional[APIError]]:
         """
-        Get chat session by id.
+        Get chat session by id, with the chat messages of its active chain.
 
         Args:
             chat_session_id(str): Chat session id
@@ -74,10 +229,98 @@ class ChatService(BaseService):
         Returns:
             Tuple[Optional[ChatSession], Optional[APIError]]: Chat session object and APIError object if any error
         """
-        return self._chat_repository.get_chat_session(
+        return self._chat_repository.get_chat_session_with_active_chat_messages(
             chat_session_id=chat_session_id, user_id=user_id
         )
 
+    def export_chat_history(
+        self,
+        user_id: str,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None,
+    ) -> Tuple[Optional[Iterator[bytes]], Optional[APIError]]:
+        """
+        Export the chat history of the user as NDJSON lines: a "chat_session" record followed by
+        the "chat_message" records of the chat session, for every chat session with messages in the date range.
+        The lines are generated while the rows are fetched, in constant memory.
+        The offloaded messages are exported in full.
+
+        Args:
+            user_id(str): User id
+            created_after(Optional[datetime]): Only export the chat messages created at or after this time
+            created_before(Optional[datetime]): Only export the chat messages created before this time
+
+        Returns:
+            Tuple[Optional[Iterator[bytes]], Optional[APIError]]: NDJSON lines and APIError object if any error
+        """
+        rows, err = self._chat_repository.get_chat_history_for_export(
+            user_id=user_id, created_after=created_after, created_before=created_before
+        )
+        if err:
+            return None, err
+
+        def encode(record_type: str, record: BaseModel, **kwargs: Any) -> bytes:
+            line = json.dumps(
+                {"type": record_type, **record.model_dump(mode="json", **kwargs)},
+                ensure_ascii=False,
+            )
+            return (line + "\n").encode("utf-8")
+
+        def generate() -> Iterator[bytes]:
+            minio_connector = MinioConnector()
+            chat_session_id = None
+            for row in rows:
+                mapping = row._mapping
+                if mapping["chat_session_id"] != chat_session_id:
+                    chat_session_id = mapping["chat_session_id"]
+                    yield encode(
+                        "chat_session",
+                        ChatSessionResponse.model_validate(
+                            {
+                                key.removeprefix("chat_session__"): value
+                                for key, value in mapping.items()
+                                if key.startswith("chat_session__")
+                            }
+                        ),
+                        exclude={"chat_messages"},
+                    )
+
+                chat_message = ChatMessageResponse.model_validate(row)
+                if mapping["message_object_name"]:
+                    message = load_chat_message(
+                        minio_connector=minio_connector,
+                        object_name=mapping["message_object_name"],
+                    )
+                    if message is not None:
+                        chat_message.message, chat_message.is_truncated = message, False
+
+                yield encode("chat_message", chat_message)
+
+        return generate(), None
+
+    def get_chat_message(
+        self, chat_message_id: str, chat_session_id: str, user_id: str
+    ) -> Tuple[Optional[ChatMessage], Optional[APIError]]:
+        """
+        Get chat message by id, with its full message even if it is offloaded to the object storage.
+
+        Args:
+            chat_message_id(str): Chat message id
+            chat_session_id(str): Chat session id
+            user_id(str): User id
+
+        Returns:
+            Tuple[Optional[ChatMessage], Optional[APIError]]: Chat message object and APIError object if any error
+        """
+        chat_message, err = self._chat_repository.get_chat_message(
+            chat_message_id=chat_message_id, chat_session_id=chat_session_id, user_id=user_id
+        )
+        if err:
+            return None, err
+
+        hydrate_chat_messages(minio_connector=MinioConnector(), chat_messages=[chat_message])
+        return chat_message, None
+
     def create_chat_session(
         self, chat_session_request: ChatSessionRequest, user_id: str
     ) -> Tuple[Optional[ChatSession], Optional[APIError]]:
@@ -149,13 +392,122 @@ class ChatService(BaseService):
         """
         with self._transaction():
             # Delete chat session
-            err = self._chat_repository.delete_chat_session(
+            message_object_names, err = self._chat_repository.delete_chat_session(
                 chat_session_id=chat_session_id, user_id=user_id
             )
+        if err:
+            return err
+
+        # Delete the offloaded messages once their rows are gone
+        delete_offloaded_chat_messages(
+            minio_connector=MinioConnector(), object_names=message_object_names
+        )
+        return None
+
+    def purge_expired_chats(
+        self, batch_size: int = Constants.PURGE_EXPIRED_CHATS_BATCH_SIZE
+    ) -> Tuple[Dict[str, int], Optional[APIError]]:
+        """
+        Delete the chat messages and chat sessions expired according to the chat retention of their users.
+        They are deleted by batches, one transaction per batch, so that SQL Server does not escalate
+        the row locks into a table lock and the chat of the other users is not blocked.
+
+        Args:
+            batch_size(int): Maximum number of rows to delete per transaction. Defaults to 5000.
+
+        Returns:
+            Tuple[Dict[str, int], Optional[APIError]]: Number of deleted rows per table and APIError object if any error
+        """
+        purged = {"chat_messages": 0, "chat_sessions": 0}
+        minio_connector = MinioConnector()
+
+        # Delete the chat messages first, so that deleting a chat session never cascades over a whole batch
+        while True:
+            with self._transaction():
+                message_object_names, err = self._chat_repository.delete_expired_chat_messages(
+                    batch_size=batch_size
+                )
+            if err:
+                return purged, err
+
+            # Delete the offloaded messages once their rows are gone
+            delete_offloaded_chat_messages(
+                minio_connector=minio_connector, object_names=message_object_names
+            )
+
+            purged["chat_messages"] += len(message_object_names)
+            if len(message_object_names) < batch_size:
+                break
+
+        while True:
+            with self._transaction():
+                deleted, err = self._chat_repository.delete_expired_chat_sessions(
+                    batch_size=batch_size
+                )
+            if err:
+                return purged, err
+
+            purged["chat_sessions"] += deleted
+            if deleted < batch_size:
+                break
+
+        return purged, None
+
+    def create_chat_feedback(
+        self, chat_feedback_request: ChatFeedbackRequest
+    ) -> Optional[APIError]:
+        """
+        Create chat feedback.
+
+        Args:
+            chat_feedback_request: ChatFeedbackRequest
+
+        Returns:
+            Optional[APIError]: APIError object if any error
+        """
+        with self._transaction():
+            # Define chat feedback
+            chat_feedback = ChatFeedback(
+                chat_message_id=chat_feedback_request.chat_message_id,
+                is_positive=chat_feedback_request.is_positive,
+                feedback_text=chat_feedback_request.feedback_text,
+            )
+
+            # Create chat feedback
+            err = self._chat_feedback_repository.create_chat_feedback(chat_feedback=chat_feedback)
 
         return err if err else None
 
-    def _update_message_chain(
+
+class AsyncChatService(BaseAsyncService):
+    def __init__(
+        self,
+        db_session: AsyncSession,
+        qdrant_connector: Optional[QdrantConnector] = None,
+        redis_connector: Optional[RedisConnector] = None,
+    ):
+        """
+        Async chat service class for handling the streaming chat operations.
+        Every database round trip is awaited, so that the persistence of a chat stream never blocks the event loop.
+
+        Args:
+            db_session(AsyncSession): Async database session
+            qdrant_connector(QdrantConnector): Vector database connection. Defaults to None.
+            redis_connector(RedisConnector): Cache store connection. Defaults to None.
+        """
+        super().__init__(db_session=db_session)
+
+        # Define repositories
+        self._chat_repository = AsyncChatRepository(db_session=self._db_session)
+
+        # Define external storage's connectors
+        self._qdrant_connector = qdrant_connector
+        self._redis_connector = redis_connector
+
+        # Object names of the offloaded messages deleted in the current transaction
+        self._deleted_message_object_names: List[str] = []
+
+    async def _update_message_chain(
         self,
         chat_session_id: str,
         user_id: str,
@@ -164,7 +516,8 @@ class ChatService(BaseService):
     ) -> Optional[APIError]:
         """
         Update message chain.
-        Update the parent message with the child message id and the child message with the parent message id.
+        Update the parent message with the child message id and the child message with the parent message id,
+        in a single statement.
 
         E.g: Assume we have a message chain as follows:
             A -> B -> C
@@ -181,44 +534,24 @@ class ChatService(BaseService):
         Returns:
             Optional[APIError]: APIError object if any error
         """
-        # Update parent message's child reference
-        if parent_message_id:
-            parent_updated_message = ChatMessageRequest(
-                child_message_id=child_message_id
-            ).model_dump(exclude_unset=True)
-            err = self._chat_repository.update_chat_message(
-                chat_session_id=chat_session_id,
-                chat_message_id=parent_message_id,
-                chat_message=parent_updated_message,
-                user_id=user_id,
-            )
-            if err:
-                return err
-
-        # Update child message's parent reference
-        if child_message_id:
-            child_updated_message = ChatMessageRequest(
-                parent_message_id=parent_message_id
-            ).model_dump(exclude_unset=True)
-            err = self._chat_repository.update_chat_message(
-                chat_session_id=chat_session_id,
-                chat_message_id=child_message_id,
-                chat_message=child_updated_message,
-                user_id=user_id,
-            )
-            if err:
-                return err
+        return await self._chat_repository.update_message_chain(
+            chat_session_id=chat_session_id,
+            user_id=user_id,
+            parent_message_id=parent_message_id,
+            child_message_id=child_message_id,
+        )
 
-    def _make_chat_request(
+    async def _make_chat_request(
         self,
         user_id: str,
         chat_session_id: str,
         message: str,
         message_type: ChatMessageType,
         latest_chat_response: Optional[ChatMessage] = None,
+        child_message_id: Optional[UUID] = None,
     ) -> Tuple[Optional[ChatMessage], Optional[APIError]]:
         """
-        Make chat request message.
+        Make chat request message. The message is inserted on the next flush.
 
         Args:
             user_id(str): User id
@@ -226,6 +559,7 @@ class ChatService(BaseService):
             message(str): Message text
             message_type(ChatMessageType): Message type
             latest_chat_response(ChatMessage): Latest chat response message. Defaults to None
+            child_message_id(UUID): Id of the pre-registered chat response message. Defaults to None
 
         Returns:
             Tuple[Optional[ChatMessage], Optional[APIError]]: Chat request message and APIError object if any error
@@ -233,30 +567,30 @@ class ChatService(BaseService):
         # Define the parent message id as the latest chat response id (if any)
         parent_message_id = latest_chat_response.id if latest_chat_response else None
 
-        # Create chat request message
+        # Create chat request message. The id is generated up front, so that the chain can be linked before the flush
         new_chat_request = ChatMessage(
+            id=uuid4(),
             chat_session_id=chat_session_id,
             parent_message_id=parent_message_id,
+            child_message_id=child_message_id,
             message=message,
             message_type=message_type,
+            token_count=count_tokens(message),
         )
 
         # Create chat request message
         logger.info("Creating a new chat request message")
-        err = self._chat_repository.create_chat_message(chat_message=new_chat_request)
+        err = await self._chat_repository.create_chat_message(chat_message=new_chat_request)
         if err:
             return None, err
 
-        # Flush the session to send the data to the database (but do not commit yet)
-        self._db_session.flush()
-
         # Update the child_message_id of the latest chat response (if any)
         if latest_chat_response:
             logger.info("Updating the child_message_id of the latest chat response message")
             latest_updated_chat_response = ChatMessageRequest(
                 child_message_id=new_chat_request.id
             ).model_dump(exclude_unset=True)
-            err = self._chat_repository.update_chat_message(
+            err = await self._chat_repository.update_chat_message(
                 chat_session_id=chat_session_id,
                 chat_message_id=latest_chat_response.id,
                 chat_message=latest_updated_chat_response,
@@ -273,70 +607,95 @@ class ChatService(BaseService):
         chat_session_id: str,
         current_request_id: str,
         pre_register_chat_response: ChatMessage,
-        chat_history: List[LlamaIndexChatMessage],
+        chat_history: List[ChatMessage],
+        agent: Optional[Agent] = None,
+        summary: Optional[str] = None,
     ) -> AsyncGenerator[str, None, None]:
         """
         Generate a streaming chat response message.
         Uses the input message to query the LLM model and generate a streaming response message.
+        No database operation is made while streaming: the pre-registered response message is only updated in memory
+        (content and generation error, if any) and persisted by the caller.
 
         Args:
             chat_message_request (ChatMessageRequest): Chat message request object.
             chat_session_id (str): Chat session ID.
             current_request_id (str): Current request message ID.
             pre_register_chat_response (ChatMessage): Pre-registered chat response message.
-            chat_history (List[LlamaIndexChatMessage]): The LlamaIndex chat history of the chat session.
+            chat_history (List[ChatMessage]): The token-budgeted chat history of the chat session.
+            agent (Optional[Agent]): Agent of the chat session. Defaults to None.
+            summary (Optional[str]): Summary of the messages older than the chat history. Defaults to None.
 
         Yields:
             str: A chunk of the response message generated by the LLM model.
         """
         try:
+            # Load the full message of the long chat messages, only their preview is stored inline
+            await asyncio.to_thread(hydrate_chat_messages, MinioConnector(), chat_history)
+
             # Convert chat history to LlamaIndex chat messages
-            chat_history = llamaify_messages(chat_messages=chat_history)
-
-            # TODO: Remove it as this is just a workaround solution
-            # from app.main import index
-
-            # Define retriever
-            # vector_params = VectorParams(
-            #     size=Constants.DIMENSIONS, distance=Constants.DISTANCE_METRIC_TYPE
-            # )
-            # vector_store = QdrantVectorStore(
-            #     collection_name=Constants.QDRANT_COLLECTION,
-            #     client=self._qdrant_connector.get_client(),
-            #     aclient=self._qdrant_connector.get_aclient(),
-            #     dense_config=vector_params,
-            # )
-            # index: VectorStoreIndex = VectorStoreIndex.from_vector_store(vector_store=vector_store)
-            from app.main import index
-
-            retriever = index.as_retriever(similarity_top_k=Constants.SIMILARITY_TOP_K)
-
-            # chat_engine = index.as_chat_engine()
-            # Define chat engine
-            chat_engine = CondensePlusContextChatEngine.from_defaults(
-                retriever=retriever,
+            chat_history = llamaify_messages(chat_messages=chat_history, summary=summary)
+
+            # Get the chat engine of the agent, bound to the chat history of this request
+            chat_engine = ChatEngineFactory.get_chat_engine(
                 chat_history=chat_history,
-                system_prompt=Constants.CHAT_ENGINE_SYSTEM_PROMPT,
-                context_prompt=Constants.CHAT_ENGINE_CONTEXT_PROMPT,
-                context_refine_prompt=Constants.CHAT_ENGINE_CONTEXT_PROMPT,
-                condense_prompt=Constants.CHAT_ENGINE_CONDENSE_PROMPT,
-                verbose=True,
+                agent=agent,
+                qdrant_connector=self._qdrant_connector,
+                redis_connector=self._redis_connector,
             )
 
-            response_streaming = await chat_engine.astream_chat(
-                message=chat_message_request.message,
-            )
+            # Look up the answer of similar questions of the agent in the semantic cache.
+            # A regenerated message never reuses a cached answer, as the user asks for a new one.
+            semantic_cache, cached_answer = None, None
+            if (
+                Constants.SEMANTIC_CACHE_ENABLED
+                and self._redis_connector
+                and self._qdrant_connector
+            ):
+                semantic_cache = SemanticAnswerCache(
+                    redis_client=self._redis_connector.get_aclient(),
+                    qdrant_client=self._qdrant_connector.get_aclient(),
+                    embed_model=Settings.embed_model,
+                )
+                condensed_question = await chat_engine.acondense_question(
+                    message=chat_message_request.message
+                )
+                if chat_message_request.request_type == ChatMessageRequestType.REGENERATE:
+                    # Neither search nor mark as recently used the answer being replaced
+                    question_embedding = await Settings.embed_model.aget_query_embedding(
+                        condensed_question
+                    )
+                else:
+                    cached_answer, question_embedding = await semantic_cache.alookup(
+                        question=condensed_question, agent=agent
+                    )
+
+                # Reuse the embedding of the condensed question for the retrieval
+                chat_engine.set_query_embedding(
+                    query=condensed_question, embedding=question_embedding
+                )
+
+            if cached_answer is not None:
+                # Replay the cached answer without calling the LLM or the retriever
+                response_gen = self._replay_cached_answer(answer=cached_answer)
+            else:
+                response_streaming = await chat_engine.astream_chat(
+                    message=chat_message_request.message,
+                )
+                response_gen = response_streaming.async_response_gen()
 
             # Initialize empty response message
             accumulated_response = []
+            is_completed = False
 
-            # Stream each chunk as it arrives
+            # Stream the chunks, merged into a single pre-encoded frame per interval
             try:
-                async for chunk in response_streaming.async_response_gen():
+                async for chunk in coalesce_stream(chunks=response_gen):
                     accumulated_response.append(chunk)
-                    yield ChatStreamResponse(
+                    yield ChatStreamResponse.encode(
                         event=ChatMessageStreamEventType.DELTA, content=chunk
-                    ).as_json()
+                    )
+                is_completed = True
             except asyncio.CancelledError:
                 logger.warning(
                     f"Client disconnected - Chat session: {chat_session_id}, Chat request: {current_request_id}"
@@ -345,6 +704,8 @@ class ChatService(BaseService):
                 logger.error(
                     f"Error streaming chat response - Chat session: {chat_session_id}, Chat request: {current_request_id}, Error: {e}"
                 )
+                pre_register_chat_response.error_type = ChatMessageErrorType.GENERATION_ERROR
+                pre_register_chat_response.error = str(e)
                 yield ChatStreamResponse(
                     event=ChatMessageStreamEventType.ERROR,
                     content=f"Error streaming chat response: {e}",
@@ -363,30 +724,43 @@ class ChatService(BaseService):
             # Create final response message with complete text
             complete_response = "".join(accumulated_response) if accumulated_response else ""
             pre_register_chat_response.message = complete_response
-
-            # Store the complete message in the database
-            logger.info("Creating a new chat response message")
-            if err := self._chat_repository.create_chat_message(
-                chat_message=pre_register_chat_response
-            ):
-                yield ChatStreamResponse(
-                    event=ChatMessageStreamEventType.ERROR,
-                    content=f"Error during response creation: {err}",
-                ).as_json()
-
-            # Flush the session to send the data to the database (but do not commit yet)
-            self._db_session.flush()
+            pre_register_chat_response.token_count = count_tokens(complete_response)
+
+            # Cache the newly generated answer, only if it was streamed completely
+            if semantic_cache and cached_answer is None and is_completed and complete_response:
+                await semantic_cache.astore(
+                    question=condensed_question,
+                    embedding=question_embedding,
+                    answer=complete_response,
+                    agent=agent,
+                )
         except Exception as e:
             logger.error(
                 f"Error generating chat response - Chat session: {chat_session_id}, Chat request: {current_request_id}, Error: {e}",
                 exc_info=True,
             )
+            pre_register_chat_response.error_type = ChatMessageErrorType.GENERATION_ERROR
+            pre_register_chat_response.error = str(e)
             yield ChatStreamResponse(
                 event=ChatMessageStreamEventType.ERROR,
                 content=f"Error generating chat response: {e}",
             ).as_json()
 
-    def _delete_messages_and_update_chain(
+    @staticmethod
+    async def _replay_cached_answer(answer: str) -> AsyncGenerator[str, None]:
+        """
+        Replay a cached answer in chunks, so that it is streamed like a generated one.
+
+        Args:
+            answer (str): Cached answer.
+
+        Yields:
+            str: A chunk of the cached answer.
+        """
+        for i in range(0, len(answer), Constants.SEMANTIC_CACHE_CHUNK_SIZE):
+            yield answer[i : i + Constants.SEMANTIC_CACHE_CHUNK_SIZE]
+
+    async def _delete_messages_and_update_chain(
         self,
         chat_session_id: str,
         user_id: str,
@@ -412,111 +786,158 @@ class ChatService(BaseService):
             Optional[APIError]: APIError object if any error
         """
         # Get the parent and child message ids of the current response message
-        parent_request_message_id = None
-        child_response_message_id = None
-
-        # Delete the current request message
-        if current_chat_request:
-            parent_request_message_id = current_chat_request.parent_message_id
-            err = self._chat_repository.delete_chat_message(
-                chat_message_id=current_chat_request.id,
-                chat_session_id=chat_session_id,
-                user_id=user_id,
-            )
-            if err:
-                return err
-
-        # Delete the current response message
-        if current_chat_response:
-            child_response_message_id = current_chat_response.child_message_id
-            err = self._chat_repository.delete_chat_message(
-                chat_message_id=current_chat_response.id,
-                chat_session_id=chat_session_id,
-                user_id=user_id,
-            )
-            if err:
-                return err
-
-        # Update the message chain
-        if parent_request_message_id and child_response_message_id:
-            logger.info(
-                "Updating the child_message_id of the parent of the request message, parent_message_id of the next child message"
-            )
-            # Update the child_message_id of the parent of the request message, parent_message_id of the next child message
-            err = self._update_message_chain(
-                chat_session_id=chat_session_id,
-                user_id=user_id,
-                parent_message_id=parent_request_message_id,
-                child_message_id=child_response_message_id,
-            )
-        elif parent_request_message_id:
-            logger.info("Updating the parent request message with the new child message id")
-            # Update the parent request message with the new child message id
-            err = self._update_message_chain(
-                chat_session_id=chat_session_id,
-                user_id=user_id,
-                parent_message_id=parent_request_message_id,
-            )
-        elif child_response_message_id:
-            logger.info("Updating the next child message with the new parent message id")
-            # Update the next child message with the new parent message id
-            err = self._update_message_chain(
-                chat_session_id=chat_session_id,
-                user_id=user_id,
-                child_message_id=child_response_message_id,
-            )
-        else:
-            err = None
+        parent_request_message_id = (
+            current_chat_request.parent_message_id if current_chat_request else None
+        )
+        child_response_message_id = (
+            current_chat_response.child_message_id if current_chat_response else None
+        )
 
+        # Delete the current request and response messages
+        message_object_names, err = await self._chat_repository.delete_chat_messages(
+            chat_message_ids=[
+                chat_message.id
+                for chat_message in (current_chat_request, current_chat_response)
+                if chat_message
+            ],
+            chat_session_id=chat_session_id,
+            user_id=user_id,
+        )
         if err:
             return err
 
-        return None
+        # The offloaded messages are deleted from the object storage once the transaction is committed
+        self._deleted_message_object_names.extend(filter(None, message_object_names))
 
-    async def _handle_naming_chat_session(
-        self,
-        chat_session_id: str,
-        user_id: str,
-        chat_request_message: str = "",
-        chat_response_message: str = "",
-    ) -> AsyncGenerator[str, None, None]:
+        # Update the child_message_id of the parent of the request message, parent_message_id of the next child message
+        logger.info("Updating the message chain around the deleted messages")
+        return await self._update_message_chain(
+            chat_session_id=chat_session_id,
+            user_id=user_id,
+            parent_message_id=parent_request_message_id,
+            child_message_id=child_response_message_id,
+        )
+
+    async def _name_chat_session(
+        self, chat_session_id: str, user_id: str, chat_request_message: str = ""
+    ) -> List[Dict[str, Any]]:
         """
-        Handle naming chat session.
+        Name the chat session from the first user message.
+        It runs concurrently with the generation of the response, and renames the chat session in its own
+        database session, so that the session of the chat stream is never held open waiting for it.
 
         Args:
             chat_session_id(str): Chat session id
             user_id(str): User id
             chat_request_message(str): Chat request message. Defaults to "".
-            chat_response_message(str): Chat response message. Defaults to "".
 
         Returns:
-            AsyncGenerator[str, None, None]: Async generator of chat session naming response.
+            List[Dict[str, Any]]: Stream events of the chat session naming.
         """
-        # Construct prompt
-        prompt = Constants.CHAT_SESSION_NAMING_PROMPT.format(
-            user_message=chat_request_message, agent_message=chat_response_message
+        try:
+            # Construct prompt
+            prompt = Constants.CHAT_SESSION_NAMING_PROMPT.format(user_message=chat_request_message)
+
+            # Generate a name for the chat session, on a cheaper model if configured
+            session_name_response = await RateLimitedLLM.from_llm(
+                get_chat_session_naming_llm()
+            ).acomplete(prompt=prompt)
+            session_name = session_name_response.text.strip() or "Untitled Chat"
+
+            # Rename the chat session with the generated name
+            updated_chat_session = ChatSessionRequest(description=session_name).model_dump(
+                exclude_unset=True
+            )
+            async with AsyncSessionLocal() as db_session:
+                chat_service = AsyncChatService(db_session=db_session)
+                async with chat_service._transaction():
+                    err = await chat_service._chat_repository.update_chat_session(
+                        chat_session_id=chat_session_id,
+                        chat_session=updated_chat_session,
+                        user_id=user_id,
+                    )
+        except Exception as e:
+            logger.error(f"Error naming the chat session: {e}")
+            err = e
+
+        if err:
+            return [
+                ChatStreamResponse(
+                    event=ChatMessageStreamEventType.ERROR,
+                    content=f"Error during chat session naming: {err}",
+                ).as_json()
+            ]
+
+        return [
+            ChatStreamResponse(
+                event=ChatMessageStreamEventType.TITLE_GENERATION, content=session_name
+            ).as_json()
+        ]
+
+    async def _summarize_chat_history(
+        self, chat_session: ChatSession, chat_history: List[ChatMessage], user_id: str
+    ) -> None:
+        """
+        Fold the messages older than the token-budgeted chat history, and not summarized yet, into the rolling summary
+        of the chat session. They are replaced by the summary in the chat history of the next requests.
+        The summary LLM call is only made once the messages left out add up to the minimum number of tokens,
+        so that it is not made after every response once the chat history overflows the budget.
+
+        Args:
+            chat_session (ChatSession): Chat session object.
+            chat_history (List[ChatMessage]): Token-budgeted chat history of the current request.
+            user_id (str): User ID.
+        """
+        # The chat history holds the whole chat session, nothing to summarize
+        if not chat_history or chat_history[0].parent_message_id is None:
+            return
+
+        # Get the messages dropped from the chat history since the last summary, walking up the chain
+        async with self._transaction():
+            chat_messages, err = await self._chat_repository.get_chat_message_ancestors(
+                chat_message_id=chat_history[0].parent_message_id,
+                chat_session_id=chat_session.id,
+                user_id=user_id,
+                stop_message_id=chat_session.summarized_until_message_id,
+            )
+        if err or not chat_messages:
+            return
+
+        overflow_tokens = sum(
+            chat_message.token_count or len(chat_message.message) // 4
+            for chat_message in chat_messages
         )
+        if overflow_tokens < Constants.CHAT_HISTORY_SUMMARY_MIN_TOKENS:
+            return
 
-        # Generate a name for the chat session
-        session_name_response = await Settings.llm.acomplete(prompt=prompt)
-        session_name = session_name_response.text.strip() or "Untitled Chat"
-        yield ChatStreamResponse(
-            event=ChatMessageStreamEventType.TITLE_GENERATION, content=session_name
-        ).as_json()
+        # Summarize the full message of the long chat messages, only their preview is stored inline
+        await asyncio.to_thread(hydrate_chat_messages, MinioConnector(), chat_messages)
 
-        # Rename the chat session with the generated name
-        updated_chat_session = ChatSessionRequest(description=session_name).model_dump(
-            exclude_unset=True
+        logger.info(
+            f"Summarizing {len(chat_messages)} older messages of chat session {chat_session.id}"
         )
-        if err := self._chat_repository.update_chat_session(
-            chat_session_id=chat_session_id, chat_session=updated_chat_session, user_id=user_id
-        ):
-            yield ChatStreamResponse(
-                event=ChatMessageStreamEventType.ERROR,
-                content=f"Error during chat session naming: {err}",
-            ).as_json()
+        prompt = Constants.CHAT_HISTORY_SUMMARY_PROMPT.format(
+            summary=chat_session.summary or "",
+            chat_history=messages_to_history_str(llamaify_messages(chat_messages=chat_messages)),
+        )
+        summary_response = await RateLimitedLLM.from_llm(Settings.llm).acomplete(prompt=prompt)
+        summary = summary_response.text.strip()
+        if not summary:
+            return
+
+        async with self._transaction():
+            err = await self._chat_repository.update_chat_session(
+                chat_session_id=chat_session.id,
+                chat_session={
+                    "summary": summary,
+                    "summarized_until_message_id": chat_messages[-1].id,
+                },
+                user_id=user_id,
+            )
+        if err:
+            logger.warning(f"Failed to update the summary of chat session {chat_session.id}: {err}")
 
-    def _handle_existing_chat_message(
+    async def _handle_existing_chat_message(
         self, chat_message_request: ChatMessageRequest, chat_session_id: str, user_id: str
     ) -> Tuple[Optional[ChatMessage], Optional[APIError]]:
         """
@@ -534,7 +955,7 @@ class ChatService(BaseService):
             Tuple[Optional[ChatMessage], Optional[APIError]]: New chat message object and APIError object if any error
         """
         # Get the current chat message and its parent / child message (based on the message message)
-        current_chat_message, err = self._chat_repository.get_chat_message(
+        current_chat_message, err = await self._chat_repository.get_chat_message(
             chat_message_id=chat_message_request.id,
             chat_session_id=chat_session_id,
             user_id=user_id,
@@ -550,7 +971,7 @@ class ChatService(BaseService):
             )
             # When the message is edited, the chat request is the current message
             current_chat_request = current_chat_message
-            current_chat_response, err = self._chat_repository.get_chat_message(
+            current_chat_response, err = await self._chat_repository.get_chat_message(
                 chat_message_id=current_chat_message.child_message_id,
                 chat_session_id=chat_session_id,
                 user_id=user_id,
@@ -563,7 +984,7 @@ class ChatService(BaseService):
             )
             # When the message is regenerated, the chat response is the current message
             current_chat_response = current_chat_message
-            current_chat_request, err = self._chat_repository.get_chat_message(
+            current_chat_request, err = await self._chat_repository.get_chat_message(
                 chat_message_id=current_chat_message.parent_message_id,
                 chat_session_id=chat_session_id,
                 user_id=user_id,
@@ -580,7 +1001,7 @@ class ChatService(BaseService):
 
         # As we are regenerating the response, we delete the current response message and its request message
         # Then, deleting the response and corresponding request message (update the child_message_id of the parent of the request message, parent_message_id of the next child message)
-        err = self._delete_messages_and_update_chain(
+        err = await self._delete_messages_and_update_chain(
             chat_session_id=chat_session_id,
             user_id=user_id,
             current_chat_request=current_chat_request,
@@ -590,78 +1011,118 @@ class ChatService(BaseService):
             return None, err
 
         # Flush the session to send the data to the database (but do not commit yet)
-        self._db_session.flush()
+        await self._db_session.flush()
 
         return current_chat_request, None
 
-    async def _handle_new_chat_message(
+    async def _register_chat_messages(
         self,
         chat_message_request: ChatMessageRequest,
-        chat_session: ChatSession,
         chat_session_id: str,
         user_id: str,
-    ) -> AsyncGenerator[str, None, None]:
+    ) -> Tuple[Optional[ChatMessage], Optional[ChatMessage], List[ChatMessage], Optional[APIError]]:
         """
-        Handle a new chat message in the chat session with streaming support.
+        Create the chat request message and pre-register the chat response message, linked to each other.
 
         Args:
             chat_message_request (ChatMessageRequest): Chat message request object.
-            chat_session (ChatSession): Chat session object.
             chat_session_id (str): Chat session ID.
             user_id (str): User ID.
 
-        Yields:
-            str: A chunk of the response message generated by the LLM model.
+        Returns:
+            Tuple[Optional[ChatMessage], Optional[ChatMessage], List[ChatMessage], Optional[APIError]]: Chat request message,
+            pre-registered chat response message, token-budgeted chat history before the request and APIError object if any error.
         """
-        try:
-            # Get the current chat messages in the chat session
-            chat_history = chat_session.chat_messages
+        # Get the newest chat messages in the chat session that fit the token budget
+        chat_history, err = await self._chat_repository.get_chat_history_within_budget(
+            chat_session_id=chat_session_id,
+            user_id=user_id,
+            token_budget=Constants.CHAT_HISTORY_TOKEN_BUDGET,
+        )
+        if err:
+            return None, None, [], err
 
-            # If there are no chat messages, the request message is the first message in the chat session
-            latest_chat_response = chat_history[-1] if chat_history else None
+        # If there are no chat messages, the request message is the first message in the chat session
+        latest_chat_response = chat_history[-1] if chat_history else None
 
-            # Create chat request message. The request message is the user message
-            chat_request, err = self._make_chat_request(
-                user_id=user_id,
-                chat_session_id=chat_session_id,
-                message=chat_message_request.message,
-                message_type=ChatMessageType.USER,
-                latest_chat_response=latest_chat_response,
-            )
-            if err:
-                yield ChatStreamResponse(
-                    event=ChatMessageStreamEventType.ERROR,
-                    content=f"Error during request creation: {err}",
-                ).as_json()
+        # Create chat request message. The request message is the user message,
+        # already linked to the response message pre-registered below
+        chat_response_id = uuid4()
+        chat_request, err = await self._make_chat_request(
+            user_id=user_id,
+            chat_session_id=chat_session_id,
+            message=chat_message_request.message,
+            message_type=ChatMessageType.USER,
+            latest_chat_response=latest_chat_response,
+            child_message_id=chat_response_id,
+        )
+        if err:
+            return None, None, [], err
 
-            # Pre-register and create a new chat response message
-            chat_response = ChatMessage(
-                chat_session_id=chat_session_id,
-                message="",
-                message_type=ChatMessageType.ASSISTANT,
-            )
-            if err := self._chat_repository.create_chat_message(chat_message=chat_response):
-                yield ChatStreamResponse(
-                    event=ChatMessageStreamEventType.ERROR,
-                    content=f"Error during response creation: {err}",
-                ).as_json()
+        # Pre-register and create a new chat response message
+        chat_response = ChatMessage(
+            id=chat_response_id,
+            chat_session_id=chat_session_id,
+            parent_message_id=chat_request.id,
+            message="",
+            message_type=ChatMessageType.ASSISTANT,
+        )
+        if err := await self._chat_repository.create_chat_message(chat_message=chat_response):
+            return None, None, [], err
 
-            # Flush the session to send the data to the database (but do not commit yet)
-            self._db_session.flush()
+        # Flush the session to insert both linked messages at once (but do not commit yet)
+        await self._db_session.flush()
 
-            # Update child_message_id of the request message and parent_message_id of the response message
-            chat_request.child_message_id = chat_response.id
-            chat_response.parent_message_id = chat_request.id
+        return chat_request, chat_response, chat_history, None
 
-            # Flush the session to send the data to the database (but do not commit yet)
-            self._db_session.flush()
+    async def _handle_new_chat_message(
+        self,
+        chat_message_request: ChatMessageRequest,
+        chat_request: ChatMessage,
+        chat_response: ChatMessage,
+        chat_history: List[ChatMessage],
+        chat_session: ChatSession,
+        user_id: str,
+    ) -> AsyncGenerator[str, None, None]:
+        """
+        Handle a new chat message in the chat session with streaming support.
+        The request and the pre-registered response messages are already committed, so the response is streamed
+        without any database connection checked out, then finalized in a second short transaction.
 
+        Args:
+            chat_message_request (ChatMessageRequest): Chat message request object.
+            chat_request (ChatMessage): Committed chat request message.
+            chat_response (ChatMessage): Committed pre-registered chat response message.
+            chat_history (List[ChatMessage]): Token-budgeted chat history before the request message.
+            chat_session (ChatSession): Chat session object.
+            user_id (str): User ID.
+
+        Yields:
+            str: A chunk of the response message generated by the LLM model.
+        """
+        chat_session_id = chat_session.id
+        naming_task: Optional[asyncio.Task] = None
+        try:
             # Stream the chat request message object
             yield ChatStreamResponse(
                 event=ChatMessageStreamEventType.METADATA,
                 content=ChatMessageResponse.model_validate(chat_request).model_dump(mode="json"),
             ).as_json()
 
+            # Name chat session if it is newly created, concurrently with the response generation
+            if (
+                chat_request.parent_message_id is None
+                and chat_message_request.request_type == ChatMessageRequestType.NEW
+            ):
+                logger.info("Chat session is newly created. Naming the chat session...")
+                naming_task = asyncio.create_task(
+                    self._name_chat_session(
+                        chat_session_id=chat_session_id,
+                        user_id=user_id,
+                        chat_request_message=chat_request.message,
+                    )
+                )
+
             # Generate and stream chat response message in chunks
             async for chunk in self._generate_chat_response(
                 chat_message_request=chat_message_request,
@@ -669,22 +1130,55 @@ class ChatService(BaseService):
                 current_request_id=chat_request.id,
                 pre_register_chat_response=chat_response,
                 chat_history=chat_history,
+                agent=chat_session.agent,
+                summary=chat_session.summary,
             ):
                 yield chunk
 
-            # Name chat session if it is newly created
-            if (
-                chat_request.parent_message_id is None
-                and chat_message_request.request_type == ChatMessageRequestType.NEW
-            ):
-                logger.info("Chat session is newly created. Naming the chat session...")
-                async for chunk in self._handle_naming_chat_session(
+                # Interleave the chat session name as soon as it is ready
+                if naming_task is not None and naming_task.done():
+                    for event in naming_task.result():
+                        yield event
+                    naming_task = None
+
+            # Finalize the response message in a second short transaction.
+            # It was only updated in memory while streaming, and it may belong to the session of the request
+            # that started the generation, so its generated columns are written with an explicit UPDATE.
+            logger.info("Finalizing the chat response message")
+            message, message_object_name = await asyncio.to_thread(
+                offload_chat_message,
+                minio_connector=MinioConnector(),
+                chat_session_id=str(chat_session_id),
+                chat_message_id=str(chat_response.id),
+                message=chat_response.message,
+            )
+            async with self._transaction():
+                err = await self._chat_repository.update_chat_message(
                     chat_session_id=chat_session_id,
+                    chat_message_id=chat_response.id,
+                    chat_message={
+                        "message": message,
+                        "message_object_name": message_object_name,
+                        # The full message is searchable even if only its preview is inline
+                        "search_text": normalize_search_text(input_str=chat_response.message),
+                        "token_count": chat_response.token_count,
+                        "error_type": chat_response.error_type,
+                        "error": chat_response.error,
+                    },
                     user_id=user_id,
-                    chat_request_message=chat_request.message,
-                    chat_response_message=chat_response.message,
-                ):
-                    yield chunk
+                )
+            if err:
+                yield ChatStreamResponse(
+                    event=ChatMessageStreamEventType.ERROR,
+                    content=f"Error finalizing the chat response message: {err}",
+                ).as_json()
+                return
+
+            # The chat session name has not been ready while streaming, it is sent before the completion
+            if naming_task is not None:
+                for event in await naming_task:
+                    yield event
+                naming_task = None
 
             # Stream the chat response message object. We don't include the message content in the response.
             yield ChatStreamResponse(
@@ -694,14 +1188,22 @@ class ChatService(BaseService):
                 ),
             ).as_json()
 
+            # Fold the messages that no longer fit the token budget into the rolling summary
+            await self._summarize_chat_history(
+                chat_session=chat_session, chat_history=chat_history, user_id=user_id
+            )
+
         except Exception as e:
             logger.error(f"Error handling new chat message: {e}")
             yield ChatStreamResponse(
                 event=ChatMessageStreamEventType.ERROR,
                 content=f"Error handling new chat message: {e}",
             ).as_json()
+        finally:
+            if naming_task is not None:
+                naming_task.cancel()
 
-    def _handle_regenerate_or_edit_chat_message(
+    async def _handle_regenerate_or_edit_chat_message(
         self, chat_message_request: ChatMessageRequest, chat_session_id: str, user_id: str
     ) -> Optional[APIError]:
         """
@@ -728,7 +1230,7 @@ class ChatService(BaseService):
         )
         logger.info(f"{action} the existing chat message")
 
-        existing_chat_request, err = self._handle_existing_chat_message(
+        existing_chat_request, err = await self._handle_existing_chat_message(
             chat_message_request=chat_message_request,
             chat_session_id=chat_session_id,
             user_id=user_id,
@@ -749,6 +1251,9 @@ class ChatService(BaseService):
     ) -> AsyncGenerator[str, None, None]:
         """
         Generate a streaming chat message for the new message request.
+        The messages are registered in a short transaction, which is committed before the LLM starts streaming.
+        The response is generated detached from the request and streamed through a Redis Stream
+        keyed by the response message id, which `resume_stream_chat_message` can tail again.
 
         Args:
             chat_message_request (ChatMessageRequest): Chat message request object.
@@ -758,62 +1263,147 @@ class ChatService(BaseService):
         Yields:
             str: A chunk of the response message generated by the LLM model.
         """
-        with self._transaction():
-            chat_session, err = self._chat_repository.get_chat_session(
+        chat_request, chat_response, chat_history = None, None, []
+        async with self._transaction():
+            chat_session, err = await self._chat_repository.get_chat_session(
                 chat_session_id=chat_session_id, user_id=user_id
             )
-            if err or not chat_session:
-                yield ChatStreamResponse(
-                    event=ChatMessageStreamEventType.ERROR,
-                    content=f"Chat session not found: {err}",
-                ).as_json()
-                return
 
             # Handle regenerated or edited chat message
-            err = self._handle_regenerate_or_edit_chat_message(
-                chat_message_request=chat_message_request,
-                chat_session_id=chat_session_id,
-                user_id=user_id,
-            )
+            if not err:
+                err = await self._handle_regenerate_or_edit_chat_message(
+                    chat_message_request=chat_message_request,
+                    chat_session_id=chat_session_id,
+                    user_id=user_id,
+                )
+
+            # Create the request message and pre-register the response message
+            if not err:
+                logger.info("Handling new chat message")
+                chat_request, chat_response, chat_history, err = await self._register_chat_messages(
+                    chat_message_request=chat_message_request,
+                    chat_session_id=chat_session_id,
+                    user_id=user_id,
+                )
+
+            # Discard the partial changes (e.g. deleted messages of a regenerated message)
             if err:
-                yield ChatStreamResponse(
-                    event=ChatMessageStreamEventType.ERROR,
-                    content=f"Error during request handling: {err}",
-                ).as_json()
-                return
+                await self._db_session.rollback()
 
-            logger.info("Handling new chat message")
+        # Delete the offloaded messages of the deleted messages, only once their deletion is committed
+        message_object_names, self._deleted_message_object_names = (
+            self._deleted_message_object_names,
+            [],
+        )
+        if not err and message_object_names:
+            await asyncio.to_thread(
+                delete_offloaded_chat_messages, MinioConnector(), message_object_names
+            )
 
-            # Handle new streaming response message
-            async for chunk in self._handle_new_chat_message(
-                chat_message_request=chat_message_request,
-                chat_session=chat_session,
-                chat_session_id=chat_session_id,
-                user_id=user_id,
-            ):
-                yield chunk
+        if err:
+            yield ChatStreamResponse(
+                event=ChatMessageStreamEventType.ERROR,
+                content=f"Error during request handling: {err}",
+            ).as_json()
+            return
+
+        # Generate the response in a detached task, so that a client disconnect neither cancels nor loses it.
+        # The connection is back to the pool at this point, and the client tails the generated frames.
+        redis_connector = self._get_redis_connector()
+        chat_stream = RedisChatStream(
+            redis_client=redis_connector.get_aclient(),
+            stream_id=str(chat_response.id),
+            tail_client=redis_connector.get_stream_aclient(),
+        )
+        await chat_stream.aopen()
+        self._start_detached_generation(
+            chat_stream=chat_stream,
+            chat_message_request=chat_message_request,
+            chat_request=chat_request,
+            chat_response=chat_response,
+            chat_history=chat_history,
+            chat_session=chat_session,
+            user_id=user_id,
+        )
 
-    def create_chat_feedback(
-        self, chat_feedback_request: ChatFeedbackRequest
-    ) -> Optional[APIError]:
+        async for frame in chat_stream.atail():
+            yield frame
+
+    async def resume_stream_chat_message(
+        self,
+        chat_session_id: str,
+        chat_message_id: str,
+        user_id: str,
+        last_event_id: Optional[str] = None,
+    ) -> AsyncGenerator[bytes, None]:
         """
-        Create chat feedback.
+        Resume the stream of a chat response message, e.g. after a reconnect or a page refresh.
+        The frames already received by the client are skipped, and nothing is generated again.
 
         Args:
-            chat_feedback_request: ChatFeedbackRequest
+            chat_session_id (str): Chat session ID.
+            chat_message_id (str): Chat response message ID.
+            user_id (str): User ID.
+            last_event_id (Optional[str]): Id of the last frame received by the client. Defaults to None.
 
-        Returns:
-            Optional[APIError]: APIError object if any error
+        Yields:
+            bytes: An SSE frame of the chat response message.
         """
-        with self._transaction():
-            # Define chat feedback
-            chat_feedback = ChatFeedback(
-                chat_message_id=chat_feedback_request.chat_message_id,
-                is_positive=chat_feedback_request.is_positive,
-                feedback_text=chat_feedback_request.feedback_text,
+        async with self._transaction():
+            _, err = await self._chat_repository.get_chat_message(
+                chat_message_id=chat_message_id, chat_session_id=chat_session_id, user_id=user_id
             )
+        if err:
+            yield ChatStreamResponse.encode(
+                event=ChatMessageStreamEventType.ERROR,
+                content=f"Error during request handling: {err}",
+            )
+            return
 
-            # Create chat feedback
-            err = self._chat_feedback_repository.create_chat_feedback(chat_feedback=chat_feedback)
+        redis_connector = self._get_redis_connector()
+        chat_stream = RedisChatStream(
+            redis_client=redis_connector.get_aclient(),
+            stream_id=chat_message_id,
+            tail_client=redis_connector.get_stream_aclient(),
+        )
+        async for frame in chat_stream.atail(last_event_id=last_event_id):
+            yield frame
 
-        return err if err else None
+    def _get_redis_connector(self) -> RedisConnector:
+        """
+        Get the Redis connector of the service, defaulting to the singleton connector.
+
+        Returns:
+            RedisConnector: Redis connector.
+        """
+        if self._redis_connector is None:
+            self._redis_connector = RedisConnector()
+
+        return self._redis_connector
+
+    def _start_detached_generation(self, chat_stream: RedisChatStream, **kwargs) -> None:
+        """
+        Start the generation of the chat response in a task detached from the request.
+        The task owns its database session, so the response is always persisted once generated.
+
+        Args:
+            chat_stream (RedisChatStream): Stream the frames of the chat response are published to.
+            **kwargs: Keyword arguments of `_handle_new_chat_message`.
+        """
+
+        async def generate() -> None:
+            async with AsyncSessionLocal() as db_session:
+                chat_service = AsyncChatService(
+                    db_session=db_session,
+                    qdrant_connector=self._qdrant_connector,
+                    redis_connector=self._redis_connector,
+                )
+                try:
+                    await chat_stream.apublish(chat_service._handle_new_chat_message(**kwargs))
+                except Exception as e:
+                    logger.error(f"Error in the detached chat generation: {e}", exc_info=True)
+
+        # Keep a reference to the task, otherwise it may be garbage collected before it is done
+        task = asyncio.create_task(generate())
+        _detached_generations.add(task)
+        task.add_done_callback(_detached_generations.discard)
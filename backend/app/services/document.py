@@ -1,9 +1,12 @@
 import contextlib
 import os
 from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
 from typing import List
 from typing import Optional
 from typing import Tuple
+from uuid import uuid4
 
 from fastapi import File
 from fastapi import UploadFile
@@ -12,12 +15,15 @@ from sqlalchemy.orm import Session
 from app.background.tasks.indexing import run_indexing
 from app.databases.minio import MinioConnector
 from app.models import Document
+from app.models.document import IndexStatus
 from app.repositories.document import DocumentRepository
 from app.services.base import BaseService
 from app.settings import Constants
 from app.utils.api.api_response import APIError
+from app.utils.api.error_handler import DatabaseTransactionError
 from app.utils.api.error_handler import ErrorCodesMappingNumber
 from app.utils.api.helpers import get_logger
+from app.utils.file import compute_file_hash
 from app.utils.file import construct_file_path
 
 logger = get_logger(__name__)
@@ -59,19 +65,77 @@ class DocumentService(BaseService):
                 return APIError(kind=ErrorCodesMappingNumber.INVALID_DOCUMENT.value)
         return None
 
+    @staticmethod
+    def _get_indexing_stale_before() -> datetime:
+        """
+        Get the time before which a pending or running indexing that has not reported is considered stale,
+        e.g. its worker died.
+
+        Returns:
+            datetime: Stale time limit.
+        """
+        return datetime.now(timezone.utc) - timedelta(
+            seconds=Constants.DOCUMENT_INDEXING_STALE_TIMEOUT
+        )
+
+    def _get_replaced_document(
+        self, document_id: str
+    ) -> Tuple[Optional[Document], Optional[APIError]]:
+        """
+        Get the previous version of an uploaded document.
+        A document being indexed cannot be replaced, as both indexings would write the same chunks.
+
+        Args:
+            document_id: Id of the previous version.
+
+        Returns:
+            Tuple[Optional[Document], Optional[APIError]]: Previous version of the document, and error if any.
+        """
+        document, err = self._document_repo.get_document(document_id=document_id)
+        if err:
+            return None, err
+
+        is_indexing = document.index_status in (IndexStatus.NOT_STARTED, IndexStatus.IN_PROGRESS)
+        if is_indexing and document.updated_at >= self._get_indexing_stale_before():
+            return None, APIError(kind=ErrorCodesMappingNumber.DOCUMENT_INDEXING_IN_PROGRESS.value)
+
+        return document, None
+
     def _store_document(
-        self, uploaded_document: UploadFile, issue_date: datetime = datetime.now()
-    ) -> Tuple[str, str, Optional[APIError]]:
+        self,
+        uploaded_document: UploadFile,
+        issue_date: datetime = datetime.now(),
+        replaced_document: Optional[Document] = None,
+    ) -> Tuple[Optional[Document], Optional[str], Optional[APIError]]:
         """
         Store a single document in storage and databases.
+        A document whose content has already been uploaded is not stored again, and is indexed again only if its
+        previous indexing failed or is stale.
+        The content is hashed before the upload, so that a duplicate is never uploaded to the object storage.
+
+        A new version of a document takes over the indexed chunks of the previous version, which is retired:
+        only its changed chunks are embedded, and the chunks that are not in the new version anymore are deleted.
 
         Args:
             uploaded_document: File to be stored.
             issue_date: Issue date of the document.
+            replaced_document: Previous version of the document. Defaults to None.
 
         Returns:
-            Tuple[str, str, Optional[APIError]]: Document URL, indexing background task ID, and error if any.
+            Tuple[Optional[Document], Optional[str], Optional[APIError]]: Stored document, indexing background task
+            ID (None if the document is a duplicate of an indexed one), and error if any.
         """
+        # Identical content short-circuits to the existing document, once it is indexed
+        content_hash = compute_file_hash(data=uploaded_document.file)
+        document, err = self._document_repo.get_document_by_content_hash(content_hash=content_hash)
+        if err:
+            return None, None, err
+        if document:
+            logger.info(
+                f"Document {uploaded_document.filename} is a duplicate of {document.document_url}"
+            )
+            return self._reuse_document(document=document, issue_date=issue_date)
+
         object_name, file_extension = os.path.splitext(uploaded_document.filename)
         logger.info(object_name)
         file_path = construct_file_path(
@@ -81,42 +145,130 @@ class DocumentService(BaseService):
         )
         logger.info(f"Uploading document: {uploaded_document.filename}")
 
-        with self._transaction():
-            document = Document(
-                name=uploaded_document.filename,
-                document_url=file_path,
-            )
-            if err := self._document_repo.create_document(document=document):
-                return None, err
-
+        # Upload the file before registering the document, so that a registered content always has its file
         if not self._minio_connector.upload_file(
             object_name=file_path,
             data=uploaded_document.file,
             bucket_name=Constants.MINIO_DOCUMENT_BUCKET,
         ):
-            return None, APIError(kind=ErrorCodesMappingNumber.UNABLE_TO_UPLOAD_FILE_TO_MINIO.value)
+            return (
+                None,
+                None,
+                APIError(kind=ErrorCodesMappingNumber.UNABLE_TO_UPLOAD_FILE_TO_MINIO.value),
+            )
+
+        # The indexing task id is known before the document is registered, only this task reports its index status
+        task_id = str(uuid4())
+        document_id = uuid4()
+        # A new version is indexed under the key of the previous one, to diff its chunks against them
+        index_key = replaced_document.index_key if replaced_document else str(document_id)
+        try:
+            with self._transaction():
+                document = Document(
+                    id=document_id,
+                    name=uploaded_document.filename,
+                    document_url=file_path,
+                    content_hash=content_hash,
+                    index_status=IndexStatus.NOT_STARTED,
+                    index_task_id=task_id,
+                    index_key=index_key,
+                )
+                if err := self._document_repo.create_document(document=document):
+                    return None, None, err
+                if replaced_document and (
+                    err := self._document_repo.retire_document(document=replaced_document)
+                ):
+                    return None, None, err
+        except DatabaseTransactionError as e:
+            # The same content may have been uploaded concurrently, then the unique content hash is violated
+            self._minio_connector.delete_file(
+                object_name=file_path, bucket_name=Constants.MINIO_DOCUMENT_BUCKET
+            )
+            document, err = self._document_repo.get_document_by_content_hash(
+                content_hash=content_hash
+            )
+            if err or document is None:
+                logger.error(f"Error registering document {uploaded_document.filename}: {e}")
+                return (
+                    None,
+                    None,
+                    err or APIError(kind=ErrorCodesMappingNumber.INTERNAL_SERVER_ERROR.value),
+                )
+            # The concurrent upload that registered the document also indexes it
+            return document, None, None
 
         logger.info(f"Document uploaded: {uploaded_document.filename}")
 
-        # Index the document into the vector database
+        self._index_document(document=document, issue_date=issue_date, task_id=task_id)
+        return document, task_id, None
+
+    def _reuse_document(
+        self, document: Document, issue_date: datetime
+    ) -> Tuple[Optional[Document], Optional[str], Optional[APIError]]:
+        """
+        Reuse the existing document with the same content as an uploaded one.
+        A document whose indexing failed, or whose indexing task has not reported for too long, is indexed again.
+        The incremental indexing only embeds what is missing. A pending or running indexing is left to its task.
+
+        Args:
+            document: Existing document.
+            issue_date: Issue date of the uploaded document.
+
+        Returns:
+            Tuple[Optional[Document], Optional[str], Optional[APIError]]: Existing document, indexing background task
+            ID (None if the document is already indexed or being indexed), and error if any.
+        """
+        if document.index_status == IndexStatus.SUCCESS:
+            return document, None, None
+
+        task_id = str(uuid4())
+        with self._transaction():
+            is_claimed, err = self._document_repo.claim_document_indexing(
+                document_id=str(document.id),
+                task_id=task_id,
+                stale_before=self._get_indexing_stale_before(),
+            )
+            if err:
+                return None, None, err
+        if not is_claimed:
+            logger.info(f"Document {document.document_url} is being indexed by another task")
+            return document, None, None
+
+        logger.info(f"Document {document.document_url} is not indexed yet, indexing it again")
+        self._index_document(document=document, issue_date=issue_date, task_id=task_id)
+        return document, task_id, None
+
+    def _index_document(self, document: Document, issue_date: datetime, task_id: str) -> None:
+        """
+        Enqueue the indexing of a stored document into the vector database.
+
+        Args:
+            document: Stored document.
+            issue_date: Issue date of the document.
+            task_id: Indexing background task ID, recorded on the document beforehand.
+        """
         metadata = {
             "issue_date": issue_date.strftime(Constants.DATETIME_FORMAT),
             "is_outdated": False,
         }
 
-        # Run indexing task
-        task_result = run_indexing.delay(
-            file_path=file_path,
-            metadata=metadata,
+        # Run indexing task, which updates the index status of the document as it runs
+        run_indexing.apply_async(
+            kwargs={
+                "file_path": document.document_url,
+                "metadata": metadata,
+                "document_id": str(document.id),
+                "document_key": document.index_key,
+            },
+            task_id=task_id,
         )
 
-        return file_path, task_result.id, None
-
     def upload_documents(
         self,
         issue_date: datetime = datetime.now(),
         uploaded_documents: List[UploadFile] = File(...),
-    ) -> Tuple[List[Tuple[str, str]], Optional[APIError]]:
+        replaces_document_id: Optional[str] = None,
+    ) -> Tuple[List[Tuple[Document, Optional[str]]], Optional[APIError]]:
         """
         Upload documents to object storage. Then, trigger the indexing pipeline into the vector database.
 
@@ -124,28 +276,41 @@ class DocumentService(BaseService):
             issue_date (datetime): Issue date of the document.
             is_outdated (bool): Flag to indicate if the document is outdated. Defaults to True.
             uploaded_documents (List[UploadFile]): List of files to be uploaded.
+            replaces_document_id (Optional[str]): Id of the previous version of the uploaded document,
+                a single document is uploaded then. Defaults to None.
 
         Returns:
-            Tuple[List[Tuple[str, str]], Optional[APIError]]: List of document URLs and indexing background task IDs, and error if any.
+            Tuple[List[Tuple[Document, Optional[str]]], Optional[APIError]]: List of documents and indexing background task IDs
+            (None for the duplicate documents), and error if any.
         """
         # Check if files are valid. There are cases where the uploaded file is crashed or empty.
         if err := self._validate_documents(documents=uploaded_documents):
             return [], err
 
+        replaced_document = None
+        if replaces_document_id:
+            if len(uploaded_documents) != 1:
+                return [], APIError(kind=ErrorCodesMappingNumber.INVALID_REQUEST.value)
+
+            replaced_document, err = self._get_replaced_document(document_id=replaces_document_id)
+            if err:
+                return [], err
+
         uploaded_document_results = []
         try:
             # Upload files to Minio
             for uploaded_document in uploaded_documents:
                 # Auto close file after reading
                 with contextlib.closing(uploaded_document.file):
-                    document_url, task_id, err = self._store_document(
+                    document, task_id, err = self._store_document(
                         uploaded_document=uploaded_document,
                         issue_date=issue_date,
+                        replaced_document=replaced_document,
                     )
                     if err:
                         return [], err
 
-                    uploaded_document_results.append((document_url, task_id))
+                    uploaded_document_results.append((document, task_id))
 
             return uploaded_document_results, None
         except Exception as e:
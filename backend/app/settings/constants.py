@@ -1,3 +1,4 @@
+import json
 import logging
 import os
 from enum import auto
@@ -20,6 +21,7 @@ class Constants:
     MSSQL_POOL_RECYCLE = 3600
     MSSQL_DRIVER = "ODBC+Driver+17+for+SQL+Server"
     MSSQL_CONNECTOR_URI = "mssql+pyodbc://{user}:{password}@{host}:{port}/{db_name}?driver={driver}&TrustServerCertificate=yes"
+    MSSQL_READ_CONNECTOR_URI = MSSQL_CONNECTOR_URI + "&ApplicationIntent=ReadOnly"
     MSSQL_ASYNC_CONNECTOR_URI = "mssql+aioodbc://{user}:{password}@{host}:{port}/{db_name}?driver={driver}&TrustServerCertificate=yes"
 
     # Error Handler
@@ -47,11 +49,18 @@ class Constants:
     # Minio Configuration
     MINIO_DOCUMENT_BUCKET = os.getenv("MINIO_DOCUMENT_BUCKET", "documents")
     MINIO_IMAGE_BUCKET = os.getenv("MINIO_IMAGE_BUCKET", "images")
+    MINIO_CHAT_MESSAGE_BUCKET = os.getenv("MINIO_CHAT_MESSAGE_BUCKET", "chat-messages")
+    MINIO_DOWNLOAD_CHUNK_SIZE = 1024 * 1024
 
     # Redis Configuration
     REDIS_SCHEME = "redis"
     REDIS_DB_NUM = 0
-    REDIS_MAX_CONNECTIONS = 10
+    REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", 50))
+    # Seconds a command waits for a free connection once the pool is exhausted
+    REDIS_POOL_TIMEOUT = int(os.getenv("REDIS_POOL_TIMEOUT", 5))
+    # Every client tailing a chat stream holds a connection in a blocking read,
+    # so the pool is sized for the concurrent chat streams of a process
+    REDIS_STREAM_MAX_CONNECTIONS = int(os.getenv("REDIS_STREAM_MAX_CONNECTIONS", 200))
     REDIS_DB_NUMBER_CELERY = int(os.environ.get("REDIS_DB_NUMBER_CELERY", 15))
     REDIS_DB_NUMBER_CELERY_RESULT_BACKEND = int(
         os.environ.get("REDIS_DB_NUMBER_CELERY_RESULT_BACKEND", 14)
@@ -65,7 +74,28 @@ class Constants:
     LLM_REDIS_CACHE_COLLECTION = "ezhr_chatbot_cache"
     LLM_MODEL = os.getenv("LLM_MODEL", "gpt-4o-mini")
     EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
+    CHAT_SESSION_NAMING_LLM_MODEL = os.getenv("CHAT_SESSION_NAMING_LLM_MODEL")
+    CHAT_SESSION_NAMING_MAX_TOKENS = 32
+    LLM_RATE_LIMIT_ENABLED = os.getenv("LLM_RATE_LIMIT_ENABLED", "true").lower() == "true"
+    LLM_RATE_LIMIT_PREFIX = f"{PROJECT_NAME}:llm_rate_limit"
+    LLM_RATE_LIMIT_REQUESTS_PER_MINUTE = int(os.getenv("LLM_RATE_LIMIT_REQUESTS_PER_MINUTE", 500))
+    LLM_RATE_LIMIT_BURST = int(os.getenv("LLM_RATE_LIMIT_BURST", 20))
+    LLM_RATE_LIMIT_MAX_IN_FLIGHT = int(os.getenv("LLM_RATE_LIMIT_MAX_IN_FLIGHT", 64))
+    # Overrides per "<provider>:<model>", e.g. {"openai:gpt-4o-mini": {"requests_per_minute": 5000}}
+    LLM_RATE_LIMITS = json.loads(os.getenv("LLM_RATE_LIMITS", "{}"))
+    LLM_RATE_LIMIT_LEASE_TTL = 300
+    LLM_RATE_LIMIT_RETRY_INTERVAL = 0.05
+    LLM_RATE_LIMIT_WAITER_TTL = 5
+    LLM_RATE_LIMIT_TIMEOUT = int(os.getenv("LLM_RATE_LIMIT_TIMEOUT", 60))
     INGESTION_BATCH_SIZE = 32
+    # Number of pages that flow through the ingestion pipeline at once when a document is streamed
+    INGESTION_STREAMING_BATCH_PAGES = 8
+    # Page and node hashes of the indexed documents, for the incremental re-indexing
+    INGESTION_DOCSTORE_TABLE_NAME = "docstore"
+    INGESTION_DOCSTORE_BATCH_SIZE = 100
+    # Bump the version when a change of the ingestion is not reflected by the transformation configurations
+    INGESTION_CACHE_VERSION = 1
+    INGESTION_CACHE_TTL = int(os.getenv("INGESTION_CACHE_TTL", 30 * 24 * 60 * 60))
     EMBEDDING_BATCH_SIZE = 50
     DIMENSIONS = 1536
     DISTANCE_METRIC_TYPE = "Cosine"
@@ -73,6 +103,31 @@ class Constants:
     LLM_MAX_CONTEXT_WINDOW = 128_000  # max context window of gpt-4o-mini
     QDRANT_COLLECTION = "ezhr_chatbot"
     SIMILARITY_TOP_K = 5
+    CHAT_ENGINE_CACHE_SIZE = int(os.getenv("CHAT_ENGINE_CACHE_SIZE", 64))
+    CHAT_ENGINE_CONDENSE_HISTORY_TAIL = 6
+    CHAT_ENGINE_CONDENSE_CACHE_TTL = int(os.getenv("CHAT_ENGINE_CONDENSE_CACHE_TTL", 86400))
+    CHAT_ENGINE_CONDENSE_CACHE_PREFIX = f"{PROJECT_NAME}:condense"
+    CHAT_ENGINE_CONDENSE_STATS_KEY = f"{PROJECT_NAME}:condense:stats"
+    SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "true").lower() == "true"
+    SEMANTIC_CACHE_SIMILARITY_THRESHOLD = float(
+        os.getenv("SEMANTIC_CACHE_SIMILARITY_THRESHOLD", 0.95)
+    )
+    SEMANTIC_CACHE_TTL = int(os.getenv("SEMANTIC_CACHE_TTL", 86400))
+    SEMANTIC_CACHE_MAX_ENTRIES = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", 500))
+    SEMANTIC_CACHE_CHUNK_SIZE = 64
+    SEMANTIC_CACHE_PREFIX = f"{PROJECT_NAME}:semantic_cache"
+    SEMANTIC_CACHE_COLLECTION = "ezhr_chatbot_semantic_cache"
+    SEMANTIC_CACHE_GENERATION_KEY = f"{PROJECT_NAME}:semantic_cache:generation"
+    CHAT_HISTORY_TOKEN_BUDGET = int(os.getenv("CHAT_HISTORY_TOKEN_BUDGET", 3000))
+    # The older messages are folded into the summary once they add up to this number of tokens
+    CHAT_HISTORY_SUMMARY_MIN_TOKENS = int(os.getenv("CHAT_HISTORY_SUMMARY_MIN_TOKENS", 1000))
+    CHAT_STREAM_COALESCE_INTERVAL = float(os.getenv("CHAT_STREAM_COALESCE_INTERVAL", 0.03))
+    CHAT_STREAM_COALESCE_MAX_SIZE = int(os.getenv("CHAT_STREAM_COALESCE_MAX_SIZE", 512))
+    CHAT_STREAM_PREFIX = f"{PROJECT_NAME}:chat_stream"
+    CHAT_STREAM_TTL = int(os.getenv("CHAT_STREAM_TTL", 3600))
+    CHAT_STREAM_MAX_LENGTH = int(os.getenv("CHAT_STREAM_MAX_LENGTH", 10000))
+    CHAT_STREAM_BLOCK_MS = 5000
+    CHAT_STREAM_IDLE_TIMEOUT = int(os.getenv("CHAT_STREAM_IDLE_TIMEOUT", 120))
 
     # Unit Test
     MINIO_TEST_BUCKET = "test-bucket"
@@ -90,6 +145,17 @@ class Constants:
 
     # Chat Message
     MAX_USER_MESSAGE_LENGTH = 2000
+    CHAT_MESSAGE_OFFLOAD_THRESHOLD = int(os.getenv("CHAT_MESSAGE_OFFLOAD_THRESHOLD", 4000))
+    CHAT_MESSAGE_PREVIEW_LENGTH = 500
+    CHAT_EXPORT_BATCH_SIZE = 1000
+
+    # Pagination
+    CHAT_SESSION_PAGE_SIZE = 50
+    CHAT_MESSAGE_PAGE_SIZE = 50
+    MAX_PAGE_SIZE = 200
+
+    # Chat Search
+    MAX_SEARCH_QUERY_LENGTH = 255
 
     # Identicon Configuration
     AGENT_AVATAR_IDENTICON_FOREGROUND_COLOR = ["#d73027", "#f46d43", "#fdae61", "#fee08b"]
@@ -113,6 +179,9 @@ class Constants:
 
     # Celery
     RUN_INDEXING = "run_indexing"
+    PURGE_EXPIRED_CHATS = "purge_expired_chats"
+    PURGE_EXPIRED_CHATS_HOUR = int(os.environ.get("PURGE_EXPIRED_CHATS_HOUR", 3))
+    PURGE_EXPIRED_CHATS_BATCH_SIZE = int(os.environ.get("PURGE_EXPIRED_CHATS_BATCH_SIZE", 5000))
     CELERY_BROKER_POOL_LIMIT = int(os.environ.get("CELERY_BROKER_POOL_LIMIT", 10))
     CELERY_SEPARATOR = ":"
     CELERY_RESULT_EXPIRES = int(os.environ.get("CELERY_RESULT_EXPIRES", 86400))
@@ -125,13 +194,16 @@ class Constants:
 
     # Document
     MAX_FILE_SIZE = 20 * 1024 * 1024  # 20MB
+    DOCUMENT_INDEXING_STALE_TIMEOUT = int(os.getenv("DOCUMENT_INDEXING_STALE_TIMEOUT", 3600))
+    PDF_PARSING_MAX_WORKERS = int(os.getenv("PDF_PARSING_MAX_WORKERS", min(os.cpu_count() or 1, 4)))
+    PDF_PARSING_MIN_PAGES_PER_WORKER = 16
+    PDF_PARSING_RANGES_PER_WORKER = 4
 
     # LLM Prompts
     CHAT_SESSION_NAMING_PROMPT = """
-    Generate a short and concise title (5-10 words) for the chat session based on the following conversation:
+    Generate a short and concise title (5-10 words) for the chat session based on the following first message of the user:
 
     User: {user_message}
-    Agent: {agent_message}
 
     Provide answer without double quotes.
     """
@@ -202,6 +274,23 @@ class Constants:
 
     Your response:"""
 
+    CHAT_HISTORY_SUMMARY_PROMPT = """
+    Progressively summarize the following conversation between an employee and a human resources professional,
+    adding onto the current summary and returning a new summary.
+    Keep the facts, names, numbers and questions that may be needed later in the conversation.
+
+    Current summary:
+    '''
+    {summary}
+    '''
+
+    New lines of conversation:
+    '''
+    {chat_history}
+    '''
+
+    New summary:"""
+
 
 class CeleryPriority(int, Enum):
     HIGHEST = 0
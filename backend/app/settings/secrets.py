@@ -11,6 +11,8 @@ class Secrets:
     MSSQL_SA_PASSWORD = os.getenv("MSSQL_SA_PASSWORD", "P.ssword123")
     MSSQL_DB = os.getenv("MSSQL_DB", "chatbot")
     MSSQL_PORT = int(os.getenv("MSSQL_PORT", 1433))
+    MSSQL_READ_HOST = os.getenv("MSSQL_READ_HOST")
+    MSSQL_READ_PORT = int(os.getenv("MSSQL_READ_PORT", MSSQL_PORT))
 
     # Minio Credentials
     MINIO_ENDPOINT = os.getenv("MINIO_ENDPOINT", "127.0.0.1:9000")
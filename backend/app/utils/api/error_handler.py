@@ -22,6 +22,8 @@ class ErrorCodesMappingNumber(Enum):
     LLM_PROVIDER_NOT_FOUND = (404, "LLM provider not found")
     USER_SETTING_NOT_FOUND = (404, "User setting not found")
     EMBEDDING_PROVIDER_NOT_FOUND = (404, "Embedding provider not found")
+    DOCUMENT_NOT_FOUND = (404, "Document not found")
+    DOCUMENT_INDEXING_IN_PROGRESS = (409, "Document is being indexed")
     PROVIDER_TYPE_CHANGE_NOT_ALLOWED = (422, "Provider type change not allowed")
 
     NO_CONTENT = (204, "No content found")
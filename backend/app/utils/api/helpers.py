@@ -1,13 +1,24 @@
+import base64
 import io
+import json
 import logging.handlers
+import multiprocessing
 import os
 import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
 from typing import Any
+from typing import BinaryIO
 from typing import Dict
+from typing import Generator
 from typing import List
 from typing import Optional
+from typing import Tuple
 from typing import Type
+from typing import Union
+from uuid import UUID
 
 import pdfplumber
 import yaml
@@ -38,37 +49,219 @@ def remove_vietnamese_accents(input_str: str) -> str:
     return "".join([S0[S1.index(c)] if c in S1 else c for c in input_str])
 
 
+# PDF file, or path of the PDF file, parsed by the current process of the PDF parsing pool
+_pool_document: Optional[Union[bytes, str]] = None
+
+
+def _init_pdf_parsing_process(document: Union[bytes, str]) -> None:
+    """
+    Initialize a process of the PDF parsing pool, so that the PDF file is sent once per process
+    instead of once per page range.
+
+    Args:
+        document (Union[bytes, str]): PDF file to parse, or its path to open it in the process.
+    """
+    global _pool_document
+    _pool_document = document
+
+
+def _extract_pdf_pages(
+    page_range: Tuple[int, int], document: Optional[Union[bytes, str]] = None
+) -> List[Tuple[int, str]]:
+    """
+    Extract the text of a range of pages of a PDF file.
+
+    Args:
+        page_range (Tuple[int, int]): Start (inclusive) and end (exclusive) indexes of the pages.
+        document (Optional[Union[bytes, str]]): PDF file to parse, or its path.
+            Defaults to the PDF file of the current pool process.
+
+    Returns:
+        List[Tuple[int, str]]: Page number (1-based) and text of the pages with text.
+    """
+    document = document or _pool_document
+    start, end = page_range
+    pages = []
+    with pdfplumber.open(io.BytesIO(document) if isinstance(document, bytes) else document) as pdf:
+        for index in range(start, end):
+            page = pdf.pages[index]
+            page_text = page.extract_text()
+            if page_text:
+                pages.append((index + 1, page_text))
+
+            # Release the parsed layout of the page, which is kept by pdfplumber otherwise
+            page.close()
+
+    return pages
+
+
 def parse_pdf(
     document: bytes,
     metadata: Dict[str, Any] = {},
+    max_workers: int = Constants.PDF_PARSING_MAX_WORKERS,
 ) -> List[Document] | None:
     """
-    Parse a PDF file into Llamaindex Document objects.
+    Parse a PDF file into Llamaindex Document objects, one per page with text.
+    The pages of large files are parsed by ranges in a process pool, the small files are parsed serially.
 
     Args:
         document (bytes): PDF file to parse.
         metadata (Dict[str, Any]): Additional metadata for the document.
+        max_workers (int): Maximum number of parsing processes. Defaults to the configured number.
 
     Returns:
-        List[Document]: List of Llamaindex Document objects.
+        List[Document]: List of Llamaindex Document objects, in the page order.
     """
     try:
-        documents = []
         with pdfplumber.open(io.BytesIO(document)) as pdf:
-            for page in pdf.pages:
-                # Extract text from the page
+            page_count = len(pdf.pages)
+
+        pages = None
+        workers = min(max_workers, page_count // Constants.PDF_PARSING_MIN_PAGES_PER_WORKER)
+        if workers > 1:
+            # Several ranges per process balance the pages that are slower to parse
+            range_size = -(-page_count // (workers * Constants.PDF_PARSING_RANGES_PER_WORKER))
+            page_ranges = [
+                (start, min(start + range_size, page_count))
+                for start in range(0, page_count, range_size)
+            ]
+            try:
+                # The processes are spawned, forking a threaded worker process is not safe
+                with ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_pdf_parsing_process,
+                    initargs=(document,),
+                ) as executor:
+                    pages = [
+                        page
+                        for range_pages in executor.map(_extract_pdf_pages, page_ranges)
+                        for page in range_pages
+                    ]
+            except (OSError, AssertionError, BrokenProcessPool) as e:
+                # E.g. a daemonic process is not allowed to have children
+                logger.warning(f"Failed to parse PDF file in parallel, parsing it serially: {e}")
+
+        if pages is None:
+            pages = _extract_pdf_pages(page_range=(0, page_count), document=document)
+
+        documents = [
+            Document(text=page_text, metadata={**metadata, "page_number": page_number})
+            for page_number, page_text in pages
+        ]
+    except Exception as e:
+        raise PdfParsingError(f"Error parsing PDF file: {e}")
+
+    return documents
+
+
+def _iter_pdf_page_ranges_in_pool(
+    file: str, page_count: int, workers: int, batch_pages: int
+) -> Generator[Tuple[int, List[Tuple[int, str]]], None, None]:
+    """
+    Parse the pages of a PDF file by ranges in a process pool, one batch of pages ahead of the consumer.
+    Each batch is split into one range per process, and the ranges of the next batch are parsed while
+    the current batch is consumed.
+
+    Args:
+        file (str): Path of the PDF file, opened by every process.
+        page_count (int): Number of pages of the PDF file.
+        workers (int): Number of parsing processes.
+        batch_pages (int): Number of pages consumed at once.
+
+    Yields:
+        Tuple[int, List[Tuple[int, str]]]: End index (exclusive) of the range, and page number (1-based) and text
+        of its pages with text, in the page order.
+    """
+    range_size = -(-batch_pages // workers)
+    page_ranges = deque(
+        (start, min(start + range_size, page_count)) for start in range(0, page_count, range_size)
+    )
+
+    # The processes are spawned, forking a threaded worker process is not safe
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_pdf_parsing_process,
+        initargs=(file,),
+    ) as executor:
+        futures = deque()
+        try:
+            while page_ranges or futures:
+                # Keep the ranges of the current and the next batch in flight
+                while page_ranges and len(futures) < 2 * workers:
+                    page_range = page_ranges.popleft()
+                    futures.append((page_range[1], executor.submit(_extract_pdf_pages, page_range)))
+
+                end, future = futures.popleft()
+                yield end, future.result()
+        finally:
+            # The consumer may stop early, the pending ranges are not parsed then
+            for _, future in futures:
+                future.cancel()
+
+
+def iter_pdf_pages(
+    file: Union[str, BinaryIO],
+    metadata: Dict[str, Any] = {},
+    max_workers: int = Constants.PDF_PARSING_MAX_WORKERS,
+    batch_pages: int = Constants.INGESTION_STREAMING_BATCH_PAGES,
+) -> Generator[Document, None, None]:
+    """
+    Parse a PDF file lazily into Llamaindex Document objects, one per page with text.
+    Only the pages being parsed are kept in memory, so the file should be on disk, e.g. a spooled temporary file.
+    The large files given by path are parsed in a process pool, one batch of pages ahead of the consumer,
+    the others are parsed serially.
+
+    Args:
+        file (Union[str, BinaryIO]): Path or file object of the PDF file to parse.
+        metadata (Dict[str, Any]): Additional metadata for the document.
+        max_workers (int): Maximum number of parsing processes. Defaults to the configured number.
+        batch_pages (int): Number of pages consumed at once. Defaults to the streaming batch size.
+
+    Yields:
+        Document: Llamaindex Document object of a page, in the page order.
+    """
+    try:
+        with pdfplumber.open(file) as pdf:
+            page_count = len(pdf.pages)
+
+            # Index of the first page not parsed yet
+            start = 0
+            workers = (
+                min(max_workers, page_count // Constants.PDF_PARSING_MIN_PAGES_PER_WORKER)
+                if isinstance(file, str)
+                else 0
+            )
+            if workers > 1:
+                try:
+                    for end, pages in _iter_pdf_page_ranges_in_pool(
+                        file=file, page_count=page_count, workers=workers, batch_pages=batch_pages
+                    ):
+                        for page_number, page_text in pages:
+                            yield Document(
+                                text=page_text, metadata={**metadata, "page_number": page_number}
+                            )
+                        start = end
+                except (OSError, AssertionError, BrokenProcessPool) as e:
+                    # E.g. a daemonic process is not allowed to have children
+                    logger.warning(
+                        f"Failed to parse PDF file in parallel, parsing it serially from page {start + 1}: {e}"
+                    )
+
+            for index in range(start, page_count):
+                page = pdf.pages[index]
                 page_text = page.extract_text()
+
+                # Release the parsed layout of the page, which is kept by pdfplumber otherwise
+                page.close()
                 if not page_text:
                     continue
 
-                # Create a Llamaindex Document object
-                doc = Document(text=page_text, metadata=metadata)
-                documents.append(doc)
+                yield Document(text=page_text, metadata={**metadata, "page_number": index + 1})
     except Exception as e:
         raise PdfParsingError(f"Error parsing PDF file: {e}")
 
-    return documents
-
 
 # TODO: Separate the logger configuration into a separate module
 class ColoredFormatter(logging.Formatter):
@@ -351,6 +544,41 @@ def get_database_url() -> str:
     return database_url
 
 
+def encode_cursor(timestamp: datetime, id: UUID) -> str:
+    """
+    Encode the keyset of the last item of a page into an opaque pagination cursor.
+
+    Args:
+        timestamp (datetime): Sort timestamp of the last item.
+        id (UUID): Id of the last item, which breaks the ties of the timestamp.
+
+    Returns:
+        str: Pagination cursor.
+    """
+    keyset = json.dumps([timestamp.isoformat(), str(id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(keyset.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    """
+    Decode a pagination cursor into the keyset of the last item of the previous page.
+
+    Args:
+        cursor (str): Pagination cursor.
+
+    Returns:
+        Tuple[datetime, UUID]: Sort timestamp and id of the last item.
+
+    Raises:
+        ValueError: The cursor is malformed.
+    """
+    try:
+        timestamp, id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return datetime.fromisoformat(timestamp), UUID(id)
+    except Exception as e:
+        raise ValueError(f"Invalid pagination cursor: {cursor}") from e
+
+
 def load_yaml(file_path: str) -> dict:
     """
     Load a YAML file.
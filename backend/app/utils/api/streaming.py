@@ -0,0 +1,209 @@
+import asyncio
+from collections.abc import AsyncGenerator
+from collections.abc import AsyncIterator
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+
+from redis.asyncio import Redis as AsyncRedis
+from sse_starlette.event import ensure_bytes
+from sse_starlette.sse import EventSourceResponse
+
+from app.models.chat import ChatMessageStreamEventType
+from app.models.chat import ChatStreamResponse
+from app.settings import Constants
+from app.utils.api.helpers import get_logger
+
+logger = get_logger(__name__)
+
+
+async def coalesce_stream(
+    chunks: AsyncIterator[str],
+    interval: float = Constants.CHAT_STREAM_COALESCE_INTERVAL,
+    max_size: int = Constants.CHAT_STREAM_COALESCE_MAX_SIZE,
+) -> AsyncGenerator[str, None]:
+    """
+    Merge the chunks of a text stream, so that a single frame is sent per time interval instead of one per chunk.
+    A merged chunk is emitted once the interval has elapsed since its first chunk was received,
+    once it reaches the maximum size, or at the end of the stream.
+
+    A single reader task drains the text stream into the buffer, so that nothing is scheduled per chunk:
+    the emitter only wakes up when a merged chunk is due, on a timer or when the buffer is full.
+    The chunks received while a merged chunk is being sent are merged into the next one.
+
+    Args:
+        chunks (AsyncIterator[str]): Text stream, e.g. the tokens generated by the LLM.
+        interval (float): Maximum time in seconds a chunk is held before being emitted. Defaults to 30 ms.
+        max_size (int): Maximum number of characters of a merged chunk. Defaults to 512.
+
+    Yields:
+        str: A merged chunk of the text stream.
+    """
+    loop = asyncio.get_running_loop()
+    buffer: List[str] = []
+    buffer_size = 0
+    deadline = 0.0
+    timer: Optional[asyncio.TimerHandle] = None
+    waiter: Optional[asyncio.Future] = None
+    is_exhausted = False
+    error: Optional[Exception] = None
+
+    def wake() -> None:
+        if waiter is not None and not waiter.done():
+            waiter.set_result(None)
+
+    async def read() -> None:
+        nonlocal buffer_size, deadline, timer, is_exhausted, error
+        try:
+            async for chunk in chunks:
+                if not buffer:
+                    deadline = loop.time() + interval
+                    timer = loop.call_at(deadline, wake)
+                buffer.append(chunk)
+                buffer_size += len(chunk)
+
+                if buffer_size >= max_size:
+                    wake()
+        except Exception as e:
+            error = e
+        finally:
+            is_exhausted = True
+            wake()
+
+    reader = asyncio.ensure_future(read())
+    try:
+        while True:
+            is_due = is_exhausted or buffer_size >= max_size or (buffer and loop.time() >= deadline)
+            if not is_due:
+                waiter = loop.create_future()
+                await waiter
+                waiter = None
+                continue
+
+            if not buffer:
+                break
+
+            if timer is not None:
+                timer.cancel()
+                timer = None
+            chunk = "".join(buffer)
+            buffer.clear()
+            buffer_size = 0
+            yield chunk
+
+        # The chunks received before the error are emitted first
+        if error is not None:
+            raise error
+    finally:
+        if timer is not None:
+            timer.cancel()
+        reader.cancel()
+
+
+class RedisChatStream:
+    _OPEN_FIELD = b"open"
+    _FRAME_FIELD = b"frame"
+    _END_FIELD = b"end"
+
+    def __init__(
+        self,
+        redis_client: AsyncRedis,
+        stream_id: str,
+        tail_client: Optional[AsyncRedis] = None,
+        ttl: int = Constants.CHAT_STREAM_TTL,
+        max_length: int = Constants.CHAT_STREAM_MAX_LENGTH,
+    ):
+        """
+        Redis Stream of the SSE frames of a chat response, keyed by the response message id.
+        The generation publishes the frames independently of the HTTP connection, and any number of
+        clients tail the stream, resuming after the `Last-Event-ID` they received last.
+
+        Args:
+            redis_client (AsyncRedis): Async Redis client.
+            stream_id (str): Stream id, i.e. the id of the chat response message.
+            tail_client (Optional[AsyncRedis]): Async Redis client of the blocking reads, with a pool of its own.
+                Defaults to `redis_client`.
+            ttl (int): Time to live of the stream in seconds. Defaults to 1 hour.
+            max_length (int): Approximate maximum number of frames kept in the stream. Defaults to 10000.
+        """
+        self._redis_client = redis_client
+        self._tail_client = tail_client or redis_client
+        self._key = f"{Constants.CHAT_STREAM_PREFIX}:{stream_id}"
+        self._ttl = ttl
+        self._max_length = max_length
+
+    async def _add(self, fields: Dict[bytes, Any]) -> None:
+        """
+        Append an entry to the stream and refresh its time to live.
+
+        Args:
+            fields (Dict[bytes, Any]): Fields of the entry.
+        """
+        async with self._redis_client.pipeline(transaction=False) as pipeline:
+            pipeline.xadd(self._key, fields, maxlen=self._max_length, approximate=True)
+            pipeline.expire(self._key, self._ttl)
+            await pipeline.execute()
+
+    async def aopen(self) -> None:
+        """
+        Create the stream, so that it can be tailed before the first frame is published.
+        """
+        await self._add({self._OPEN_FIELD: 1})
+
+    async def apublish(self, frames: AsyncIterator[Any]) -> None:
+        """
+        Publish every frame of the chat response, then mark the end of the stream.
+        The end is marked even if the generation fails, so that the tailing clients never hang.
+
+        Args:
+            frames (AsyncIterator[Any]): SSE frames, either pre-encoded bytes or dictionaries.
+        """
+        try:
+            async for frame in frames:
+                await self._add(
+                    {self._FRAME_FIELD: ensure_bytes(frame, EventSourceResponse.DEFAULT_SEPARATOR)}
+                )
+        finally:
+            await self._add({self._END_FIELD: 1})
+
+    async def atail(self, last_event_id: Optional[str] = None) -> AsyncGenerator[bytes, None]:
+        """
+        Tail the stream from the beginning or after the last received frame, until its end.
+        Every frame carries its stream entry id as the SSE id, so that a reconnecting client can resume.
+
+        Args:
+            last_event_id (Optional[str]): Id of the last frame received by the client. Defaults to None.
+
+        Yields:
+            bytes: An SSE frame.
+        """
+        loop = asyncio.get_running_loop()
+        last_id = last_event_id or "0-0"
+        idle_since = loop.time()
+
+        while True:
+            entries = await self._tail_client.xread(
+                {self._key: last_id}, count=100, block=Constants.CHAT_STREAM_BLOCK_MS
+            )
+            if not entries:
+                # The stream expired or its generation died without marking the end
+                if (
+                    not await self._tail_client.exists(self._key)
+                    or loop.time() - idle_since > Constants.CHAT_STREAM_IDLE_TIMEOUT
+                ):
+                    logger.warning(f"Chat stream {self._key} is not available anymore")
+                    yield ChatStreamResponse.encode(
+                        event=ChatMessageStreamEventType.ERROR,
+                        content="Chat stream is not available anymore",
+                    )
+                    return
+                continue
+
+            idle_since = loop.time()
+            for entry_id, fields in entries[0][1]:
+                last_id = entry_id
+                if self._END_FIELD in fields:
+                    return
+                if self._FRAME_FIELD in fields:
+                    yield b"id: " + entry_id + b"\r\n" + fields[self._FRAME_FIELD]
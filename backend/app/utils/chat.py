@@ -0,0 +1,115 @@
+import gzip
+import io
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.databases.minio import MinioConnector
+from app.models import ChatMessage
+from app.settings import Constants
+from app.utils.api.helpers import get_logger
+
+logger = get_logger(__name__)
+
+
+def offload_chat_message(
+    minio_connector: MinioConnector, chat_session_id: str, chat_message_id: str, message: str
+) -> Tuple[str, Optional[str]]:
+    """
+    Offload a long message to the object storage, gzip compressed, so that only its preview is stored inline.
+    The message is kept inline if it is short or if the upload fails.
+
+    Args:
+        minio_connector (MinioConnector): Object storage connector.
+        chat_session_id (str): Chat session id.
+        chat_message_id (str): Chat message id.
+        message (str): Full message.
+
+    Returns:
+        Tuple[str, Optional[str]]: Inline message, i.e. the preview if offloaded, and the object name if offloaded.
+    """
+    if len(message) <= Constants.CHAT_MESSAGE_OFFLOAD_THRESHOLD:
+        return message, None
+
+    object_name = f"{chat_session_id}/{chat_message_id}.txt.gz"
+    data = gzip.compress(message.encode("utf-8"))
+    is_uploaded = minio_connector.upload_file(
+        object_name=object_name,
+        data=io.BytesIO(data),
+        bucket_name=Constants.MINIO_CHAT_MESSAGE_BUCKET,
+        length=len(data),
+    )
+    if not is_uploaded:
+        logger.warning(f"Failed to offload chat message {chat_message_id}, it is stored inline")
+        return message, None
+
+    return message[: Constants.CHAT_MESSAGE_PREVIEW_LENGTH], object_name
+
+
+def load_chat_message(minio_connector: MinioConnector, object_name: str) -> Optional[str]:
+    """
+    Load the full message of an offloaded chat message from the object storage.
+
+    Args:
+        minio_connector (MinioConnector): Object storage connector.
+        object_name (str): Object name of the offloaded message.
+
+    Returns:
+        Optional[str]: Full message, None if it cannot be loaded.
+    """
+    data = minio_connector.get_file(
+        object_name=object_name, bucket_name=Constants.MINIO_CHAT_MESSAGE_BUCKET
+    )
+    if data is None:
+        return None
+
+    return gzip.decompress(data).decode("utf-8")
+
+
+def delete_offloaded_chat_messages(
+    minio_connector: MinioConnector, object_names: Iterable[Optional[str]]
+) -> None:
+    """
+    Delete the full messages of the deleted chat messages from the object storage.
+    It is called once the chat messages are deleted from the database, a failed deletion only leaves an orphan object.
+
+    Args:
+        minio_connector (MinioConnector): Object storage connector.
+        object_names (Iterable[Optional[str]]): Object names of the deleted chat messages, None if not offloaded.
+    """
+    for object_name in filter(None, object_names):
+        is_deleted = minio_connector.delete_file(
+            object_name=object_name, bucket_name=Constants.MINIO_CHAT_MESSAGE_BUCKET
+        )
+        if not is_deleted:
+            logger.warning(f"Failed to delete offloaded chat message {object_name}")
+
+
+def hydrate_chat_messages(
+    minio_connector: MinioConnector, chat_messages: List[ChatMessage]
+) -> None:
+    """
+    Replace the preview of the offloaded chat messages by their full message, in place.
+    The full message is set as the loaded value, so that it is never written back to the database.
+    The preview is kept if the full message cannot be loaded.
+
+    Args:
+        minio_connector (MinioConnector): Object storage connector.
+        chat_messages (List[ChatMessage]): Chat messages to hydrate.
+    """
+    for chat_message in chat_messages:
+        if not chat_message.is_truncated:
+            continue
+
+        message = load_chat_message(
+            minio_connector=minio_connector, object_name=chat_message.message_object_name
+        )
+        if message is None:
+            logger.warning(f"Failed to load offloaded chat message {chat_message.id}")
+            continue
+
+        set_committed_value(chat_message, "message", message)
+        set_committed_value(chat_message, "message_object_name", None)
@@ -1,5 +1,7 @@
+import hashlib
 import os
 from datetime import datetime
+from typing import BinaryIO
 from typing import Literal
 
 from app.utils.string import remove_vietnamese_accents
@@ -37,3 +39,24 @@ def construct_file_path(
     file_path = os.path.join(bucket_name, file_name)
 
     return file_path
+
+
+def compute_file_hash(data: BinaryIO, chunk_size: int = 1024 * 1024) -> str:
+    """
+    Compute the SHA-256 of a file, reading it by chunks so that it is never fully loaded in memory.
+    The file pointer is moved back to where it was.
+
+    Args:
+        data (BinaryIO): File data. It must be seekable.
+        chunk_size (int): Size of the read chunks in bytes. Defaults to 1MB.
+
+    Returns:
+        str: Hex digest of the file content.
+    """
+    current_pos = data.tell()
+    sha256 = hashlib.sha256()
+    while chunk := data.read(chunk_size):
+        sha256.update(chunk)
+    data.seek(current_pos)
+
+    return sha256.hexdigest()
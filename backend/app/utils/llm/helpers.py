@@ -5,6 +5,7 @@ from typing import Optional
 import tiktoken
 from llama_index.core import Settings
 from llama_index.core.callbacks import CallbackManager
+from llama_index.core.llms.llm import LLM
 from llama_index.embeddings.cohere import CohereEmbedding
 from llama_index.embeddings.gemini import GeminiEmbedding
 from llama_index.embeddings.openai import OpenAIEmbedding
@@ -17,10 +18,15 @@ from openai import OpenAIError
 from tenacity import retry
 from tenacity import stop_after_attempt
 
+from app.integrations.llama_index.engines import reset_semantic_answer_cache
+from app.integrations.llama_index.indices import reset_vector_store_index
 from app.models.provider import ProviderType
 from app.settings import Constants
 from app.settings import Secrets
 
+# LLM dedicated to the chat session naming, built lazily from the current LLM
+_chat_session_naming_llm: Optional[OpenAI] = None
+
 
 @retry(stop=stop_after_attempt(Constants.RETRY_TIMES))
 def init_llm_configurations(
@@ -77,6 +83,35 @@ def init_llm_configurations(
     Settings.callback_manager = callback_manager
 
 
+def get_chat_session_naming_llm() -> LLM:
+    """
+    Get the LLM used to name the chat sessions.
+    A cheaper OpenAI model can be configured with `CHAT_SESSION_NAMING_LLM_MODEL`,
+    otherwise (or if the current LLM is not an OpenAI one) the current LLM is used.
+
+    Returns:
+        LLM: LLM used to name the chat sessions.
+    """
+    global _chat_session_naming_llm
+
+    llm = Settings.llm
+    model = Constants.CHAT_SESSION_NAMING_LLM_MODEL
+    if not model or not isinstance(llm, OpenAI) or llm.model == model:
+        return llm
+
+    # Rebuild the naming LLM whenever the current LLM is switched to another API key
+    if _chat_session_naming_llm is None or _chat_session_naming_llm.api_key != llm.api_key:
+        _chat_session_naming_llm = OpenAI(
+            model=model,
+            temperature=0.3,
+            max_tokens=Constants.CHAT_SESSION_NAMING_MAX_TOKENS,
+            api_key=llm.api_key,
+            callback_manager=llm.callback_manager,
+        )
+
+    return _chat_session_naming_llm
+
+
 def get_openai_api_key() -> str:
     """
     Get the OpenAI API key specified in the environment variables.
@@ -206,5 +241,9 @@ def handle_current_embedding_model(
             )
         else:
             raise ValueError(f"Invalid embedding provider type: {provider_type}")
+
+        # The shared index holds the previous embedding model, rebuild it on next use
+        reset_vector_store_index()
+        reset_semantic_answer_cache()
     except Exception as e:
         raise ValueError(f"Error setting the current embedding model: {e}")
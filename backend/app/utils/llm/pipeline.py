@@ -15,6 +15,7 @@ from llama_index.vector_stores.qdrant import QdrantVectorStore
 
 from app.databases.qdrant import QdrantConnector
 from app.databases.redis import RedisConnector
+from app.integrations.llama_index.llms import RateLimitedLLM
 from app.settings import Constants
 from app.utils.api.helpers import parse_pdf
 
@@ -29,9 +30,10 @@ def get_transformations() -> List[Any]:
     # TODO: Add two fields `issue_date` (datetime) and `outdated` (bool) to the document metadata
 
     # Define node postprocessor methods
+    llm = RateLimitedLLM.from_llm(Settings.llm)
     extractors = [
-        QuestionsAnsweredExtractor(llm=Settings.llm, questions=2),
-        KeywordExtractor(llm=Settings.llm, keywords=5),
+        QuestionsAnsweredExtractor(llm=llm, questions=2),
+        KeywordExtractor(llm=llm, keywords=5),
     ]
 
     # Define chunking method
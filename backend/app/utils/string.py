@@ -1,3 +1,7 @@
+import re
+import unicodedata
+from typing import Optional
+
 S1 = "ÀÁÂÃÈÉÊÌÍÒÓÔÕÙÚÝàáâãèéêìíòóôõùúýĂăĐđĨĩŨũƠơƯưẠạẢảẤấẦầẨẩẪẫẬậẮắẰằẲẳẴẵẶặẸẹẺẻẼẽẾếỀềỂểỄễỆệỈỉỊịỌọỎỏỐốỒồỔổỖỗỘộỚớỜờỞởỠỡỢợỤụỦủỨứỪừỬửỮữỰựỲỳỴỵỶỷỸỹ"
 S0 = "AAAAEEEIIOOOOUUYaaaaeeeiioooouuyAaDdIiUuOoUuAaAaAaAaAaAaAaAaAaAaAaAaEeEeEeEeEeEeEeEeIiIiOoOoOoOoOoOoOoOoOoOoOoOoUuUuUuUuUuUuUuYyYyYyYy"
 
@@ -14,3 +18,35 @@ def remove_vietnamese_accents(input_str: str) -> str:
     """
 
     return "".join([S0[S1.index(c)] if c in S1 else c for c in input_str])
+
+
+def normalize_search_text(input_str: str) -> str:
+    """
+    Normalize a text for the accent-insensitive full-text search, i.e. remove its Vietnamese accents and lower it.
+
+    Args:
+        input_str (str): Input string.
+
+    Returns:
+        str: Normalized string.
+    """
+    # The accents typed as combining characters are composed first
+    return remove_vietnamese_accents(input_str=unicodedata.normalize("NFC", input_str)).lower()
+
+
+def build_full_text_query(input_str: str) -> Optional[str]:
+    """
+    Build the full-text search condition matching every word of the search query, each word as a prefix.
+    E.g. "Nghỉ phép" becomes '"nghi*" AND "phep*"'.
+
+    Args:
+        input_str (str): Search query.
+
+    Returns:
+        Optional[str]: Full-text search condition, None if the search query has no word.
+    """
+    words = re.findall(r"\w+", normalize_search_text(input_str=input_str))
+    if not words:
+        return None
+
+    return " AND ".join(f'"{word}*"' for word in words)
@@ -42,6 +42,10 @@ def get_current_user_from_token(
 
     user, error = UserService(db_session=db_session).get_user_by_email(email=user_email)
 
+    # End the read-only transaction, so that the pooled connection is not held for the whole request
+    # (e.g. a chat stream). The session begins a new transaction on its next use.
+    db_session.commit()
+
     if error:
         status_code, detail = error.kind
         raise HTTPException(status_code=status_code, detail=detail)
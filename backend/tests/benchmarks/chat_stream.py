@@ -0,0 +1,127 @@
+"""
+Benchmark of the SSE delta emission of the chat stream.
+
+It compares, for concurrent simulated LLM streams:
+    - before: one `ChatStreamResponse` (pydantic) and one SSE frame per token;
+    - after: tokens coalesced per interval / size and encoded with `ChatStreamResponse.encode`.
+
+Usage:
+    python -m tests.benchmarks.chat_stream --streams 50 --tokens 500 --token-interval 0.005
+"""
+
+import argparse
+import asyncio
+import time
+from collections.abc import AsyncGenerator
+from typing import Any
+from typing import Callable
+from typing import Dict
+
+from sse_starlette.event import ensure_bytes
+from sse_starlette.sse import EventSourceResponse
+
+from app.models.chat import ChatMessageStreamEventType
+from app.models.chat import ChatStreamResponse
+from app.utils.api.streaming import coalesce_stream
+
+
+async def generate_tokens(tokens: int, token_interval: float) -> AsyncGenerator[str, None]:
+    """
+    Simulate the tokens generated by the LLM.
+
+    Args:
+        tokens (int): Number of tokens to generate.
+        token_interval (float): Time in seconds between two tokens.
+
+    Yields:
+        str: A token.
+    """
+    for i in range(tokens):
+        await asyncio.sleep(token_interval)
+        yield f"từ{i} "
+
+
+async def stream_before(tokens: int, token_interval: float) -> int:
+    """
+    Stream the tokens as one pydantic model and one SSE frame per token.
+
+    Returns:
+        int: Number of frames sent.
+    """
+    frames = 0
+    async for token in generate_tokens(tokens=tokens, token_interval=token_interval):
+        ensure_bytes(
+            ChatStreamResponse(event=ChatMessageStreamEventType.DELTA, content=token).as_json(),
+            EventSourceResponse.DEFAULT_SEPARATOR,
+        )
+        frames += 1
+    return frames
+
+
+async def stream_after(tokens: int, token_interval: float) -> int:
+    """
+    Stream the tokens coalesced into pre-encoded SSE frames.
+
+    Returns:
+        int: Number of frames sent.
+    """
+    frames = 0
+    chunks = generate_tokens(tokens=tokens, token_interval=token_interval)
+    async for chunk in coalesce_stream(chunks=chunks):
+        ensure_bytes(
+            ChatStreamResponse.encode(event=ChatMessageStreamEventType.DELTA, content=chunk),
+            EventSourceResponse.DEFAULT_SEPARATOR,
+        )
+        frames += 1
+    return frames
+
+
+async def run(
+    stream: Callable[[int, float], Any], streams: int, tokens: int, token_interval: float
+) -> Dict[str, float]:
+    """
+    Run concurrent streams and measure the frames and the CPU time.
+
+    Returns:
+        Dict[str, float]: Measurements of the run.
+    """
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    frames = await asyncio.gather(*(stream(tokens, token_interval) for _ in range(streams)))
+    wall, cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+
+    return {
+        "frames": sum(frames),
+        "frames_per_sec_per_stream": sum(frames) / wall / streams,
+        "cpu_ms_per_stream": cpu * 1000 / streams,
+        "wall_s": wall,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--streams", type=int, default=50, help="Number of concurrent streams")
+    parser.add_argument("--tokens", type=int, default=500, help="Number of tokens per stream")
+    parser.add_argument(
+        "--token-interval", type=float, default=0.005, help="Seconds between two tokens"
+    )
+    args = parser.parse_args()
+
+    for name, stream in (("before", stream_before), ("after", stream_after)):
+        result = asyncio.run(
+            run(
+                stream=stream,
+                streams=args.streams,
+                tokens=args.tokens,
+                token_interval=args.token_interval,
+            )
+        )
+        print(
+            f"{name:>6}: {result['frames']:>8} frames, "
+            f"{result['frames_per_sec_per_stream']:>8.1f} frames/s/stream, "
+            f"{result['cpu_ms_per_stream']:>8.2f} ms CPU/stream, "
+            f"{result['wall_s']:.2f} s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Benchmark of the page-level parallel parsing of a PDF file.
+
+It parses the same PDF file with 1 (serial), 2, 4 and 8 parsing processes and compares the pages per second.
+The process startup is included, as it is paid on every parsing.
+
+With --streaming, the file is parsed by `iter_pdf_pages` and consumed by batches of pages, each batch taking
+--batch-delay seconds to stand in for the splitting, extraction and embedding of the indexing pipeline.
+
+Usage:
+    python -m tests.benchmarks.pdf_parsing --file handbook.pdf --workers 1 2 4 8 --repeat 3
+    python -m tests.benchmarks.pdf_parsing --file handbook.pdf --streaming --batch-delay 0.2
+"""
+
+import argparse
+import time
+from itertools import islice
+from typing import Dict
+from typing import List
+
+import pdfplumber
+
+from app.settings import Constants
+from app.utils.api.helpers import iter_pdf_pages
+from app.utils.api.helpers import parse_pdf
+
+
+def run_streaming(file: str, workers: int, repeat: int, batch_delay: float) -> Dict[str, float]:
+    """
+    Parse the PDF file lazily several times, consuming it by batches of pages, and measure the best wall time.
+
+    Args:
+        file (str): Path of the PDF file to parse.
+        workers (int): Maximum number of parsing processes.
+        repeat (int): Number of parsings.
+        batch_delay (float): Processing time of a batch of pages, in seconds.
+
+    Returns:
+        Dict[str, float]: Measurements of the run.
+    """
+    timings: List[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        documents = 0
+        pages = iter_pdf_pages(file=file, max_workers=workers)
+        while batch := list(islice(pages, Constants.INGESTION_STREAMING_BATCH_PAGES)):
+            documents += len(batch)
+            time.sleep(batch_delay)
+        timings.append(time.perf_counter() - start)
+
+    return {"documents": documents, "best_s": min(timings)}
+
+
+def run(document: bytes, page_count: int, workers: int, repeat: int) -> Dict[str, float]:
+    """
+    Parse the PDF file several times and measure the best wall time.
+
+    Args:
+        document (bytes): PDF file to parse.
+        page_count (int): Number of pages of the PDF file.
+        workers (int): Maximum number of parsing processes.
+        repeat (int): Number of parsings.
+
+    Returns:
+        Dict[str, float]: Measurements of the run.
+    """
+    timings: List[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        documents = parse_pdf(document=document, max_workers=workers)
+        timings.append(time.perf_counter() - start)
+
+    best = min(timings)
+    return {
+        "documents": len(documents),
+        "pages_per_sec": page_count / best,
+        "best_s": best,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--file", required=True, help="Path of the PDF file to parse")
+    parser.add_argument(
+        "--workers", type=int, nargs="+", default=[1, 2, 4, 8], help="Numbers of processes"
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Number of parsings per run")
+    parser.add_argument(
+        "--streaming", action="store_true", help="Parse lazily, by batches of pages"
+    )
+    parser.add_argument(
+        "--batch-delay", type=float, default=0.0, help="Processing time of a batch, in seconds"
+    )
+    args = parser.parse_args()
+
+    with open(args.file, "rb") as file:
+        document = file.read()
+    with pdfplumber.open(args.file) as pdf:
+        page_count = len(pdf.pages)
+
+    # Parse in parallel whatever the size of the file, to compare the numbers of processes
+    Constants.PDF_PARSING_MIN_PAGES_PER_WORKER = 1
+
+    baseline = None
+    for workers in args.workers:
+        if args.streaming:
+            result = run_streaming(
+                file=args.file, workers=workers, repeat=args.repeat, batch_delay=args.batch_delay
+            )
+            result["pages_per_sec"] = page_count / result["best_s"]
+        else:
+            result = run(
+                document=document, page_count=page_count, workers=workers, repeat=args.repeat
+            )
+        baseline = baseline or result["pages_per_sec"]
+        print(
+            f"{workers:>2} workers: {page_count:>5} pages, {result['documents']:>5} documents, "
+            f"{result['pages_per_sec']:>8.1f} pages/s, "
+            f"{result['pages_per_sec'] / baseline:>5.2f}x, {result['best_s']:.2f} s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+from types import SimpleNamespace
+from typing import Any
+from typing import Dict
+from typing import Iterator
+from typing import List
+
+import pytest
+from llama_index.core.embeddings import MockEmbedding
+from llama_index.core.node_parser import SentenceSplitter
+from llama_index.core.schema import Document
+from llama_index.core.storage.kvstore import SimpleKVStore
+
+import app.integrations.llama_index.ingestion_pipelines.loaders as loaders
+from app.integrations.llama_index.docstore.mssql import MSSQLDocumentStore
+from app.integrations.llama_index.ingestion_pipelines import IndexingPipeline
+from app.settings import Constants
+
+try:
+    from qdrant_client import QdrantClient
+
+    no_packages = False
+except ImportError:
+    no_packages = True
+
+
+def iter_pages(file: List[str], metadata: Dict[str, Any] = {}) -> Iterator[Document]:
+    """
+    Yield the pages of a fake PDF file, given as the list of its page texts.
+
+    Args:
+        file (List[str]): Text of every page.
+        metadata (Dict[str, Any]): Additional metadata for the pages. Defaults to {}.
+
+    Returns:
+        Iterator[Document]: Pages of the document.
+    """
+    for page_number, text in enumerate(file, start=1):
+        yield Document(text=text, metadata={**metadata, "page_number": page_number})
+
+
+@pytest.fixture
+def qdrant_client() -> Iterator["QdrantClient"]:
+    """
+    Pytest fixture that initializes an in-memory Qdrant client.
+
+    Returns:
+        Iterator[QdrantClient]: An in-memory Qdrant client.
+    """
+    client = QdrantClient(location=":memory:")
+    yield client
+    client.close()
+
+
+@pytest.fixture
+def indexing_pipeline(
+    monkeypatch: pytest.MonkeyPatch, qdrant_client: "QdrantClient"
+) -> IndexingPipeline:
+    """
+    Pytest fixture that initializes an indexing pipeline over in-memory stores, without any LLM call.
+    Every page is a single chunk, and the document store of every document key is kept across the indexings.
+
+    Args:
+        monkeypatch (pytest.MonkeyPatch): Pytest monkeypatch fixture.
+        qdrant_client (QdrantClient): An in-memory Qdrant client.
+
+    Returns:
+        IndexingPipeline: An indexing pipeline.
+    """
+    docstores = {}
+
+    def get_docstore(document_key: str) -> MSSQLDocumentStore:
+        if document_key not in docstores:
+            docstores[document_key] = MSSQLDocumentStore(
+                mssql_kvstore=SimpleKVStore(), namespace=f"document_{document_key}"
+            )
+        return docstores[document_key]
+
+    monkeypatch.setattr(loaders, "iter_pdf_pages", iter_pages)
+    monkeypatch.setattr(loaders, "ExpiringRedisKVStore", lambda **kwargs: SimpleKVStore())
+    monkeypatch.setattr(
+        IndexingPipeline,
+        "_get_transformations",
+        staticmethod(lambda: [SentenceSplitter(chunk_size=512), MockEmbedding(embed_dim=8)]),
+    )
+    monkeypatch.setattr(IndexingPipeline, "_get_docstore", staticmethod(get_docstore))
+
+    return IndexingPipeline(
+        qdrant_connector=SimpleNamespace(client=qdrant_client),
+        redis_connector=SimpleNamespace(get_client=lambda: None),
+    )
+
+
+@pytest.mark.skipif(no_packages, reason="qdrant-client is required for this test")
+def test_indexing_pipeline_new_version(
+    indexing_pipeline: IndexingPipeline, qdrant_client: "QdrantClient"
+) -> None:
+    """
+    Test if a new version of a document, indexed under the key of the previous version, reuses its unchanged
+    chunks and deletes the chunks that are not in the new version anymore.
+
+    Args:
+        indexing_pipeline (IndexingPipeline): An indexing pipeline.
+        qdrant_client (QdrantClient): An in-memory Qdrant client.
+    """
+    document_key = "policy"
+    v1 = [
+        "Annual leave is twelve days per year.",
+        "Sick leave requires a medical certificate.",
+        "Remote work is allowed on Fridays.",
+    ]
+    v2 = [
+        "Annual leave is twelve days per year.",
+        "Sick leave requires a medical certificate.",
+        "Parental leave lasts six months.",
+    ]
+
+    # Index the first version
+    report = indexing_pipeline.run_streaming(file=v1, document_key=document_key)
+    assert report == {"reused": 0, "added": 3, "removed": 0}
+    v1_chunk_ids = indexing_pipeline._get_docstore(document_key=document_key).get_all_document_ids()
+    assert qdrant_client.count(collection_name=Constants.QDRANT_COLLECTION).count == 3
+
+    # Index the second version under the same key
+    report = indexing_pipeline.run_streaming(file=v2, document_key=document_key)
+    assert report == {"reused": 2, "added": 1, "removed": 1}
+    v2_chunk_ids = indexing_pipeline._get_docstore(document_key=document_key).get_all_document_ids()
+    assert len(v2_chunk_ids) == 3
+    assert len(v1_chunk_ids & v2_chunk_ids) == 2
+
+    # The chunk only in the first version is gone from the vector database
+    v1_only_chunk_ids = list(v1_chunk_ids - v2_chunk_ids)
+    assert (
+        qdrant_client.retrieve(collection_name=Constants.QDRANT_COLLECTION, ids=v1_only_chunk_ids)
+        == []
+    )
+    assert qdrant_client.count(collection_name=Constants.QDRANT_COLLECTION).count == 3
@@ -6,6 +6,7 @@ from sqlalchemy import text
 from sqlalchemy.engine import Engine
 from sqlalchemy.exc import OperationalError
 
+from app.databases.mssql import MSSQLConnector
 from app.settings import Constants
 from app.settings import Secrets
 from tests.utils import validate_config
@@ -71,3 +72,16 @@ def test_mssql_connection(mssql_engine: Engine) -> None:
         pytest.fail(f"SQLAlchemy error while connecting to MSSQL: {e}.")
     except Exception as e:
         pytest.fail(f"Unexpected error while connecting to MSSQL: {e}.")
+
+
+def test_mssql_read_engine_falls_back_to_primary(monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Test if the read-only engine falls back to the primary engine when there is no read replica.
+
+    Args:
+        monkeypatch (pytest.MonkeyPatch): Pytest monkeypatch fixture
+    """
+    monkeypatch.setattr(Secrets, "MSSQL_READ_HOST", None)
+    monkeypatch.setattr(MSSQLConnector, "_read_engine", None)
+
+    assert MSSQLConnector.get_read_engine() is MSSQLConnector.get_engine()
@@ -4,6 +4,7 @@ import Markdown from 'react-markdown';
 import { Prism, SyntaxHighlighterProps } from 'react-syntax-highlighter';
 import { oneLight } from 'react-syntax-highlighter/dist/esm/styles/prism';
 
+import { useGetChatMessage } from '@/hooks/chat/use-get-chat-message';
 import { cn } from '@/lib/utils';
 import { ChatMessageType, IChatMessageResponse } from '@/types/chat';
 
@@ -21,7 +22,9 @@ interface IChatMessageProps {
 }
 
 const ChatMessage: FC<IChatMessageProps> = memo(({ chatMessage, isThinking = false, className }) => {
-  const chatMessageContent = chatMessage.message;
+  // Long messages only come with their preview, the full message is fetched when rendered
+  const { data: fullChatMessage } = useGetChatMessage(chatMessage);
+  const chatMessageContent = fullChatMessage?.message ?? chatMessage.message;
 
   return (
     <div
@@ -4,6 +4,7 @@ export enum ReactQueryKey {
   CHAT = 'chat',
   CHAT_SESSION = 'chat-session',
   CHAT_SESSIONS = 'chat-sessions',
+  CHAT_MESSAGE = 'chat-message',
   CHAT_FOLDERS = 'chat-folders',
 
   AGENTS = 'agents',
@@ -6,12 +6,12 @@ import {
   ChatMessageStreamEvent,
   ChatMessageType,
   IChatMessageResponse,
-  IChatSession,
   IChatSessionDetail,
   StreamingMessageState,
 } from '@/types/chat';
 import { checkAbortError } from '@/utils/check-error';
 import { decodeChatStreamChunks } from '@/utils/decode-chat-stream-chunk';
+import { setCachedChatSessions } from '@/utils/set-cached-chat-sessions';
 
 import { useChatStore } from '../stores/use-chat-store';
 
@@ -65,21 +65,18 @@ export const useCreateChatMessage = ({ chatSessionId }: IUseCreateChatMessagePro
                 setStreamingMessage(props.chatSessionId, fullResponse);
                 break;
               case ChatMessageStreamEvent.TITLE_GENERATION:
-                setStreamState(props.chatSessionId, StreamingMessageState.GENERATING_TITLE);
-                queryClient.setQueryData([ReactQueryKey.CHAT_SESSIONS], (oldData?: IChatSession[]) => {
-                  if (!oldData) {
-                    return oldData;
-                  }
-
-                  const copiedOldData = [...oldData];
-
-                  const chatSessionIdx = oldData.findIndex(value => value.id === props.chatSessionId);
+                // The title is generated concurrently, it may arrive before the first delta
+                if (fullResponse) {
+                  setStreamState(props.chatSessionId, StreamingMessageState.GENERATING_TITLE);
+                }
+                setCachedChatSessions(queryClient, chatSessions => {
+                  const chatSessionIdx = chatSessions.findIndex(value => value.id === props.chatSessionId);
 
                   if (chatSessionIdx === -1) {
-                    return oldData;
+                    return chatSessions;
                   }
 
-                  return copiedOldData.map((session, idx) =>
+                  return chatSessions.map((session, idx) =>
                     idx === chatSessionIdx ? { ...session, description: data } : session,
                   );
                 });
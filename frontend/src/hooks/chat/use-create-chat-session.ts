@@ -2,7 +2,8 @@ import { useMutation, useQueryClient } from '@tanstack/react-query';
 
 import { ReactMutationKey, ReactQueryKey } from '@/constants/react-query-key';
 import { createChatSession } from '@/services/chat/create-chat-session';
-import { IChatSession, IChatSessionDetail } from '@/types/chat';
+import { IChatSessionDetail } from '@/types/chat';
+import { setCachedChatSessions } from '@/utils/set-cached-chat-sessions';
 
 export const useCreateChatSession = () => {
   const queryClient = useQueryClient();
@@ -11,8 +12,9 @@ export const useCreateChatSession = () => {
     mutationKey: [ReactMutationKey.CREATE_CHAT_SESSION],
     mutationFn: createChatSession,
     onSuccess(newData) {
-      queryClient.setQueryData([ReactQueryKey.CHAT_SESSIONS], (oldData?: IChatSession[]) =>
-        oldData ? [newData, ...oldData] : [newData],
+      // The chat sessions are sorted by the last update, a new one always belongs to the first page
+      setCachedChatSessions(queryClient, (chatSessions, pageIndex) =>
+        pageIndex === 0 ? [newData, ...chatSessions] : chatSessions,
       );
       queryClient.setQueryData([ReactQueryKey.CHAT_SESSION, { chatSessionId: newData.id }], () => {
         const newChatSessionDetail: IChatSessionDetail = {
@@ -1,8 +1,8 @@
 import { useMutation, useQueryClient } from '@tanstack/react-query';
 
-import { ReactMutationKey, ReactQueryKey } from '@/constants/react-query-key';
+import { ReactMutationKey } from '@/constants/react-query-key';
 import { deleteChatSession } from '@/services/chat/delete-chat-session';
-import { IChatSession } from '@/types/chat';
+import { setCachedChatSessions } from '@/utils/set-cached-chat-sessions';
 
 export const useDeleteChatSession = (chatSessionId?: string) => {
   const queryClient = useQueryClient();
@@ -11,8 +11,8 @@ export const useDeleteChatSession = (chatSessionId?: string) => {
     mutationKey: [ReactMutationKey.DELETE_CHAT_SESSION, { id: chatSessionId }],
     mutationFn: deleteChatSession,
     onSuccess(_, variables) {
-      queryClient.setQueryData([ReactQueryKey.CHAT_SESSIONS], (oldData?: IChatSession[]) =>
-        oldData ? oldData.filter(chatSession => chatSession.id !== variables) : oldData,
+      setCachedChatSessions(queryClient, chatSessions =>
+        chatSessions.filter(chatSession => chatSession.id !== variables),
       );
     },
   });
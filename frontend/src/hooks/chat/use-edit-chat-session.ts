@@ -2,29 +2,24 @@ import { QueryClient, useMutation, useQueryClient } from '@tanstack/react-query'
 
 import { ReactMutationKey, ReactQueryKey } from '@/constants/react-query-key';
 import { editChatSession } from '@/services/chat/edit-chat-session';
-import { IChatSession } from '@/types/chat';
+import { setCachedChatSessions } from '@/utils/set-cached-chat-sessions';
 
 type TEditChatSessionProps = Parameters<typeof editChatSession>[0];
 
 const modifyCachedData = (queryClient: QueryClient, modifiedData: TEditChatSessionProps) => {
-  let isModified = true;
+  let isModified = false;
 
-  queryClient.setQueryData([ReactQueryKey.CHAT_SESSIONS], (oldData?: IChatSession[]) => {
-    if (!oldData) {
-      return oldData;
-    }
-
-    const copyOldData = [...oldData];
+  setCachedChatSessions(queryClient, chatSessions => {
+    const copyOldData = [...chatSessions];
 
     const patchedFolderIndex = copyOldData.findIndex(value => value.id === modifiedData.chatSessionId);
 
     // Found the folder with new name in the tanstack cached data, should assign a new one,
-    // if cannot find (due to several reasons, but this should not happened), refetch the query
+    // if cannot find in any loaded page (due to several reasons, but this should not happened), refetch the query
     if (~patchedFolderIndex) {
       const previousValue = copyOldData[patchedFolderIndex];
       copyOldData[patchedFolderIndex] = { ...previousValue, ...modifiedData.data };
-    } else {
-      isModified = false;
+      isModified = true;
     }
 
     return copyOldData;
@@ -1,11 +1,15 @@
-import { useQuery } from '@tanstack/react-query';
+import { useInfiniteQuery } from '@tanstack/react-query';
 
 import { ReactQueryKey } from '@/constants/react-query-key';
-import { getAllChatSessions } from '@/services/chat/get-all-chat-sessions';
+import { getChatSessions } from '@/services/chat/get-chat-sessions';
 
+// The chat sessions are loaded page by page, the next page is fetched on scroll
 export const useGetAllChatSessions = () => {
-  return useQuery({
+  return useInfiniteQuery({
     queryKey: [ReactQueryKey.CHAT_SESSIONS],
-    queryFn: getAllChatSessions,
+    queryFn: ({ pageParam }) => getChatSessions(pageParam),
+    initialPageParam: null as string | null,
+    getNextPageParam: lastPage => lastPage.next_cursor,
+    select: data => data.pages.flatMap(page => page.items),
   });
 };
@@ -0,0 +1,23 @@
+import { useQuery } from '@tanstack/react-query';
+
+import { ReactQueryKey } from '@/constants/react-query-key';
+import { getChatMessage } from '@/services/chat/get-chat-message';
+import { IChatMessageResponse } from '@/types/chat';
+
+export const useGetChatMessage = (chatMessage: Partial<IChatMessageResponse>) => {
+  const { id: chatMessageId, chat_session_id: chatSessionId, is_truncated: isTruncated } = chatMessage;
+
+  return useQuery({
+    queryKey: [ReactQueryKey.CHAT_MESSAGE, { chatMessageId }],
+    queryFn: async () => {
+      if (!chatSessionId || !chatMessageId) {
+        // Should not go here
+        throw new Error('Chat message id not found');
+      }
+
+      return getChatMessage(chatSessionId, chatMessageId);
+    },
+    enabled: !!isTruncated && !!chatSessionId && !!chatMessageId,
+    staleTime: Infinity,
+  });
+};
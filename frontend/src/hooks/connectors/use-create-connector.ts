@@ -1,11 +1,21 @@
-import { useMutation } from '@tanstack/react-query';
+import { useMutation, useQueryClient } from '@tanstack/react-query';
 
-import { ReactMutationKey } from '@/constants/react-query-key';
+import { ReactMutationKey, ReactQueryKey } from '@/constants/react-query-key';
 import { createConnector } from '@/services/connectors/create-connector';
+import { IConnector } from '@/types/connector';
 
 export const useCreateConnector = () => {
+  const queryClient = useQueryClient();
+
   return useMutation({
     mutationKey: [ReactMutationKey.CREATE_CONNECTOR],
     mutationFn: createConnector,
+    onSuccess(newData) {
+      // Patch the list from the write response: refetching it would read from the
+      // read replica, which may not have the new connector yet
+      queryClient.setQueryData([ReactQueryKey.CONNECTORS], (oldData?: IConnector[]) =>
+        oldData ? [newData, ...oldData] : [newData],
+      );
+    },
   });
 };
@@ -0,0 +1,31 @@
+import { useEffect, useRef } from 'react';
+
+// Call the callback whenever the referenced element scrolls into view, e.g. to load the next page of a list
+const useOnVisible = <T extends Element>(callback: () => void, enabled = true) => {
+  const ref = useRef<T>(null);
+  const callbackRef = useRef(callback);
+
+  useEffect(() => {
+    callbackRef.current = callback;
+  }, [callback]);
+
+  useEffect(() => {
+    const element = ref.current;
+    if (!element || !enabled) {
+      return;
+    }
+
+    const observer = new IntersectionObserver(entries => {
+      if (entries.some(entry => entry.isIntersecting)) {
+        callbackRef.current();
+      }
+    });
+    observer.observe(element);
+
+    return () => observer.disconnect();
+  }, [enabled]);
+
+  return ref;
+};
+
+export default useOnVisible;
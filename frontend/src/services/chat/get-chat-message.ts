@@ -0,0 +1,16 @@
+import { httpClient } from '@/lib/axios';
+import { IApiResponse } from '@/types/api-response';
+import { IChatMessageResponse } from '@/types/chat';
+import { ApiEndpointPrefix, getApiUrl } from '@/utils/get-api-url';
+
+export const getChatMessage = async (chatSessionId: string, chatMessageId: string): Promise<IChatMessageResponse> => {
+  try {
+    const res = await httpClient.get<IApiResponse<IChatMessageResponse>>(
+      getApiUrl(ApiEndpointPrefix.CHAT, `/chat-sessions/${chatSessionId}/messages/${chatMessageId}`),
+    );
+    return res.data.data;
+  } catch (error) {
+    console.error('[GetChatMessage]: ', error);
+    throw error;
+  }
+};
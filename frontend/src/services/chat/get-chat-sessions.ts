@@ -0,0 +1,17 @@
+import { httpClient } from '@/lib/axios';
+import { IApiResponse, IPageResponse } from '@/types/api-response';
+import { IChatSession } from '@/types/chat';
+import { ApiEndpointPrefix, getApiUrl } from '@/utils/get-api-url';
+
+export const getChatSessions = async (cursor: string | null): Promise<IPageResponse<IChatSession>> => {
+  try {
+    const res = await httpClient.get<IApiResponse<IPageResponse<IChatSession>>>(
+      getApiUrl(ApiEndpointPrefix.CHAT, '/chat-sessions'),
+      { params: { cursor: cursor ?? undefined } },
+    );
+    return res.data.data;
+  } catch (error) {
+    console.error('[GetChatSessions]: ', error);
+    throw error;
+  }
+};
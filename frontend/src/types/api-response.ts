@@ -3,3 +3,8 @@ export interface IApiResponse<T> {
   headers: string | null;
   data: T;
 }
+
+export interface IPageResponse<T> {
+  items: T[];
+  next_cursor: string | null;
+}
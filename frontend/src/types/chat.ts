@@ -49,6 +49,7 @@ export interface IChatMessageResponse extends ITimestampResponse {
   parent_message_id?: string;
   child_message_id?: string;
   is_sensitive: boolean;
+  is_truncated?: boolean;
 }
 
 export interface IChatSessionDetail extends IChatSession {
@@ -1,6 +1,8 @@
 export interface IDocumentUploadResponse {
-  task_id: string;
+  document_id: string;
+  task_id: string | null;
   document_url: string;
+  is_duplicate: boolean;
 }
 
 export enum IndexStatus {
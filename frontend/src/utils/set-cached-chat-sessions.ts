@@ -0,0 +1,25 @@
+import { InfiniteData, QueryClient } from '@tanstack/react-query';
+
+import { ReactQueryKey } from '@/constants/react-query-key';
+import { IPageResponse } from '@/types/api-response';
+import { IChatSession } from '@/types/chat';
+
+export type TCachedChatSessions = InfiniteData<IPageResponse<IChatSession>, string | null>;
+
+/**
+ * Patch the chat sessions of every loaded page in the tanstack cached data.
+ * The updater receives the index of the page, e.g. a new chat session goes to the first page only.
+ */
+export const setCachedChatSessions = (
+  queryClient: QueryClient,
+  updater: (chatSessions: IChatSession[], pageIndex: number) => IChatSession[],
+) => {
+  queryClient.setQueryData<TCachedChatSessions>([ReactQueryKey.CHAT_SESSIONS], oldData =>
+    oldData
+      ? {
+          ...oldData,
+          pages: oldData.pages.map((page, pageIndex) => ({ ...page, items: updater(page.items, pageIndex) })),
+        }
+      : oldData,
+  );
+};
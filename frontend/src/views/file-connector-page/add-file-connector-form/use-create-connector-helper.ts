@@ -1,8 +1,6 @@
-import { useQueryClient } from '@tanstack/react-query';
 import { useState } from 'react';
 import { toast } from 'sonner';
 
-import { ReactQueryKey } from '@/constants/react-query-key';
 import { useCreateConnector } from '@/hooks/connectors/use-create-connector';
 import { useUploadDocuments } from '@/hooks/documents/use-upload-documents';
 import { useIndexStore } from '@/hooks/stores/use-index-store';
@@ -12,8 +10,6 @@ export const useCreateConnectorHelper = () => {
   const [progressLabel, setProgressLabel] = useState('');
   const [isError, setIsError] = useState(false);
 
-  const queryClient = useQueryClient();
-
   const addConnector = useIndexStore(state => state.addConnector);
 
   const { mutateAsync: uploadDocuments } = useUploadDocuments();
@@ -61,14 +57,14 @@ export const useCreateConnectorHelper = () => {
 
       // TODO: Remove this in the future, since get all connectors will also return
       // all task_id
-      addConnector(connector.id, documents[0].task_id);
+      // The duplicate documents are already indexed, so they have no indexing task
+      const taskId = documents.find(({ task_id }) => task_id)?.task_id;
+      if (taskId) {
+        addConnector(connector.id, taskId);
+      }
 
       setProgress(100);
       setProgressLabel("You're all set.");
-      queryClient.invalidateQueries({
-        queryKey: [ReactQueryKey.CONNECTORS],
-        refetchType: 'all',
-      });
     } catch {
       setIsError(true);
       return;
@@ -3,10 +3,14 @@ import { FC, useMemo } from 'react';
 import ChatSessionItem from '@/components/chat-session-item/chat-session-item';
 import { SidebarGroup, SidebarGroupContent, SidebarGroupLabel, SidebarMenu } from '@/components/ui/sidebar';
 import { useGetAllChatSessions } from '@/hooks/chat/use-get-all-chat-sessions';
+import useOnVisible from '@/hooks/utils/use-on-visible';
 import { groupChatSessions } from '@/utils/group-chat-sessions';
 
 export const ChatHistory: FC = () => {
-  const { data: chatSessions } = useGetAllChatSessions();
+  const { data: chatSessions, hasNextPage, isFetchingNextPage, fetchNextPage } = useGetAllChatSessions();
+
+  // Load the next page of chat sessions once the end of the history is scrolled into view
+  const loadMoreRef = useOnVisible<HTMLDivElement>(fetchNextPage, hasNextPage && !isFetchingNextPage);
 
   const groupedChatSessions = useMemo(
     () => (chatSessions ? groupChatSessions(chatSessions.filter(session => !session.folder_id)) : undefined),
@@ -28,6 +32,7 @@ export const ChatHistory: FC = () => {
             </SidebarGroupContent>
           </SidebarGroup>
         ))}
+        <div ref={loadMoreRef} />
       </div>
     </>
   );